@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+BlockRun Daemon Benchmark - Warm-path prompt submission overhead.
+
+Starts the local stub API (stub_api.py) and a daemon pointed at it, then
+forwards a chat prompt through daemon.forward() from this (already warm)
+process and checks that the overhead - the round trip minus the stub's own
+delay - stays within budget. The wall time of a fresh ``run.py`` process
+forwarding the same prompt is reported alongside, for reference only: it
+includes interpreter startup, which no daemon can remove.
+
+Needs the blockrun_llm SDK (the daemon makes the paid call); skipped
+otherwise.
+
+Usage:
+    python benchmarks/bench_daemon.py
+    python benchmarks/bench_daemon.py --runs 50 --latency-ms 20 --json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(ROOT, "scripts", "run.py")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import bench_env  # noqa: E402
+from stub_api import start_stub  # noqa: E402
+from scripts import daemon  # noqa: E402
+
+# Overhead budget for a forwarded prompt on the warm path, in milliseconds
+WARM_BUDGET_MS = 20.0
+
+PROMPT_ARGV = ["Say hello", "--model", "openai/gpt-5-mini", "--no-cache"]
+
+# Seconds to wait for the daemon to start listening
+START_TIMEOUT = 30.0
+
+
+def start_daemon(env: Dict[str, str], socket_path: Path, log_path: str) -> subprocess.Popen:
+    """Start a daemon and wait until it answers pings."""
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, RUN_PY, "--daemon"], env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    deadline = time.monotonic() + START_TIMEOUT
+    while not daemon.ping(socket_path):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError(f"daemon did not start: {Path(log_path).read_text().strip()[-300:]}")
+        time.sleep(0.05)
+    return proc
+
+
+def forward_ms(socket_path: Path) -> float:
+    """Wall time in ms of forwarding the prompt from this process."""
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        started = time.perf_counter()
+        code = daemon.forward(PROMPT_ARGV, socket_path=socket_path)
+        elapsed = (time.perf_counter() - started) * 1000.0
+    if code != 0:
+        raise RuntimeError(f"forwarded prompt exited {code}: {out.getvalue().strip()[-300:]}")
+    return elapsed
+
+
+def process_ms(env: Dict[str, str]) -> float:
+    """Wall time in ms of a fresh run.py process forwarding the prompt."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, RUN_PY, *PROMPT_ARGV], capture_output=True, text=True, env=env)
+    elapsed = (time.perf_counter() - started) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"run.py exited {proc.returncode}: {proc.stdout.strip()[-300:]}")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the daemon's warm-path overhead budget")
+    parser.add_argument("--runs", type=int, default=20, help="Timed forwards (median is used)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stub delay per served request")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("blockrun_llm") is None:
+        print("skipped: blockrun_llm not installed")
+        return 0
+
+    server = start_stub(latency_ms=args.latency_ms)
+    saved = dict(os.environ)
+    proc = None
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            env = bench_env(home, f"http://127.0.0.1:{server.server_port}")
+            env.pop("BLOCKRUN_NO_DAEMON")
+            socket_path = Path(home) / ".blockrun" / "daemon.sock"
+            proc = start_daemon(env, socket_path, os.path.join(home, "daemon.log"))
+
+            # The daemon only serves callers with its own BLOCKRUN_* settings
+            os.environ.clear()
+            os.environ.update(env)
+
+            # The first call opens the connection to the stub
+            first = forward_ms(socket_path)
+            samples: List[float] = [forward_ms(socket_path) for _ in range(args.runs)]
+            process = statistics.median(process_ms(env) for _ in range(max(1, args.runs // 4)))
+
+            daemon.stop(socket_path)
+            proc.wait(timeout=10)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+        server.shutdown()
+
+    median = statistics.median(samples)
+    result = {
+        "first_ms": round(first, 3),
+        "median_ms": round(median, 3),
+        "stub_latency_ms": args.latency_ms,
+        "overhead_ms": round(median - args.latency_ms, 3),
+        "budget_ms": WARM_BUDGET_MS,
+        "process_ms": round(process, 3),
+        "stub_requests": dict(server.state.counts),
+    }
+    failures = []
+    if result["overhead_ms"] > WARM_BUDGET_MS:
+        failures.append(f"warm forward: overhead {result['overhead_ms']:.1f}ms > budget {WARM_BUDGET_MS:.0f}ms")
+
+    if args.json:
+        print(json.dumps({"result": result, "failures": failures}, indent=2))
+    else:
+        print(f"warm forward: median {median:.1f}ms, overhead {result['overhead_ms']:.1f}ms "
+              f"(budget {WARM_BUDGET_MS:.0f}ms, first {first:.1f}ms)")
+        print(f"fresh run.py via daemon: {process:.1f}ms (includes interpreter startup)")
+        for failure in failures:
+            print(f"FAIL {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
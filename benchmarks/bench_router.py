@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+BlockRun Router Benchmark - Prompt classification throughput.
+
+Compares the compiled single-pass classifiers (KeywordMatcher, used by the
+routing in scripts/run.py) with the original per-keyword substring scans,
+which are copied below. Every case is first checked to give the same
+routing decision under both implementations. detect_task_type keeps the
+per-keyword scan - the regex never beat it on large prompts - and is only
+checked for identical results.
+
+smart_route_batch is timed on distinct prompts, so its row measures
+routing alone; the saving from classifying repeated prompts once is
+reported on its own row.
+
+Cases cover the shapes that matter in practice: many short prompts, and
+multi-megabyte prompts with no keywords (the worst case: the whole text
+must be scanned), an early real-time keyword, and keywords near the end.
+
+Usage:
+    python benchmarks/bench_router.py
+    python benchmarks/bench_router.py --size-mb 4 --json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.llm import router  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location("blockrun_run", os.path.join(ROOT, "scripts", "run.py"))
+run = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(run)
+
+
+# --- Original implementations, kept verbatim for comparison ---------------
+
+def legacy_detect_task_type(prompt: str) -> List[str]:
+    prompt_lower = prompt.lower()
+    detected = []
+    for task_type, keywords in router.TASK_KEYWORDS.items():
+        if any(keyword in prompt_lower for keyword in keywords):
+            detected.append(task_type)
+    return detected if detected else ["general"]
+
+
+def legacy_is_realtime_query(prompt: str) -> bool:
+    prompt_lower = prompt.lower()
+    keywords = [
+        "twitter", "x.com", "trending", "elon", "musk",
+        "breaking news", "latest posts", "live updates",
+        "what are people saying", "current events"
+    ]
+    if any(word in prompt_lower for word in keywords):
+        return True
+    if re.search(r'(?<!\w)@\w+', prompt_lower):
+        return True
+    return False
+
+
+def legacy_get_smart_model(prompt: str) -> str:
+    prompt_lower = prompt.lower()
+    if legacy_is_realtime_query(prompt):
+        return "xai/grok-3"
+    if any(word in prompt_lower for word in ["code", "python", "javascript", "function", "debug"]):
+        return "anthropic/claude-sonnet-4"
+    if any(word in prompt_lower for word in ["math", "proof", "prove", "theorem", "logic", "reasoning", "solve", "calculate"]):
+        return "openai/o1-mini"
+    if any(word in prompt_lower for word in ["long", "document", "summarize", "analyze file"]):
+        return "google/gemini-2.0-flash"
+    return "openai/gpt-5.2"
+
+
+# --- Inputs ---------------------------------------------------------------
+
+SHORT_PROMPTS = [
+    "What is the capital of France?",
+    "Write a python function to reverse a linked list",
+    "Prove that the square root of 2 is irrational",
+    "What are people saying about @blockrun on twitter",
+    "Summarize this document for me",
+    "Draft a short blog post about x402 payments",
+    "Explain step by step why the sky is blue",
+    "Email me at dev@example.com with the results",
+]
+
+
+def filler(size: int, seed: int = 7) -> str:
+    """Keyword-free text: words drawn from letters that spell no keyword."""
+    rng = random.Random(seed)
+    letters = "bghjkqvwz"
+    words = []
+    total = 0
+    while total < size:
+        word = "".join(rng.choice(letters) for _ in range(rng.randint(2, 9)))
+        words.append(word)
+        total += len(word) + 1
+    text = " ".join(words)[:size]
+    # Sanity check: the filler must not contain any keyword
+    assert router.detect_task_type(text) == ["general"] and not legacy_is_realtime_query(text)
+    return text
+
+
+def build_cases(size: int) -> Dict[str, List[str]]:
+    body = filler(size)
+    return {
+        "short prompts (x1000)": SHORT_PROMPTS * 125,
+        "large, no keywords": [body],
+        "large, real-time first": ["trending on twitter: " + body],
+        "large, keywords at end": [body + " please debug this python code"],
+        "large, mixed case + emails": [
+            body.upper()[: size // 2] + " contact a@b.io " + body[size // 2:]
+        ],
+    }
+
+
+def timed(fn: Callable[[str], object], prompts: List[str], repeat: int) -> float:
+    """Median wall time in ms of applying fn to every prompt."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for prompt in prompts:
+            fn(prompt)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+PAIRS = {
+    "get_smart_model": (legacy_get_smart_model, run.get_smart_model),
+    "is_realtime_query": (legacy_is_realtime_query, run.is_realtime_query),
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare router classifier implementations")
+    parser.add_argument("--size-mb", type=float, default=2.0, help="Size of the large prompts")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (median is used)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    cases = build_cases(int(args.size_mb * 1024 * 1024))
+
+    mismatches = []
+    results = []
+    for case, prompts in cases.items():
+        for prompt in set(prompts):
+            if legacy_detect_task_type(prompt) != router.detect_task_type(prompt):
+                mismatches.append(f"detect_task_type on {case!r}")
+                break
+        for name, (legacy, compiled) in PAIRS.items():
+            for prompt in set(prompts):
+                if legacy(prompt) != compiled(prompt):
+                    mismatches.append(f"{name} on {case!r}")
+                    break
+            legacy_ms = timed(legacy, prompts, args.repeat)
+            compiled_ms = timed(compiled, prompts, args.repeat)
+            results.append({
+                "case": case,
+                "function": name,
+                "legacy_ms": legacy_ms,
+                "compiled_ms": compiled_ms,
+                "speedup": legacy_ms / compiled_ms if compiled_ms else None,
+            })
+
+    # The batch API against a plain loop: on distinct prompts for the
+    # routing itself, then on repeats for the dedup on top of it
+    distinct = [f"{prompt} ({i})" for i, prompt in enumerate(SHORT_PROMPTS * 125)]
+    for case, batch in (("distinct short (x1000)", distinct),
+                        ("repeated short (x1000, dedup)", SHORT_PROMPTS * 125)):
+        loop_ms = timed(lambda p: [router.smart_route(x) for x in p], [batch], args.repeat)
+        batch_ms = timed(router.smart_route_batch, [batch], args.repeat)
+        results.append({
+            "case": case,
+            "function": "smart_route_batch",
+            "legacy_ms": loop_ms,
+            "compiled_ms": batch_ms,
+            "speedup": loop_ms / batch_ms if batch_ms else None,
+        })
+
+    if args.json:
+        print(json.dumps({"results": results, "mismatches": mismatches}, indent=2))
+    else:
+        print(f"{'case':<30} {'function':<18} {'legacy':>10} {'compiled':>10} {'speedup':>8}")
+        for r in results:
+            print(
+                f"{r['case']:<30} {r['function']:<18} {r['legacy_ms']:>8.2f}ms "
+                f"{r['compiled_ms']:>8.2f}ms {r['speedup']:>7.1f}x"
+            )
+        for mismatch in mismatches:
+            print(f"MISMATCH {mismatch}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+BlockRun Startup Benchmark - Import time budget per CLI command.
+
+Runs scripts/run.py under ``python -X importtime`` for each command that
+never touches the network and checks that:
+  - the command's import time stays within its budget, and
+  - no network stack module (SDK, httpx, eth-account) gets imported.
+
+Interpreter startup (the ``site`` import tree) is excluded so the numbers
+reflect what run.py itself pulls in.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(ROOT, "scripts", "run.py")
+
+# Import-time budget per command, in milliseconds
+COMMAND_BUDGETS_MS = {
+    ("--version",): 40.0,
+    ("--spending",): 50.0,
+    ("--set-budget", "1.00"): 50.0,
+    ("--clear-budget",): 50.0,
+}
+
+# Modules that local commands must never import
+FORBIDDEN_MODULES = ("blockrun_llm", "httpx", "eth_account")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        Tuple of (total import time in ms excluding the site tree,
+        list of all imported module names)
+    """
+    total_us = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append(name.strip())
+        # Top-level entries have exactly one leading space before the name
+        if not name.startswith("  ") and name.strip() != "site":
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+def measure(args: Tuple[str, ...], runs: int, env: Dict[str, str]) -> Dict[str, object]:
+    """Run one command several times and collect its timings."""
+    import_ms = []
+    wall_ms = []
+    modules: List[str] = []
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", RUN_PY, *args],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        wall_ms.append((time.perf_counter() - started) * 1000.0)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} exited {proc.returncode}: {proc.stdout}")
+        ms, modules = parse_importtime(proc.stderr)
+        import_ms.append(ms)
+
+    return {
+        "command": " ".join(args),
+        "import_ms": statistics.median(import_ms),
+        "wall_ms": statistics.median(wall_ms),
+        "budget_ms": COMMAND_BUDGETS_MS[args],
+        "forbidden": sorted(
+            m for m in set(modules)
+            if m.split(".")[0] in FORBIDDEN_MODULES
+        ),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check CLI startup time budgets")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command (median is used)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        # Isolated HOME so budget commands don't touch the real spending file
+        env = dict(os.environ, HOME=home, BLOCKRUN_NO_DAEMON="1")
+        results = [measure(cmd, args.runs, env) for cmd in COMMAND_BUDGETS_MS]
+
+    failures = []
+    for result in results:
+        if result["import_ms"] > result["budget_ms"]:
+            failures.append(
+                f"{result['command']}: import {result['import_ms']:.1f}ms "
+                f"> budget {result['budget_ms']:.0f}ms"
+            )
+        if result["forbidden"]:
+            failures.append(f"{result['command']}: imported {', '.join(result['forbidden'])}")
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        print(f"{'command':<22} {'import':>9} {'wall':>9} {'budget':>8}")
+        for result in results:
+            print(
+                f"{result['command']:<22} {result['import_ms']:>7.1f}ms "
+                f"{result['wall_ms']:>7.1f}ms {result['budget_ms']:>6.0f}ms"
+            )
+        for failure in failures:
+            print(f"FAIL {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
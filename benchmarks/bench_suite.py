@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+BlockRun Benchmark Suite - Startup, routing, spending I/O and chat overhead.
+
+Starts the local stub API (stub_api.py) and measures:
+  - cold start: wall-clock time of a fresh ``scripts/run.py`` process per
+    command, network commands talking to the stub;
+  - routing: smart_route, detect_task_type and route_candidates calls/sec
+    over a mix of prompt shapes;
+  - spending: SpendingTracker.record calls/sec on a temporary directory;
+  - chat: end-to-end time of cmd_chat in-process against the stub, minus
+    the stub's own delay (needs the blockrun_llm SDK; skipped otherwise).
+
+Every run is isolated in a temporary HOME. Results are one JSON document;
+--output appends it as a line to a JSONL file, so a file collects the
+history of runs to compare over time.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --runs 10 --latency-ms 20 --output bench.jsonl
+    python benchmarks/bench_suite.py --only routing,spending --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(ROOT, "scripts", "run.py")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_api import start_stub  # noqa: E402
+
+SECTIONS = ("startup", "routing", "spending", "chat")
+
+# A throwaway key: the stub accepts any signature and nothing is settled
+BENCH_WALLET_KEY = "0x" + "11" * 32
+
+BENCH_ADDRESSES = ["0x" + f"{i:040x}" for i in range(1, 26)]
+
+ROUTING_PROMPTS = [
+    "What is the capital of France?",
+    "Write a python function to parse this json and fix the bug in the loop",
+    "What's trending on twitter about the election today?",
+    "Prove that the sum of two even numbers is even, step by step",
+    "Summarize this long document: " + "lorem ipsum dolor sit amet " * 400,
+    "Draft a short, friendly email declining the meeting invitation",
+    "quick: translate 'good morning' into Spanish",
+]
+
+
+def bench_env(home: str, api_url: str) -> Dict[str, str]:
+    """Environment for CLI subprocesses: isolated HOME, stub endpoints."""
+    env = dict(os.environ)
+    env.update({
+        "HOME": home,
+        "BLOCKRUN_NO_DAEMON": "1",
+        "BLOCKRUN_API_URL": f"{api_url}/api",
+        "BLOCKRUN_BASE_RPCS": f"{api_url}/rpc",
+        "BLOCKRUN_WALLET_KEY": BENCH_WALLET_KEY,
+    })
+    env.pop("BLOCKRUN_CACHE", None)
+    return env
+
+
+def timed_runs(fn: Callable[[], Any], runs: int) -> List[float]:
+    """Wall-clock milliseconds of each of several calls."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def bench_startup(runs: int, env: Dict[str, str], home: str) -> List[Dict[str, Any]]:
+    """Cold start of a fresh CLI process per command."""
+    wallets = os.path.join(home, "wallets.txt")
+    Path(wallets).write_text("\n".join(BENCH_ADDRESSES) + "\n")
+
+    commands = [
+        ("--version",),
+        ("--spending",),
+        ("--spending", "--since", "7d", "--by", "day"),
+        ("--models",),
+        ("--balance", "--wallets", wallets),
+    ]
+    results = []
+    for args in commands:
+        error = None
+
+        def run():
+            nonlocal error
+            proc = subprocess.run(
+                [sys.executable, RUN_PY, *args], capture_output=True, text=True, env=env
+            )
+            if proc.returncode != 0 and error is None:
+                error = (proc.stdout + proc.stderr).strip().splitlines()[-1:] or [f"exit {proc.returncode}"]
+
+        # The first run fills caches (models.json), the rest show steady state
+        first = timed_runs(run, 1)[0]
+        samples = timed_runs(run, runs)
+        name = " ".join("FILE" if arg == wallets else arg for arg in args)
+        result = {"command": name, "first_ms": round(first, 3), **summarize(samples)}
+        if error:
+            result["error"] = error[0]
+        results.append(result)
+    return results
+
+
+def throughput(fn: Callable[[str], Any], prompts: List[str], min_seconds: float) -> float:
+    """Calls per second of fn over prompts, run for at least min_seconds."""
+    calls = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        for prompt in prompts:
+            fn(prompt)
+        calls += len(prompts)
+        elapsed = time.perf_counter() - started
+    return calls / elapsed
+
+
+def bench_routing(min_seconds: float) -> List[Dict[str, Any]]:
+    """Router decisions per second."""
+    from scripts.llm import router
+
+    models = [router.smart_route(prompt) for prompt in ROUTING_PROMPTS]
+    cases = [
+        ("smart_route", router.smart_route, ROUTING_PROMPTS),
+        ("smart_route --cheap", lambda p: router.smart_route(p, cheap=True), ROUTING_PROMPTS),
+        ("detect_task_type", router.detect_task_type, ROUTING_PROMPTS),
+        ("route_candidates", router.route_candidates, models),
+    ]
+    results = []
+    for name, fn, inputs in cases:
+        rate = throughput(fn, inputs, min_seconds)
+        results.append({
+            "name": name,
+            "calls_per_sec": round(rate, 1),
+            "us_per_call": round(1e6 / rate, 3),
+        })
+    return results
+
+
+def bench_spending(calls: int) -> Dict[str, Any]:
+    """SpendingTracker.record throughput, including ledger and journal writes."""
+    from scripts.utils.spending import SpendingTracker
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        tracker = SpendingTracker(data_dir=data_dir)
+        started = time.perf_counter()
+        for i in range(calls):
+            tracker.record(
+                "openai/gpt-5.2", 0.001,
+                latency_ms=120.0 + i % 7, input_tokens=40, output_tokens=200, status=200, retries=0,
+            )
+        elapsed = time.perf_counter() - started
+        recorded = SpendingTracker(data_dir=data_dir).get_calls()
+
+    return {
+        "calls": calls,
+        "records_per_sec": round(calls / elapsed, 1),
+        "us_per_record": round(elapsed / calls * 1e6, 3),
+        "ok": recorded == calls,
+    }
+
+
+def bench_chat(runs: int, latency_ms: float, env: Dict[str, str]) -> Dict[str, Any]:
+    """cmd_chat end to end against the stub, in this process."""
+    import importlib.util
+
+    if importlib.util.find_spec("blockrun_llm") is None:
+        return {"skipped": "blockrun_llm not installed"}
+
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        spec = importlib.util.spec_from_file_location("blockrun_run", RUN_PY)
+        run = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(run)
+        argv = ["Say hello", "--model", "openai/gpt-5-mini", "--no-cache"]
+
+        def call():
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                code = run.run_command(argv)
+            if code != 0:
+                raise RuntimeError(f"cmd_chat exited {code}: {out.getvalue().strip()[-200:]}")
+
+        # The first call pays for SDK import and client setup
+        first = timed_runs(call, 1)[0]
+        samples = timed_runs(call, runs)
+    except Exception as e:
+        return {"error": str(e)}
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+    stats = summarize(samples)
+    return {
+        "first_ms": round(first, 3),
+        **stats,
+        "stub_latency_ms": latency_ms,
+        "overhead_ms": round(stats["median_ms"] - latency_ms, 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT
+        )
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the BlockRun benchmark suite against a local stub API")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per command (median is used)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stub delay per served request")
+    parser.add_argument("--seconds", type=float, default=0.5, help="Minimum time per throughput case")
+    parser.add_argument("--records", type=int, default=2000, help="SpendingTracker.record calls")
+    parser.add_argument("--only", help=f"Comma-separated sections to run ({', '.join(SECTIONS)})")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--output", metavar="FILE", help="Append the results as one JSON line to FILE")
+    args = parser.parse_args()
+
+    sections = args.only.split(",") if args.only else list(SECTIONS)
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+
+    server = start_stub(latency_ms=args.latency_ms)
+    api_url = f"http://127.0.0.1:{server.server_port}"
+    results: Dict[str, Any] = {}
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            env = bench_env(home, api_url)
+            if "startup" in sections:
+                results["startup"] = bench_startup(args.runs, env, home)
+            if "routing" in sections:
+                results["routing"] = bench_routing(args.seconds)
+            if "spending" in sections:
+                results["spending"] = bench_spending(args.records)
+            if "chat" in sections:
+                results["chat"] = bench_chat(args.runs, args.latency_ms, env)
+    finally:
+        server.shutdown()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "stub_latency_ms": args.latency_ms,
+        "stub_requests": dict(server.state.counts),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    if "startup" in results:
+        print(f"{'command':<36} {'first':>10} {'median':>10}")
+        for result in results["startup"]:
+            line = f"{result['command']:<36} {result['first_ms']:>8.1f}ms {result['median_ms']:>8.1f}ms"
+            if result.get("error"):
+                line += f"  ({result['error']})"
+            print(line)
+        print()
+    if "routing" in results:
+        for result in results["routing"]:
+            print(f"{result['name']:<24} {result['calls_per_sec']:>12,.0f}/s {result['us_per_call']:>9.2f}us")
+        print()
+    if "spending" in results:
+        spending = results["spending"]
+        print(f"SpendingTracker.record   {spending['records_per_sec']:>12,.0f}/s "
+              f"{spending['us_per_record']:>9.2f}us{'' if spending['ok'] else '  (calls lost!)'}")
+        print()
+    if "chat" in results:
+        chat = results["chat"]
+        if "median_ms" in chat:
+            print(f"cmd_chat: median {chat['median_ms']:.1f}ms, overhead {chat['overhead_ms']:.1f}ms "
+                  f"over the stub's {chat['stub_latency_ms']:.0f}ms (first call {chat['first_ms']:.1f}ms)")
+        else:
+            print(f"cmd_chat: {chat.get('skipped') or chat.get('error')}")
+    if args.output:
+        print(f"\nAppended to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
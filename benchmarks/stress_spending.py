@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+BlockRun Spending Stress Test - Parallel writers on one spending directory.
+
+Starts several processes that each build their own SpendingTracker on a
+shared temporary directory and record calls as fast as they can, the way
+parallel agents on one host do. Afterwards a fresh tracker must see
+exactly workers x calls calls and the matching total; any lost update
+fails the run.
+
+The journal threshold is lowered so compaction (snapshot rewrite and
+journal truncation) happens many times while the other writers are busy.
+
+With --budget, writers reserve before each call and settle afterwards
+instead; the run then checks the daily budget was never overshot and no
+reservation was left behind.
+
+Usage:
+    python benchmarks/stress_spending.py
+    python benchmarks/stress_spending.py --workers 16 --calls 500 --json
+    python benchmarks/stress_spending.py --budget 0.5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.utils.spending import SpendingTracker  # noqa: E402
+
+# Exactly representable in binary, so the expected total is exact
+COST = 0.0009765625  # 2**-10
+
+
+def writer(data_dir: str, calls: int, journal_max: int, start, budget_every: int):
+    """Record calls from one process, with the occasional budget change."""
+    SpendingTracker.JOURNAL_MAX_BYTES = journal_max
+    start.wait()
+    tracker = SpendingTracker(data_dir=data_dir)
+    for i in range(calls):
+        tracker.record("stress/model", COST, latency_ms=1.0, status=200)
+        if budget_every and i % budget_every == 0:
+            tracker.set_budget(1000.0)
+
+
+def reserving_writer(data_dir: str, calls: int, journal_max: int, start, budget_every: int):
+    """Reserve, then settle each call, stopping once the budget refuses."""
+    SpendingTracker.JOURNAL_MAX_BYTES = journal_max
+    start.wait()
+    tracker = SpendingTracker(data_dir=data_dir)
+    for _ in range(calls):
+        reservation = tracker.reserve(COST * 2)
+        if reservation is None:
+            break
+        tracker.settle(reservation, "stress/model", COST, status=200)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stress SpendingTracker with parallel processes")
+    parser.add_argument("--workers", type=int, default=8, help="Writer processes")
+    parser.add_argument("--calls", type=int, default=250, help="Calls recorded per process")
+    parser.add_argument(
+        "--journal-max", type=int, default=4096,
+        help="Journal size that triggers compaction (small = frequent)",
+    )
+    parser.add_argument(
+        "--budget", type=float,
+        help="Reserve/settle under this daily budget instead; checks it is never overshot",
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as data_dir:
+        if args.budget is not None:
+            SpendingTracker(data_dir=data_dir).set_budget(args.budget)
+        target = writer if args.budget is None else reserving_writer
+
+        start = ctx.Event()
+        procs = [
+            ctx.Process(target=target, args=(data_dir, args.calls, args.journal_max, start, 50))
+            for _ in range(args.workers)
+        ]
+        for proc in procs:
+            proc.start()
+
+        started = time.perf_counter()
+        start.set()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - started
+
+        crashed = [proc.exitcode for proc in procs if proc.exitcode != 0]
+        tracker = SpendingTracker(data_dir=data_dir)
+        calls = tracker.get_calls()
+        total = tracker.get_total()
+        reserved = tracker.get_reserved()
+
+    if args.budget is None:
+        expected_calls = args.workers * args.calls
+    else:
+        # Every call reserves twice its cost, so the budget stops the run
+        # early; all that matters is that it is never overshot
+        expected_calls = min(args.workers * args.calls, calls)
+    expected_total = float(Decimal(str(COST)) * expected_calls)
+    ok = not crashed and calls == expected_calls and total == expected_total and not reserved
+    if args.budget is not None:
+        ok = ok and total <= args.budget
+
+    result = {
+        "workers": args.workers,
+        "calls_per_worker": args.calls,
+        "expected_calls": expected_calls,
+        "calls": calls,
+        "expected_total_usd": expected_total,
+        "total_usd": total,
+        "budget_usd": args.budget,
+        "reserved_usd": reserved,
+        "crashed_workers": len(crashed),
+        "records_per_sec": expected_calls / elapsed if elapsed else None,
+        "ok": ok,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"workers:   {args.workers} x {args.calls} calls")
+        print(f"calls:     {calls} (expected {expected_calls})")
+        print(f"total:     ${total:.6f} (expected ${expected_total:.6f})")
+        if args.budget is not None:
+            print(f"budget:    ${args.budget:.6f} (left reserved: ${reserved:.6f})")
+        print(f"rate:      {result['records_per_sec']:.0f} records/sec across all workers")
+        if crashed:
+            print(f"FAIL {len(crashed)} worker(s) crashed")
+        print("OK" if ok else "FAIL lost updates or budget overshot")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+BlockRun Stub API - Local stand-in for the BlockRun API and a Base node.
+
+Serves the endpoints the CLI talks to, with a configurable delay, so
+benchmarks measure the client and not the internet:
+  - POST /v1/chat/completions and /v1/images/generations, behind the x402
+    handshake: an unpaid request gets 402 with a ``payment-required``
+    header, the retry carrying ``PAYMENT-SIGNATURE`` (or ``X-PAYMENT``)
+    gets the response plus a ``PAYMENT-RESPONSE`` settlement header.
+    Signatures are not verified.
+  - GET /v1/models, the model list with pricing, revalidated by ETag.
+  - POST with a JSON-RPC body (single or batch) on any path: eth_chainId,
+    eth_blockNumber and eth_call (every balanceOf returns BALANCE_USDC).
+
+Any path prefix before /v1 is accepted, so BLOCKRUN_API_URL can be
+http://127.0.0.1:<port>/api like the real endpoint.
+
+Usage:
+    python benchmarks/stub_api.py --port 8700 --latency-ms 50
+    BLOCKRUN_API_URL=http://127.0.0.1:8700/api \\
+    BLOCKRUN_BASE_RPCS=http://127.0.0.1:8700/rpc python scripts/run.py --balance
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.llm.router import MODEL_CATALOG  # noqa: E402
+
+# $ per million input/output tokens for each catalog cost tier
+TIER_PRICES = {
+    "very-low": (0.1, 0.4),
+    "low": (0.5, 2.0),
+    "medium": (2.5, 10.0),
+    "high": (15.0, 60.0),
+}
+
+IMAGE_MODELS = {"google/nano-banana": 0.05, "openai/gpt-image-1": 0.04}
+
+# Price quoted in the 402 for every call, in micro USDC
+QUOTE_MICRO_USDC = "1000"
+
+BALANCE_USDC = 12.5
+
+PAY_TO = "0x" + "42" * 20
+USDC_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+
+# A 1x1 transparent PNG
+PNG_1X1 = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+def model_list() -> List[Dict[str, Any]]:
+    """The /v1/models payload: every routable chat model plus image models."""
+    models = []
+    for model_id, info in MODEL_CATALOG.items():
+        input_price, output_price = TIER_PRICES.get(info.get("cost"), TIER_PRICES["medium"])
+        models.append({
+            "id": model_id,
+            "name": model_id.split("/", 1)[-1],
+            "provider": info.get("provider"),
+            "categories": ["chat"],
+            "pricing": {"input": input_price, "output": output_price},
+            "contextWindow": 128000,
+        })
+    for model_id, flat in IMAGE_MODELS.items():
+        models.append({
+            "id": model_id,
+            "name": model_id.split("/", 1)[-1],
+            "categories": ["image"],
+            "pricing": {"flat": flat},
+        })
+    return models
+
+
+def _b64json(value: Any) -> str:
+    return base64.b64encode(json.dumps(value).encode()).decode()
+
+
+class StubState:
+    """Settings and request counters shared by all handler threads."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.models_body = json.dumps({"data": model_list()}).encode()
+        self.etag = '"%s"' % hashlib.sha1(self.models_body).hexdigest()[:16]
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def count(self, name: str):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def delay(self):
+        """Sleep for the configured latency (plus jitter)."""
+        seconds = (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000.0
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler; the server's ``state`` attribute holds a StubState."""
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> StubState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, value: Any, headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(value).encode(), headers=headers)
+
+    def _endpoint(self) -> str:
+        path = self.path.split("?", 1)[0]
+        index = path.find("/v1/")
+        return path[index:] if index >= 0 else path
+
+    def do_GET(self):
+        if self._endpoint() != "/v1/models":
+            self._json(404, {"error": "not found"})
+            return
+
+        self.state.count("models")
+        self.state.delay()
+        if self.headers.get("If-None-Match") == self.state.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.state.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, self.state.models_body, headers={"ETag": self.state.etag})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"null")
+        except json.JSONDecodeError:
+            self._json(400, {"error": "invalid JSON"})
+            return
+
+        if isinstance(payload, list) or (isinstance(payload, dict) and "jsonrpc" in payload):
+            self._rpc(payload)
+            return
+
+        endpoint = self._endpoint()
+        if endpoint not in ("/v1/chat/completions", "/v1/images/generations"):
+            self._json(404, {"error": "not found"})
+            return
+        if not isinstance(payload, dict) or not payload.get("model"):
+            self._json(400, {"error": "model is required"})
+            return
+
+        # x402: quote first, serve once a payment signature comes back
+        paid = self.headers.get("PAYMENT-SIGNATURE") or self.headers.get("X-PAYMENT")
+        if not paid:
+            self.state.count("402")
+            self._payment_required(endpoint)
+            return
+
+        self.state.delay()
+        settlement = {"success": True, "transaction": "0x" + "00" * 32, "network": "eip155:8453",
+                      "amount": QUOTE_MICRO_USDC}
+        headers = {"PAYMENT-RESPONSE": _b64json(settlement)}
+        if endpoint == "/v1/chat/completions":
+            self.state.count("chat")
+            self._json(200, self._chat_response(payload), headers=headers)
+        else:
+            self.state.count("image")
+            self._json(200, self._image_response(payload), headers=headers)
+
+    def _payment_required(self, endpoint: str):
+        requirements = {
+            "x402Version": 2,
+            "accepts": [{
+                "scheme": "exact",
+                "network": "eip155:8453",
+                "amount": QUOTE_MICRO_USDC,
+                "asset": USDC_ADDRESS,
+                "payTo": PAY_TO,
+                "maxTimeoutSeconds": 300,
+                "extra": {"name": "USD Coin", "version": "2"},
+            }],
+            "resource": {"url": f"http://stub{endpoint}", "description": "BlockRun stub call"},
+        }
+        self._json(402, {"error": "Payment required"},
+                   headers={"payment-required": _b64json(requirements)})
+
+    @staticmethod
+    def _chat_response(payload: Dict[str, Any]) -> Dict[str, Any]:
+        messages = payload.get("messages") or []
+        prompt = str(messages[-1].get("content", "")) if messages else ""
+        content = f"stub reply to: {prompt[:80]}"
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @staticmethod
+    def _image_response(payload: Dict[str, Any]) -> Dict[str, Any]:
+        url = "data:image/png;base64," + base64.b64encode(PNG_1X1).decode()
+        return {
+            "created": int(time.time()),
+            "data": [{"url": url, "revised_prompt": payload.get("prompt")}
+                     for _ in range(max(1, int(payload.get("n") or 1)))],
+        }
+
+    def _rpc(self, payload: Any):
+        self.state.count("rpc")
+        self.state.delay()
+        if isinstance(payload, list):
+            self._json(200, [self._rpc_result(item) for item in payload])
+        else:
+            self._json(200, self._rpc_result(payload))
+
+    @staticmethod
+    def _rpc_result(request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        if method == "eth_chainId":
+            result = hex(8453)
+        elif method == "eth_blockNumber":
+            result = hex(20_000_000)
+        elif method == "eth_call":
+            result = "0x" + format(int(BALANCE_USDC * 10 ** 6), "064x")
+        else:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+
+def start_stub(port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Start the stub on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one; see server.server_port)
+        latency_ms: Delay added to every served request
+        jitter_ms: Extra random delay of up to this much
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(latency_ms, jitter_ms)
+    threading.Thread(target=server.serve_forever, name="blockrun-stub", daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a local stand-in BlockRun API")
+    parser.add_argument("--port", type=int, default=8700, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay, up to")
+    args = parser.parse_args()
+
+    server = start_stub(args.port, args.latency_ms, args.jitter_ms)
+    url = f"http://127.0.0.1:{server.server_port}"
+    print(f"Stub API on {url}/api (JSON-RPC on {url}/rpc) - Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""
+BlockRun Daemon - Keeps a warm CLI process behind a Unix domain socket.
+
+A fresh ``python run.py`` pays interpreter startup, SDK import, wallet
+loading and a cold TLS handshake before the first request goes out. The
+daemon keeps all of that warm in one long-lived process; run.py forwards
+its arguments over ``~/.blockrun/daemon.sock`` when the daemon is up and
+runs in-process when it is not.
+
+Commands run concurrently, one thread per connection. Each writes to its
+own client through a per-context stdout, and gets the client's working
+directory passed in rather than the daemon chdir-ing for it. A client whose
+BLOCKRUN_* settings differ from the daemon's (another wallet, API URL,
+RPC pool or cache setting) is told so and runs the command itself.
+
+Protocol (one connection per command, newline-delimited JSON):
+    client -> {"argv": [...], "cwd": "/path", "env": "<fingerprint>"}
+              or {"control": "stop"}
+    daemon -> {"out": "text"} ... then {"exit": 0}
+              or {"mismatch": true} before running anything
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, List, Mapping, Optional
+
+
+SOCKET_PATH = Path.home() / ".blockrun" / "daemon.sock"
+
+# Connect timeout for the thin client; a live daemon accepts immediately
+CONNECT_TIMEOUT = 0.2
+
+
+# Settings outside the BLOCKRUN_ prefix that change what a command does
+ENV_KEYS = ("BASE_CHAIN_WALLET_KEY",)
+
+# BLOCKRUN_ variables that only decide whether to use the daemon at all
+IGNORED_ENV_KEYS = ("BLOCKRUN_NO_DAEMON",)
+
+# Output stream of the command running in the current thread (or task)
+_client_stream = contextvars.ContextVar("blockrun_client_stream", default=None)
+
+
+def is_supported() -> bool:
+    """Check whether Unix domain sockets are available on this platform."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def env_fingerprint(environ: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Hash of the environment settings a command depends on.
+
+    The wallet key, API URL, RPC endpoints, cache and budget settings are
+    all read from BLOCKRUN_* variables, so a daemon started under one set
+    must not run commands for a shell holding another. Only a hash is
+    sent over the socket, never the values.
+
+    Args:
+        environ: Environment to fingerprint (default: os.environ)
+
+    Returns:
+        Hex SHA-256 of the relevant variables
+    """
+    environ = os.environ if environ is None else environ
+    relevant = sorted(
+        (key, value) for key, value in environ.items()
+        if (key.startswith("BLOCKRUN_") or key in ENV_KEYS) and key not in IGNORED_ENV_KEYS
+    )
+    return hashlib.sha256(json.dumps(relevant).encode("utf-8")).hexdigest()
+
+
+class _SocketWriter:
+    """File-like object that relays writes to the client as JSON lines."""
+
+    def __init__(self, sock: socket.socket, tty: bool = False):
+        self._sock = sock
+        self._tty = tty
+        self.broken = False
+
+    def write(self, text: str) -> int:
+        if text and not self.broken:
+            try:
+                self._sock.sendall((json.dumps({"out": text}) + "\n").encode("utf-8"))
+            except OSError:
+                # Client went away; keep running the command to completion
+                self.broken = True
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        # Report the client's terminal, so color decisions match it
+        return self._tty
+
+
+class _ContextStream:
+    """
+    Stand-in for sys.stdout/sys.stderr that writes to the current command's
+    client, or to the daemon's own stream outside of a command.
+    """
+
+    def __init__(self, default):
+        self._default = default
+
+    def _target(self):
+        return _client_stream.get() or self._default
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._target().isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Runs one forwarded command per connection."""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            return
+
+        if request.get("control") == "stop":
+            self._reply({"exit": 0})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        if request.get("control") == "ping":
+            self._reply({"exit": 0})
+            return
+
+        if request.get("env") != self.server.env_fingerprint:
+            self._reply({"mismatch": True})
+            return
+
+        cwd = request.get("cwd")
+        if not cwd or not os.path.isdir(cwd):
+            cwd = self.server.home_cwd
+
+        writer = _SocketWriter(self.request, tty=bool(request.get("tty")))
+        # This handler thread's output goes to its own client only
+        _client_stream.set(writer)
+        try:
+            code = self.server.run_command(request.get("argv", []), cwd)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except KeyboardInterrupt:
+            code = 130
+        except Exception as e:
+            print(f"\n  Error: daemon failed to run command: {e}\n")
+            code = 1
+        finally:
+            _client_stream.set(None)
+
+        if not writer.broken:
+            self._reply({"exit": code or 0})
+
+    def _reply(self, message: dict):
+        try:
+            self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        except OSError:
+            pass
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(
+    run_command: Callable[[List[str], str], int],
+    socket_path: Optional[Path] = None,
+    warmup: Optional[Callable[[], None]] = None,
+):
+    """
+    Serve forwarded CLI commands until stopped.
+
+    Args:
+        run_command: Called as run_command(argv, cwd) with the client's
+            arguments and working directory; returns an exit code. Runs
+            concurrently on handler threads, so it must resolve relative
+            paths against cwd instead of changing directory
+        socket_path: Socket location (default: ~/.blockrun/daemon.sock)
+        warmup: Optional function run once before accepting connections
+
+    Raises:
+        RuntimeError: If another daemon is already listening
+    """
+    path = Path(socket_path or SOCKET_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if path.exists():
+        if ping(path):
+            raise RuntimeError(f"Daemon already running on {path}")
+        # Stale socket from a crashed daemon
+        path.unlink()
+
+    if warmup:
+        warmup()
+
+    old_umask = os.umask(0o177)  # socket readable by this user only
+    try:
+        server = _Server(str(path), _Handler)
+    finally:
+        os.umask(old_umask)
+
+    server.run_command = run_command
+    server.home_cwd = os.getcwd()
+    server.env_fingerprint = env_fingerprint()
+
+    saved = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = _ContextStream(sys.stdout), _ContextStream(sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        sys.stdout, sys.stderr = saved
+        server.server_close()
+        with contextlib.suppress(OSError):
+            path.unlink()
+
+
+def _connect(path: Path) -> Optional[socket.socket]:
+    """Open a connection to the daemon, or None if it is not listening."""
+    if not is_supported() or not path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _send(sock: socket.socket, message: dict, on_output: Callable[[str], None]) -> Optional[dict]:
+    """Send one request and relay output until the final message arrives."""
+    with sock, sock.makefile("rb") as replies:
+        sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        for line in replies:
+            reply = json.loads(line.decode("utf-8"))
+            if "out" in reply:
+                on_output(reply["out"])
+            else:
+                return reply
+    return None
+
+
+def _exit_code(reply: Optional[dict]) -> Optional[int]:
+    return reply.get("exit") if reply else None
+
+
+def forward(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """
+    Run a CLI command in the daemon if one is listening.
+
+    Args:
+        argv: Command-line arguments (without the program name)
+        socket_path: Socket location (default: ~/.blockrun/daemon.sock)
+
+    Returns:
+        Exit code of the forwarded command, or None if no daemon accepted
+        the connection or its BLOCKRUN_* settings differ from ours (the
+        caller should then run the command in-process)
+    """
+    sock = _connect(Path(socket_path or SOCKET_PATH))
+    if sock is None:
+        return None
+
+    def write(text: str):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "tty": sys.stdout.isatty(),
+        "env": env_fingerprint(),
+    }
+    try:
+        reply = _send(sock, request, write)
+    except BrokenPipeError:
+        # Our own stdout was closed (e.g. piped into head)
+        return 1
+    except (OSError, ValueError):
+        reply = None
+
+    if reply and reply.get("mismatch"):
+        # Started under other settings; nothing ran, so run it here
+        return None
+
+    code = _exit_code(reply)
+    if code is None:
+        # The command was accepted, so never re-run it in-process: it may
+        # already have been paid for
+        sys.stdout.write("\n  Error: BlockRun daemon exited mid-command\n")
+        return 1
+    return code
+
+
+def ping(socket_path: Optional[Path] = None) -> bool:
+    """Check whether a daemon is listening."""
+    sock = _connect(Path(socket_path or SOCKET_PATH))
+    if sock is None:
+        return False
+    try:
+        return _exit_code(_send(sock, {"control": "ping"}, lambda text: None)) == 0
+    except (OSError, ValueError):
+        return False
+
+
+def stop(socket_path: Optional[Path] = None) -> bool:
+    """
+    Ask a running daemon to shut down.
+
+    Returns:
+        True if a daemon was running and acknowledged
+    """
+    sock = _connect(Path(socket_path or SOCKET_PATH))
+    if sock is None:
+        return False
+    try:
+        return _exit_code(_send(sock, {"control": "stop"}, lambda text: None)) == 0
+    except (OSError, ValueError):
+        return False
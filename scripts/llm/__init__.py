@@ -1,13 +1,41 @@
-"""BlockRun LLM integration modules."""
-
-from .chat import chat, chat_completion
-from .image import generate_image
-from .router import smart_route, get_model_for_task
-
-__all__ = [
-    "chat",
-    "chat_completion",
-    "generate_image",
-    "smart_route",
-    "get_model_for_task",
-]
+"""
+BlockRun LLM integration modules.
+
+Names are imported on first access, so the CLI can use the router without
+loading the chat, retry, asyncio, image and session machinery.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "chat": ".chat",
+    "chat_completion": ".chat",
+    "chat_stream": ".chat",
+    "achat": ".chat",
+    "achat_completion": ".chat",
+    "generate_image": ".image",
+    "agenerate_image": ".image",
+    "download_images": ".image",
+    "smart_route": ".router",
+    "smart_route_batch": ".router",
+    "get_model_for_task": ".router",
+    "BlockRunSession": ".session",
+    "get_default_session": ".session",
+    "AsyncBlockRunSession": ".session",
+    "get_async_session": ".session",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,159 @@
+"""
+BlockRun Batch Module - Concurrent execution of prompt files.
+
+Reads JSONL prompt files lazily, runs them across a bounded worker pool and
+streams one result line per job to an output JSONL file in completion order.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, Optional, Set
+
+
+# Per-line fields a batch job may override
+JOB_FIELDS = ("prompt", "model", "system", "max_tokens", "temperature", "size")
+
+
+def read_jobs(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read batch jobs from a JSONL file, one job per line.
+
+    Each line is a JSON object with a required "prompt" and optional
+    "id", "model", "system", "max_tokens", "temperature" and (for image
+    batches) "size" fields.
+    A bare JSON string is accepted as a prompt. Lines without an "id"
+    are identified by their line number.
+
+    Args:
+        path: Path to the JSONL prompts file
+
+    Yields:
+        Job dicts with "id" plus the fields from JOB_FIELDS that were set
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no prompt
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e.msg})")
+
+            if isinstance(entry, str):
+                entry = {"prompt": entry}
+            if not isinstance(entry, dict) or not entry.get("prompt"):
+                raise ValueError(f"{path}:{line_no}: missing \"prompt\"")
+
+            job = {"id": str(entry.get("id", line_no))}
+            for field in JOB_FIELDS:
+                if entry.get(field) is not None:
+                    job[field] = entry[field]
+            yield job
+
+
+def read_completed_ids(path: str) -> Set[str]:
+    """
+    Collect IDs of jobs that already succeeded in an output file.
+
+    Failed jobs (lines with an "error") are not included, so a resumed
+    batch retries them.
+
+    Args:
+        path: Path to a previous batch output JSONL file
+
+    Returns:
+        Set of completed job IDs (empty if the file does not exist)
+    """
+    completed = set()
+    if not Path(path).exists():
+        return completed
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial line from an interrupted run
+                continue
+            if isinstance(entry, dict) and "id" in entry and not entry.get("error"):
+                completed.add(str(entry["id"]))
+
+    return completed
+
+
+def run_batch(
+    jobs: Iterator[Dict[str, Any]],
+    call: Callable[[Dict[str, Any]], Dict[str, Any]],
+    *,
+    output_path: str,
+    workers: int = 4,
+    skip_ids: Optional[Set[str]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, int]:
+    """
+    Run jobs concurrently, appending each result to a JSONL file.
+
+    At most ``workers * 2`` jobs are held in memory at once, so arbitrarily
+    large prompt files can be processed. Results are written and flushed as
+    soon as each job finishes.
+
+    Args:
+        jobs: Iterable of job dicts (see read_jobs)
+        call: Function executing one job and returning its result dict
+        output_path: JSONL file results are appended to
+        workers: Number of concurrent workers
+        skip_ids: Job IDs to skip (e.g. from read_completed_ids)
+        should_stop: Checked before each dispatch; stops submitting new
+            jobs once it returns True (in-flight jobs still finish)
+        on_result: Optional callback invoked with every result dict
+
+    Returns:
+        Dict with "succeeded", "failed", "skipped" and "stopped" counts
+    """
+    skip_ids = skip_ids or set()
+    workers = max(1, workers)
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0, "stopped": 0}
+    write_lock = threading.Lock()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def handle(future):
+            result = future.result()
+            with write_lock:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+            counts["failed" if result.get("error") else "succeeded"] += 1
+            if on_result:
+                on_result(result)
+
+        pending = set()
+        for job in jobs:
+            if job["id"] in skip_ids:
+                counts["skipped"] += 1
+                continue
+
+            if should_stop and should_stop():
+                counts["stopped"] = 1
+                break
+
+            # Bound the number of queued jobs
+            while len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle(future)
+
+            pending.add(executor.submit(call, job))
+
+        for future in wait(pending).done:
+            handle(future)
+
+    return counts
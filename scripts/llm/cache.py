@@ -0,0 +1,249 @@
+"""
+BlockRun Response Cache - Content-addressed cache for chat completions.
+
+Stores completed responses in a single SQLite file (~/.blockrun/cache.sqlite)
+keyed by a hash of every parameter that influences the answer. Repeating an
+identical request is served locally at no cost.
+
+Entries expire after a per-entry TTL and the file is kept under a size and
+entry budget by evicting the least recently used entries first.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+
+CACHE_FILE = Path.home() / ".blockrun" / "cache.sqlite"
+
+DEFAULT_TTL = 24 * 3600              # 1 day
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB of stored responses
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    *,
+    system: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+) -> str:
+    """
+    Build the cache key for a chat request.
+
+    A separate system prompt is folded into the message list first, so
+    chat(prompt, system=...) and chat_completion() with the equivalent
+    messages share a key.
+
+    Args:
+        model: Model ID
+        messages: List of message dicts with 'role' and 'content'
+        system: Optional system prompt not already in messages
+        max_tokens: Maximum tokens to generate
+        temperature: Sampling temperature
+        top_p: Nucleus sampling parameter
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    if system:
+        messages = [{"role": "system", "content": system}] + list(messages)
+
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL, LRU and size-based eviction."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Open (or create) a response cache.
+
+        Args:
+            path: SQLite file location (default: ~/.blockrun/cache.sqlite)
+            ttl: Default time-to-live for new entries, in seconds
+            max_bytes: Total stored payload size before LRU eviction
+            max_entries: Number of entries before LRU eviction
+        """
+        self.path = Path(path) if path else CACHE_FILE
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                expires REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Stored response dict, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires = row
+            if expires <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, key: str, model: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        """
+        Store a response and evict old entries if over budget.
+
+        Args:
+            key: Cache key from make_cache_key
+            model: Model ID (kept for inspection)
+            value: JSON-serializable response dict
+            ttl: Time-to-live in seconds (default: cache-wide ttl)
+        """
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, value, size, created, last_access, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, payload, len(payload), now, now, expires),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones over budget."""
+        self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk entries oldest-access first until both budgets are met
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> int:
+        """
+        Remove all entries.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM responses").rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache size information.
+
+        Returns:
+            Dict with "entries" and "bytes"
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": total}
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """
+    Get the process-wide cache at ~/.blockrun/cache.sqlite.
+
+    Returns:
+        Shared ResponseCache instance
+    """
+    global _default_cache
+
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
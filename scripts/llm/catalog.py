@@ -0,0 +1,277 @@
+"""
+BlockRun Model Catalog - Disk-cached model list.
+
+The model list (with pricing) is served from ~/.blockrun/models.json.
+Once the copy is older than CATALOG_TTL it is still returned immediately,
+while a background request revalidates it with If-None-Match; an unchanged
+catalog costs the server a 304 and no body. Because the list is local,
+--model can be checked before any paid request is made.
+"""
+
+import atexit
+import difflib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Set
+
+
+CATALOG_FILE = Path.home() / ".blockrun" / "models.json"
+
+# Seconds a fetched catalog is served without revalidating
+CATALOG_TTL = 3600.0
+
+FETCH_TIMEOUT = 30.0
+
+# How long a short-lived CLI process waits at exit for a background refresh
+REFRESH_GRACE = 3.0
+
+
+class ModelCatalog:
+    """
+    Model list cached on disk, revalidated with ETags.
+
+    Safe to share between threads. Every method works offline as long as
+    a catalog was fetched once before.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        api_url: Optional[str] = None,
+        ttl: float = CATALOG_TTL,
+    ):
+        """
+        Open the catalog cache.
+
+        Args:
+            path: JSON file location (default: ~/.blockrun/models.json)
+            api_url: API endpoint (default: BLOCKRUN_API_URL or https://blockrun.ai/api)
+            ttl: Seconds before a cached catalog is revalidated
+        """
+        self.path = Path(path) if path else CATALOG_FILE
+        self.api_url = (
+            api_url or os.environ.get("BLOCKRUN_API_URL") or "https://blockrun.ai/api"
+        ).rstrip("/")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing: Optional[threading.Thread] = None
+        self._mtime: Optional[float] = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._ids: Set[str] = set()
+
+    @property
+    def url(self) -> str:
+        return f"{self.api_url}/v1/models"
+
+    def _load(self):
+        """Read the cache file if it changed since the last read (lock held)."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            data = json.loads(self.path.read_text())
+            models = data["models"]
+        except (json.JSONDecodeError, OSError, KeyError, TypeError):
+            # Corrupted file - fetch a fresh copy
+            data, models = None, []
+        if data is not None and data.get("url") != self.url:
+            # Catalog of a different API endpoint
+            data, models = None, []
+        self._data = data
+        self._ids = {m.get("id") for m in models if isinstance(m, dict)}
+        self._mtime = mtime
+
+    def _save(self, data: Dict[str, Any]):
+        """Atomic save to prevent corruption (lock held)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self._data = data
+        self._ids = {m.get("id") for m in data["models"] if isinstance(m, dict)}
+        self._mtime = self.path.stat().st_mtime
+
+    def _fresh(self) -> bool:
+        return self._data is not None and time.time() - self._data.get("fetched", 0) < self.ttl
+
+    def revalidate(self):
+        """
+        Fetch the catalog now, sending the cached ETag if there is one.
+
+        Raises:
+            Exception: If the request fails (the cached copy is kept)
+        """
+        import httpx
+
+        with self._lock:
+            self._load()
+            etag = self._data.get("etag") if self._data else None
+
+        headers = {"If-None-Match": etag} if etag else {}
+        with httpx.Client(timeout=FETCH_TIMEOUT) as client:
+            response = client.get(self.url, headers=headers)
+
+        with self._lock:
+            if response.status_code == 304 and self._data is not None:
+                data = dict(self._data, fetched=time.time())
+            elif response.status_code == 200:
+                data = {
+                    "url": self.url,
+                    "etag": response.headers.get("etag"),
+                    "fetched": time.time(),
+                    "models": response.json().get("data", []),
+                }
+            else:
+                raise RuntimeError(f"API error: {response.status_code}")
+            self._save(data)
+
+    def _refresh_in_background(self):
+        """Start one background revalidation unless one is running (lock held)."""
+        if self._refreshing is not None and self._refreshing.is_alive():
+            return
+
+        def run():
+            try:
+                self.revalidate()
+            except Exception:
+                # Keep serving the stale copy; the next read tries again
+                pass
+
+        self._refreshing = threading.Thread(target=run, name="blockrun-catalog", daemon=True)
+        self._refreshing.start()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for a running background refresh to finish."""
+        thread = self._refreshing
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_models(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get every model in the catalog (chat, image and others).
+
+        A cached copy is returned straight away, revalidating it in the
+        background once stale. Only the very first call (or refresh=True)
+        waits for the network.
+
+        Args:
+            refresh: Revalidate before returning
+
+        Returns:
+            List of model dicts as returned by /v1/models
+
+        Raises:
+            Exception: If nothing is cached and the catalog cannot be fetched
+        """
+        with self._lock:
+            self._load()
+            cached = self._data
+
+        if cached is None or refresh:
+            try:
+                self.revalidate()
+            except Exception:
+                if cached is None:
+                    raise
+        else:
+            with self._lock:
+                if not self._fresh():
+                    self._refresh_in_background()
+
+        with self._lock:
+            return list(self._data["models"])
+
+    def get_model(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up one model's catalog entry (pricing, categories, ...).
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Model dict, or None if unknown or nothing is cached
+        """
+        with self._lock:
+            self._load()
+            if self._data is None:
+                return None
+            for model in self._data["models"]:
+                if model.get("id") == model_id:
+                    return model
+        return None
+
+    def check(self, model_id: str) -> Optional[List[str]]:
+        """
+        Check a model ID against the cached catalog, without network access
+        unless the ID is unknown and the cache is stale.
+
+        A stale catalog may predate a newly added model, so an unknown ID
+        triggers one revalidation before it is rejected.
+
+        Args:
+            model_id: Model ID to check
+
+        Returns:
+            None if the model exists (or there is no catalog to check
+            against), otherwise a list of close matches, best first
+        """
+        with self._lock:
+            self._load()
+            if self._data is None or model_id in self._ids:
+                return None
+            fresh = self._fresh()
+
+        if not fresh:
+            try:
+                self.revalidate()
+            except Exception:
+                pass
+            with self._lock:
+                if model_id in self._ids:
+                    return None
+
+        with self._lock:
+            ids = sorted(i for i in self._ids if i)
+        # Also match on the bare name, so "gpt-5" finds "openai/gpt-5.2"
+        by_name = {i.split("/", 1)[-1]: i for i in ids}
+        matches = difflib.get_close_matches(model_id, ids, n=3, cutoff=0.6)
+        for name in difflib.get_close_matches(model_id.split("/", 1)[-1], list(by_name), n=3, cutoff=0.6):
+            if by_name[name] not in matches:
+                matches.append(by_name[name])
+        return matches[:3]
+
+
+_default_catalog: Optional[ModelCatalog] = None
+_default_lock = threading.Lock()
+
+
+def get_catalog() -> ModelCatalog:
+    """
+    Get the process-wide catalog at ~/.blockrun/models.json.
+
+    Returns:
+        Shared ModelCatalog instance
+    """
+    global _default_catalog
+
+    with _default_lock:
+        if _default_catalog is None:
+            _default_catalog = ModelCatalog()
+            # Let a refresh started by a one-shot command land before exit
+            atexit.register(_default_catalog.wait, REFRESH_GRACE)
+        return _default_catalog
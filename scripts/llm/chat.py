@@ -2,18 +2,47 @@
 BlockRun Chat Module - LLM chat completion wrapper.
 
 Provides high-level chat functions that wrap the blockrun_llm SDK
-with additional features like smart routing and branded output.
+with additional features like smart routing and branded output. achat and
+achat_completion are coroutine versions for asyncio applications.
 """
 
-from typing import Optional, List, Dict, Any
+import asyncio
+import importlib.util
+import time
+from typing import Optional, List, Dict, Any, Union, Iterator, Tuple
 
-try:
-    from blockrun_llm import LLMClient, ChatResponse, APIError, PaymentError
-    HAS_SDK = True
-except ImportError:
-    HAS_SDK = False
+HAS_SDK = importlib.util.find_spec("blockrun_llm") is not None
 
-from .router import smart_route
+from .latency import get_latency_tracker
+from .retry import DEFAULT_POLICY, RetryPolicy, is_retryable
+from .router import route_candidates, smart_route
+from .session import (
+    AsyncBlockRunSession,
+    BlockRunSession,
+    get_async_session,
+    get_default_session,
+)
+from .singleflight import get_singleflight
+
+
+def _resolve_cache(cache: Union[bool, "ResponseCache", None]) -> Optional["ResponseCache"]:
+    """Map the cache= argument to a ResponseCache (True means the default cache)."""
+    if cache is True:
+        from .cache import get_default_cache
+        return get_default_cache()
+    return cache or None
+
+
+def response_to_dict(response: "ChatResponse") -> Dict[str, Any]:
+    """Serialize a ChatResponse for caching (pydantic v1 and v2)."""
+    dump = getattr(response, "model_dump", None) or response.dict
+    return dump()
+
+
+def response_from_dict(data: Dict[str, Any]) -> "ChatResponse":
+    """Rebuild a ChatResponse from response_to_dict output."""
+    from blockrun_llm import ChatResponse
+    return ChatResponse(**data)
 
 
 def chat(
@@ -26,10 +55,15 @@ def chat(
     max_tokens: int = 1024,
     temperature: Optional[float] = None,
     private_key: Optional[str] = None,
+    session: Optional[BlockRunSession] = None,
+    cache: Union[bool, "ResponseCache"] = False,
 ) -> str:
     """
     Simple 1-line chat interface with smart routing.
 
+    When the model is chosen by routing, timeouts and provider errors
+    fall through to equivalent models (see route_candidates).
+
     Args:
         prompt: User message
         model: Specific model ID (overrides smart routing)
@@ -39,6 +73,8 @@ def chat(
         max_tokens: Maximum tokens to generate
         temperature: Sampling temperature
         private_key: Override environment variable
+        session: Client session to reuse (default: process-wide session)
+        cache: True or a ResponseCache to serve identical requests locally
 
     Returns:
         Assistant's response text
@@ -53,23 +89,34 @@ def chat(
             "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
         )
 
-    # Determine model via smart routing if not specified
-    selected_model = model or smart_route(prompt, cheap=cheap, fast=fast)
+    # Determine model via smart routing if not specified; a routed model
+    # that fails falls through to equivalent ones, a requested one never does
+    candidates = [model] if model else route_candidates(smart_route(prompt, cheap=cheap, fast=fast))
 
-    # Create client and execute
-    client = LLMClient(private_key=private_key) if private_key else LLMClient()
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
 
-    try:
-        response = client.chat(
-            model=selected_model,
-            prompt=prompt,
-            system=system,
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
-        return response
-    finally:
-        client.close()
+    for index, candidate in enumerate(candidates):
+        last = index == len(candidates) - 1
+        try:
+            response = chat_completion(
+                candidate,
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                private_key=private_key,
+                session=session,
+                cache=cache,
+                # Only the last candidate waits out backoffs
+                retry=DEFAULT_POLICY if last else None,
+            )
+        except Exception as e:
+            if last or not is_retryable(e):
+                raise
+            continue
+        return response.choices[0].message.content
 
 
 def chat_completion(
@@ -80,10 +127,21 @@ def chat_completion(
     temperature: Optional[float] = None,
     top_p: Optional[float] = None,
     private_key: Optional[str] = None,
-) -> "ChatResponse":
+    session: Optional[BlockRunSession] = None,
+    cache: Union[bool, "ResponseCache"] = False,
+    cache_ttl: Optional[float] = None,
+    coalesce: bool = True,
+    retry: Optional[RetryPolicy] = DEFAULT_POLICY,
+    with_leader: bool = False,
+) -> Union["ChatResponse", Tuple["ChatResponse", bool]]:
     """
     Full chat completion interface (OpenAI-compatible).
 
+    Identical requests for the same wallet made concurrently from several
+    threads share one upstream call (and one payment) unless coalesce is
+    False. Timeouts, 429 and 5xx replies are retried with backoff
+    according to retry.
+
     Args:
         model: Model ID
         messages: List of message dicts with 'role' and 'content'
@@ -91,9 +149,18 @@ def chat_completion(
         temperature: Sampling temperature
         top_p: Nucleus sampling parameter
         private_key: Override environment variable
+        session: Client session to reuse (default: process-wide session)
+        cache: True or a ResponseCache to serve identical requests locally
+        cache_ttl: Time-to-live for a newly cached response, in seconds
+        coalesce: Share the upstream call with identical in-flight requests
+        retry: Retry policy for transient failures (None: a single try)
+        with_leader: Also return whether this call made (and paid for) the
+            upstream request; False when the response came from the cache
+            or from another caller's identical request
 
     Returns:
-        ChatResponse object with choices and usage
+        ChatResponse object with choices and usage, or a tuple of
+        (ChatResponse, leader) with with_leader
 
     Raises:
         ImportError: If blockrun_llm SDK not installed
@@ -105,26 +172,345 @@ def chat_completion(
             "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
         )
 
-    client = LLMClient(private_key=private_key) if private_key else LLMClient()
+    response_cache = _resolve_cache(cache)
+    key = None
+    if response_cache or coalesce:
+        from .cache import make_cache_key
+        key = make_cache_key(
+            model, messages, max_tokens=max_tokens, temperature=temperature, top_p=top_p
+        )
+    if response_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            response = response_from_dict(cached)
+            return (response, False) if with_leader else response
+
+    client = (session or get_default_session()).llm_client(private_key)
 
-    try:
-        return client.chat_completion(
+    def attempt():
+        started = time.perf_counter()
+        response = client.chat_completion(
             model=model,
             messages=messages,
             max_tokens=max_tokens,
             temperature=temperature,
             top_p=top_p,
         )
-    finally:
-        client.close()
+        get_latency_tracker().observe(model, time.perf_counter() - started)
+        return response
+
+    def call():
+        response = retry.call(attempt) if retry else attempt()
+
+        if response_cache:
+            response_cache.put(key, model, response_to_dict(response), ttl=cache_ttl)
+        return response
+
+    if not coalesce:
+        response, leader = call(), True
+    else:
+        # Keyed per wallet too, so one wallet never pays for another's request
+        response, leader = get_singleflight().do((private_key, key), call)
+    return (response, leader) if with_leader else response
+
+
+async def achat(
+    prompt: str,
+    *,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    cheap: bool = False,
+    fast: bool = False,
+    max_tokens: int = 1024,
+    temperature: Optional[float] = None,
+    private_key: Optional[str] = None,
+    session: Optional[AsyncBlockRunSession] = None,
+    cache: Union[bool, "ResponseCache"] = False,
+) -> str:
+    """
+    Coroutine version of chat().
+
+    Args:
+        prompt: User message
+        model: Specific model ID (overrides smart routing)
+        system: Optional system prompt
+        cheap: Prefer cost-effective models
+        fast: Prefer low-latency models
+        max_tokens: Maximum tokens to generate
+        temperature: Sampling temperature
+        private_key: Override environment variable
+        session: Async session to use (default: the running loop's session)
+        cache: True or a ResponseCache to serve identical requests locally
+
+    Returns:
+        Assistant's response text
+
+    Raises:
+        ImportError: If blockrun_llm SDK not installed
+        PaymentError: If payment fails
+        APIError: If API request fails
+
+    Example:
+        answers = await asyncio.gather(*(achat(p, cheap=True) for p in prompts))
+    """
+    if not HAS_SDK:
+        raise ImportError(
+            "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
+        )
 
+    candidates = [model] if model else route_candidates(smart_route(prompt, cheap=cheap, fast=fast))
 
-def list_models(private_key: Optional[str] = None) -> List[Dict[str, Any]]:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    for index, candidate in enumerate(candidates):
+        last = index == len(candidates) - 1
+        try:
+            response = await achat_completion(
+                candidate,
+                messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                private_key=private_key,
+                session=session,
+                cache=cache,
+                retry=DEFAULT_POLICY if last else None,
+            )
+        except Exception as e:
+            if last or not is_retryable(e):
+                raise
+            continue
+        return response.choices[0].message.content
+
+
+async def achat_completion(
+    model: str,
+    messages: List[Dict[str, str]],
+    *,
+    max_tokens: int = 1024,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    private_key: Optional[str] = None,
+    session: Optional[AsyncBlockRunSession] = None,
+    cache: Union[bool, "ResponseCache"] = False,
+    cache_ttl: Optional[float] = None,
+    coalesce: bool = True,
+    retry: Optional[RetryPolicy] = DEFAULT_POLICY,
+) -> "ChatResponse":
+    """
+    Coroutine version of chat_completion().
+
+    The request waits for one of the session's concurrency slots, so any
+    number of calls can be gathered at once. Identical requests in flight
+    together share one upstream call unless coalesce is False. Cancelling
+    the awaiting task cancels the HTTP request (and frees its slot) unless
+    another caller is still waiting for the same response. With a
+    RetryPolicy(hedge=True), a try that outlasts the model's p95 latency
+    is raced against a duplicate request.
+
+    Args:
+        model: Model ID
+        messages: List of message dicts with 'role' and 'content'
+        max_tokens: Maximum tokens to generate
+        temperature: Sampling temperature
+        top_p: Nucleus sampling parameter
+        private_key: Override environment variable
+        session: Async session to use (default: the running loop's session)
+        cache: True or a ResponseCache to serve identical requests locally
+        cache_ttl: Time-to-live for a newly cached response, in seconds
+        coalesce: Share the upstream call with identical in-flight requests
+        retry: Retry (and hedging) policy for transient failures (None: a single try)
+
+    Returns:
+        ChatResponse object with choices and usage
+
+    Raises:
+        ImportError: If blockrun_llm SDK not installed
+        PaymentError: If payment fails
+        APIError: If API request fails
+    """
+    if not HAS_SDK:
+        raise ImportError(
+            "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
+        )
+
+    response_cache = _resolve_cache(cache)
+    key = None
+    if response_cache or coalesce:
+        from .cache import make_cache_key
+        key = make_cache_key(
+            model, messages, max_tokens=max_tokens, temperature=temperature, top_p=top_p
+        )
+    if response_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return response_from_dict(cached)
+
+    session = session or get_async_session()
+    client = session.llm_client(private_key)
+
+    async def attempt():
+        async with session.limiter:
+            started = time.perf_counter()
+            response = await client.chat_completion(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+            )
+        # Off the event loop: loading or flushing the latency file is disk I/O
+        elapsed = time.perf_counter() - started
+        asyncio.get_running_loop().run_in_executor(
+            None, lambda: get_latency_tracker().observe(model, elapsed)
+        )
+        return response
+
+    async def call():
+        response = await (retry.acall(attempt, model=model) if retry else attempt())
+
+        if response_cache:
+            response_cache.put(key, model, response_to_dict(response), ttl=cache_ttl)
+        return response
+
+    if not coalesce:
+        return await call()
+    return await session.coalesce((private_key, key), call)
+
+
+class ChatStream:
+    """
+    Iterator over streamed response text that also measures the stream.
+
+    Iterate it to receive text deltas as they arrive. Once exhausted,
+    ``ttft`` (seconds to the first token), ``elapsed``, ``usage`` (when
+    the provider reports it), ``output_tokens`` and ``tokens_per_sec``
+    describe the completed stream, and ``ttfb`` is the time to the first
+    chunk of any kind. Completed streams feed the latency tracker used by
+    fast routing.
+    """
+
+    def __init__(self, chunks: Iterator[Any], model: str):
+        self._chunks = chunks
+        self.model = model
+        self.ttfb: Optional[float] = None
+        self.ttft: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.usage = None
+        self.deltas = 0
+
+    def __iter__(self) -> Iterator[str]:
+        # The request is only sent on the first pull, so time from here
+        started = time.perf_counter()
+        for chunk in self._chunks:
+            if self.ttfb is None:
+                self.ttfb = time.perf_counter() - started
+            if getattr(chunk, "usage", None):
+                self.usage = chunk.usage
+            for choice in chunk.choices:
+                delta = getattr(choice, "delta", None)
+                text = getattr(delta, "content", None) if delta is not None else None
+                if not text:
+                    continue
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - started
+                self.deltas += 1
+                yield text
+        self.elapsed = time.perf_counter() - started
+        get_latency_tracker().observe(self.model, self.elapsed, ttft=self.ttft)
+
+    @property
+    def output_tokens(self) -> int:
+        """Completion tokens (provider usage, else one per streamed delta)."""
+        if self.usage is not None:
+            return self.usage.completion_tokens
+        return self.deltas
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Generation throughput after the first token."""
+        if self.elapsed is None or self.ttft is None:
+            return None
+        generating = self.elapsed - self.ttft
+        return self.output_tokens / generating if generating > 0 else None
+
+
+def chat_stream(
+    prompt: str,
+    *,
+    model: Optional[str] = None,
+    system: Optional[str] = None,
+    cheap: bool = False,
+    fast: bool = False,
+    max_tokens: int = 1024,
+    temperature: Optional[float] = None,
+    search: bool = False,
+    private_key: Optional[str] = None,
+    session: Optional[BlockRunSession] = None,
+) -> ChatStream:
+    """
+    Streaming chat interface with smart routing.
+
+    Args:
+        prompt: User message
+        model: Specific model ID (overrides smart routing)
+        system: Optional system prompt
+        cheap: Prefer cost-effective models
+        fast: Prefer low-latency models
+        max_tokens: Maximum tokens to generate
+        temperature: Sampling temperature
+        search: Enable xAI Live Search
+        private_key: Override environment variable
+        session: Client session to reuse (default: process-wide session)
+
+    Returns:
+        ChatStream yielding text deltas as they arrive
+
+    Raises:
+        ImportError: If blockrun_llm SDK not installed
+        PaymentError: If payment fails
+        APIError: If API request fails
+
+    Example:
+        for text in chat_stream("Explain x402"):
+            print(text, end="", flush=True)
+    """
+    if not HAS_SDK:
+        raise ImportError(
+            "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
+        )
+
+    selected_model = model or smart_route(prompt, cheap=cheap, fast=fast)
+
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    client = (session or get_default_session()).llm_client(private_key)
+
+    chunks = client.chat_completion_stream(
+        model=selected_model,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        search=search,
+    )
+    return ChatStream(chunks, selected_model)
+
+
+def list_models(
+    private_key: Optional[str] = None,
+    session: Optional[BlockRunSession] = None,
+) -> List[Dict[str, Any]]:
     """
     List available models with pricing.
 
     Args:
         private_key: Override environment variable
+        session: Client session to reuse (default: process-wide session)
 
     Returns:
         List of model information dicts
@@ -134,9 +520,6 @@ def list_models(private_key: Optional[str] = None) -> List[Dict[str, Any]]:
             "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
         )
 
-    client = LLMClient(private_key=private_key) if private_key else LLMClient()
+    client = (session or get_default_session()).llm_client(private_key)
 
-    try:
-        return client.list_models()
-    finally:
-        client.close()
+    return client.list_models()
@@ -0,0 +1,150 @@
+"""
+BlockRun Cost Module - Local pre-call cost estimates.
+
+Estimates what a chat call can cost before it is sent, from the model's
+$/M-token pricing in the cached catalog (see catalog.py) and a quick
+token count of the prompt. The upper bound assumes the reply uses all of
+max_tokens, which is also what lets --max-cost lower max_tokens to fit.
+"""
+
+import math
+from typing import Optional, List, Dict, Any
+
+from .catalog import get_catalog
+
+# Rough English-text average; errs high for code and low for CJK text
+CHARS_PER_TOKEN = 4
+
+# Chat formatting tokens added around every message
+TOKENS_PER_MESSAGE = 4
+
+# Replies shorter than this are not worth paying for
+MIN_OUTPUT_TOKENS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the token count of a text without a tokenizer.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Estimated number of tokens
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def get_pricing(model: str, fetch: bool = False) -> Optional[Dict[str, float]]:
+    """
+    Get a model's prices from the catalog.
+
+    Both the nested ``pricing.input``/``pricing.output`` shape and the
+    older top-level ``inputPrice``/``outputPrice`` shape are understood.
+
+    Args:
+        model: Model ID
+        fetch: Download the catalog if none is cached yet
+
+    Returns:
+        Dict with "input" and "output" ($ per million tokens) and "flat"
+        ($ per request), or None if the model's pricing is unknown
+    """
+    catalog = get_catalog()
+    entry = catalog.get_model(model)
+    if entry is None and fetch:
+        try:
+            catalog.get_models()
+        except Exception:
+            return None
+        entry = catalog.get_model(model)
+    if entry is None:
+        return None
+
+    block = entry.get("pricing") or {}
+    input_price = block.get("input", entry.get("inputPrice"))
+    output_price = block.get("output", entry.get("outputPrice"))
+    if input_price is None and output_price is None and not block.get("flat"):
+        return None
+    return {
+        "input": float(input_price or 0.0),
+        "output": float(output_price or 0.0),
+        "flat": float(block.get("flat", entry.get("flatPrice")) or 0.0),
+    }
+
+
+def estimate_cost(
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: int,
+    pricing: Optional[Dict[str, float]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Estimate the cost of a chat call.
+
+    Args:
+        model: Model ID
+        messages: List of message dicts with 'role' and 'content'
+        max_tokens: Maximum tokens the reply may use
+        pricing: Prices to use (default: get_pricing(model))
+
+    Returns:
+        Dict with "input_tokens", "input_cost" (prompt and flat fee only)
+        and "max_cost" (if the reply uses all of max_tokens), or None if
+        the model's pricing is unknown
+    """
+    pricing = pricing or get_pricing(model)
+    if pricing is None:
+        return None
+
+    input_tokens = sum(
+        estimate_tokens(str(m.get("content") or "")) + TOKENS_PER_MESSAGE for m in messages
+    )
+    input_cost = pricing["flat"] + input_tokens * pricing["input"] / 1e6
+    return {
+        "input_tokens": input_tokens,
+        "input_cost": input_cost,
+        "max_cost": input_cost + max_tokens * pricing["output"] / 1e6,
+    }
+
+
+def fit_max_tokens(
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: int,
+    max_cost: float,
+) -> Optional[int]:
+    """
+    Largest max_tokens (up to the one requested) whose worst case fits a cap.
+
+    Args:
+        model: Model ID
+        messages: List of message dicts with 'role' and 'content'
+        max_tokens: Requested maximum reply length
+        max_cost: Most the call may cost, in USD
+
+    Returns:
+        max_tokens to send, or None if even a minimal reply would exceed
+        the cap or the model's pricing is unknown
+    """
+    pricing = get_pricing(model, fetch=True)
+    estimate = estimate_cost(model, messages, max_tokens, pricing)
+    if estimate is None:
+        return None
+    if estimate["max_cost"] <= max_cost:
+        return max_tokens
+
+    if pricing["output"] <= 0:
+        return None
+    affordable = int((max_cost - estimate["input_cost"]) * 1e6 / pricing["output"])
+    return affordable if affordable >= MIN_OUTPUT_TOKENS else None
+
+
+def format_usd(amount: float) -> str:
+    """Dollar amount with enough decimals to show sub-cent prices."""
+    return f"${amount:.6f}" if amount < 0.01 else f"${amount:.4f}"
+
+
+def format_estimate(estimate: Dict[str, Any]) -> str:
+    """Header text for an estimate, e.g. "$0.000021-$0.0103"."""
+    return f"{format_usd(estimate['input_cost'])}-{format_usd(estimate['max_cost'])}"
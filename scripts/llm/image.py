@@ -1,17 +1,32 @@
 """
 BlockRun Image Module - Image generation wrapper.
 
-Provides high-level image generation functions that wrap the blockrun_llm SDK.
+Provides high-level image generation functions that wrap the blockrun_llm SDK,
+and retrieval of the generated images: every returned URL is downloaded
+concurrently in chunks over one pooled connection (data: URLs are decoded
+piecewise), checked to really be an image, and written atomically.
 """
 
-from typing import Optional
+import asyncio
+import base64
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional, List, Union
 
-try:
-    from blockrun_llm import ImageClient, ImageResponse, APIError, PaymentError
-    HAS_SDK = True
-except ImportError:
-    HAS_SDK = False
+HAS_SDK = importlib.util.find_spec("blockrun_llm") is not None
 
+from .session import (
+    AsyncBlockRunSession,
+    BlockRunSession,
+    get_async_session,
+    get_default_session,
+)
 
 # Available image models
 IMAGE_MODELS = {
@@ -23,6 +38,30 @@ IMAGE_MODELS = {
 
 DEFAULT_MODEL = "google/nano-banana"
 
+# Models that return several images from one request; for the rest, n > 1
+# is fanned out into parallel single-image requests
+MULTI_IMAGE_MODELS = {"openai/gpt-image-1", "openai/gpt-image-2"}
+
+# Bytes read (or base64 characters decoded) at a time; a multiple of 4
+CHUNK_SIZE = 64 * 1024
+
+DOWNLOAD_TIMEOUT = 60.0
+
+# Leading bytes of the formats image models return
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
 
 def generate_image(
     prompt: str,
@@ -31,6 +70,8 @@ def generate_image(
     size: str = "1024x1024",
     n: int = 1,
     private_key: Optional[str] = None,
+    session: Optional[BlockRunSession] = None,
+    client: Optional[Any] = None,
 ) -> "ImageResponse":
     """
     Generate an image from a text prompt.
@@ -41,6 +82,9 @@ def generate_image(
         size: Image size (default: 1024x1024)
         n: Number of images to generate (default: 1)
         private_key: Override environment variable
+        session: Client session to reuse (default: process-wide session)
+        client: ImageClient to send through instead of the session's, e.g.
+            one from session.acquire("image")
 
     Returns:
         ImageResponse with generated image URLs/data
@@ -62,17 +106,83 @@ def generate_image(
     # Resolve model alias if provided
     selected_model = IMAGE_MODELS.get(model, model) if model else DEFAULT_MODEL
 
-    client = ImageClient(private_key=private_key) if private_key else ImageClient()
+    client = client or (session or get_default_session()).image_client(private_key)
 
-    try:
+    if n <= 1 or selected_model in MULTI_IMAGE_MODELS:
         return client.generate(
             prompt=prompt,
             model=selected_model,
             size=size,
             n=n,
         )
-    finally:
-        client.close()
+
+    return _fan_out(client, prompt, selected_model, size, n)
+
+
+def _fan_out(client, prompt: str, model: str, size: str, n: int) -> "ImageResponse":
+    """
+    Generate n images with n parallel single-image requests.
+
+    Requests that succeed are paid for, so a partial result is returned
+    rather than discarded; only if every request fails is the error raised.
+    """
+    def one(_):
+        try:
+            return client.generate(prompt=prompt, model=model, size=size, n=1)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        results = list(pool.map(one, range(n)))
+
+    responses = [r for r in results if not isinstance(r, Exception)]
+    if not responses:
+        raise results[0]
+
+    first = responses[0]
+    return type(first)(
+        created=first.created,
+        data=[image for response in responses for image in response.data],
+    )
+
+
+async def agenerate_image(
+    prompt: str,
+    *,
+    model: Optional[str] = None,
+    size: str = "1024x1024",
+    n: int = 1,
+    private_key: Optional[str] = None,
+    session: Optional[AsyncBlockRunSession] = None,
+) -> "ImageResponse":
+    """
+    Coroutine version of generate_image().
+
+    The SDK has no async image client, so the request runs on the loop's
+    default executor with the pooled ImageClient, after taking one of the
+    async session's concurrency slots. Cancelling the awaiting task stops
+    the wait, but a request already sent still completes (and is paid for).
+
+    Args:
+        prompt: Text description of the image to generate
+        model: Model ID (default: google/nano-banana)
+        size: Image size (default: 1024x1024)
+        n: Number of images to generate (default: 1)
+        private_key: Override environment variable
+        session: Async session whose limit applies (default: the running loop's session)
+
+    Returns:
+        ImageResponse with generated image URLs/data
+
+    Raises:
+        ImportError: If blockrun_llm SDK not installed
+        PaymentError: If payment fails
+        APIError: If API request fails
+    """
+    session = session or get_async_session()
+    call = partial(generate_image, prompt, model=model, size=size, n=n, private_key=private_key)
+    async with session.limiter:
+        return await asyncio.get_running_loop().run_in_executor(None, call)
 
 
 def get_image_url(
@@ -81,6 +191,7 @@ def get_image_url(
     model: Optional[str] = None,
     size: str = "1024x1024",
     private_key: Optional[str] = None,
+    session: Optional[BlockRunSession] = None,
 ) -> str:
     """
     Convenience function to get just the image URL.
@@ -90,6 +201,7 @@ def get_image_url(
         model: Model ID
         size: Image size
         private_key: Override environment variable
+        session: Client session to reuse (default: process-wide session)
 
     Returns:
         URL or data URL of the generated image
@@ -100,9 +212,209 @@ def get_image_url(
         size=size,
         n=1,
         private_key=private_key,
+        session=session,
     )
 
     if result.data and len(result.data) > 0:
         return result.data[0].url
     else:
         raise ValueError("No image data returned from API")
+
+
+_http_client = None
+_http_lock = threading.Lock()
+
+
+def _http():
+    """Return the pooled HTTP client used for downloads, creating it once."""
+    global _http_client
+
+    with _http_lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True)
+        return _http_client
+
+
+def _sniff(head: bytes) -> Optional[str]:
+    """Content type from an image's leading bytes (None if not recognized)."""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _check_type(declared: str, head: bytes, source: str) -> str:
+    """
+    Decide the content type of a download, refusing anything that is not
+    an image (an HTML error page served with a 200, for example).
+    """
+    declared = declared.split(";", 1)[0].strip().lower()
+    sniffed = _sniff(head)
+    if sniffed:
+        return sniffed
+    # Trust an image/* header for formats not sniffed above, unless the
+    # body is plainly markup or JSON
+    if declared.startswith("image/") and head.lstrip()[:1] not in (b"<", b"{"):
+        return declared
+    raise ValueError(f"Not an image ({declared or 'unknown type'}): {source[:80]}")
+
+
+def _data_url_chunks(url: str):
+    """
+    Yield (content type, decoded chunk) pairs from a base64 data: URL.
+
+    Each slice is decoded on its own, so the payload is never copied or
+    decoded as a whole.
+    """
+    comma = url.find(",")
+    header = url[5:comma] if comma != -1 else ""
+    if comma == -1 or not header.endswith(";base64"):
+        raise ValueError("Unsupported data URL (expected base64)")
+    content_type = header[:-len(";base64")]
+
+    for start in range(comma + 1, len(url), CHUNK_SIZE):
+        yield content_type, base64.b64decode(url[start:start + CHUNK_SIZE])
+
+
+def _http_chunks(url: str):
+    """Yield (content type, chunk) pairs while streaming an HTTP download."""
+    with _http().stream("GET", url) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "")
+        for chunk in response.iter_bytes(CHUNK_SIZE):
+            yield content_type, chunk
+
+
+def _create_temp(directory: str):
+    """
+    Create a uniquely named partial file in directory.
+
+    Unlike mkstemp (owner-only 0600), the file is opened with mode 0666 so
+    the process umask applies and saved images get the usual permissions.
+
+    Returns:
+        Tuple of (file descriptor, path)
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    while True:
+        temp_path = os.path.join(directory, f"tmp{uuid.uuid4().hex[:12]}.part")
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def download_image(url: str, path: str) -> str:
+    """
+    Save one generated image to disk.
+
+    The file is written under a temporary name next to the target and
+    renamed into place once complete, so a partial download never appears
+    under the final name. The extension follows the actual image format.
+
+    Args:
+        url: http(s) URL or base64 data: URL returned by the API
+        path: Target file path; its extension is replaced to match the image
+
+    Returns:
+        Path the image was saved to
+
+    Raises:
+        ValueError: If the content is not an image
+        httpx.HTTPError: If the download fails
+    """
+    chunks = _data_url_chunks(url) if url.startswith("data:") else _http_chunks(url)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = _create_temp(directory)
+    try:
+        content_type = None
+        with os.fdopen(fd, "wb") as f:
+            for declared, chunk in chunks:
+                if content_type is None:
+                    content_type = _check_type(declared, chunk[:16], url)
+                f.write(chunk)
+        if content_type is None:
+            raise ValueError(f"Empty image: {url[:80]}")
+
+        final_path = os.path.splitext(path)[0] + EXTENSIONS.get(content_type, ".img")
+        os.replace(temp_path, final_path)
+        return final_path
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def download_images(
+    urls: List[str],
+    paths: List[str],
+    workers: int = 4,
+) -> List[Union[str, Exception]]:
+    """
+    Save several generated images concurrently.
+
+    Args:
+        urls: Image URLs (http(s) or data:)
+        paths: Target path for each URL (see download_image)
+        workers: Downloads in flight at once
+
+    Returns:
+        For each URL, the saved path or the exception that prevented it
+    """
+    def one(pair):
+        try:
+            return download_image(*pair)
+        except Exception as e:
+            return e
+
+    if len(urls) == 1:
+        return [one((urls[0], paths[0]))]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+        return list(pool.map(one, zip(urls, paths)))
+
+
+def image_stem(job_id: str, prompt: str, model: str, size: str) -> str:
+    """
+    Deterministic file name (without extension) for a batch image.
+
+    The job ID keeps files in a readable order; a short hash of the request
+    means an edited prompt, model or size gets a new file instead of being
+    mistaken for one already generated.
+
+    Args:
+        job_id: Batch job ID
+        prompt: Image prompt
+        model: Model ID
+        size: Image size
+
+    Returns:
+        File stem such as "12-3f9a0c1e"
+    """
+    digest = hashlib.sha256(f"{model}\n{size}\n{prompt}".encode("utf-8")).hexdigest()[:8]
+    safe_id = re.sub(r"[^A-Za-z0-9._-]+", "_", job_id).strip("._")[:64] or "image"
+    return f"{safe_id}-{digest}"
+
+
+def existing_stems(directory: str) -> set:
+    """
+    File stems of images already saved in a directory.
+
+    Temporary ".part" files left by an interrupted download do not count.
+
+    Args:
+        directory: Output directory (may not exist yet)
+
+    Returns:
+        Set of file names without their extension
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return set()
+    return {os.path.splitext(name)[0] for name in names if not name.endswith(".part")}
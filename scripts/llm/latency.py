@@ -0,0 +1,293 @@
+"""
+BlockRun Latency Tracker - Observed per-model response times.
+
+Keeps an exponentially weighted moving average (EWMA) of end-to-end
+latency and time-to-first-token for every model that has served a call,
+persisted in ~/.blockrun/latency.json. The router uses it to send --fast
+requests to whichever model is actually quickest right now rather than
+the one the static catalog labels as fastest. The most recent latencies
+are kept as well, for the tail percentiles that request hedging needs.
+
+Observations update the in-memory averages at once but reach the file in
+batches: at most every FLUSH_INTERVAL seconds and at exit, merged into
+whatever other processes wrote meanwhile under latency.lock.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Tuple
+
+try:
+    from ..utils.spending import file_lock
+except ImportError:
+    from utils.spending import file_lock
+
+
+LATENCY_FILE = Path.home() / ".blockrun" / "latency.json"
+
+# Weight of the newest sample; 0.3 follows a shift within a handful of calls
+ALPHA = 0.3
+
+# Samples a model needs before its average is trusted for routing
+MIN_SAMPLES = 3
+
+# Averages not refreshed for this long no longer describe today's latency
+MAX_AGE = 7 * 24 * 3600
+
+# Latest latencies kept per model for percentiles
+RECENT_SAMPLES = 20
+
+# Seconds between writes of buffered observations to the file
+FLUSH_INTERVAL = 5.0
+
+
+class LatencyTracker:
+    """Persistent EWMA of latency and time-to-first-token per model."""
+
+    def __init__(self, path: Optional[Path] = None, alpha: float = ALPHA):
+        """
+        Open (or create) a latency tracker.
+
+        Args:
+            path: JSON file location (default: ~/.blockrun/latency.json)
+            alpha: Weight of the newest sample in the moving average
+        """
+        self.path = Path(path) if path else LATENCY_FILE
+        self.lock_file = self.path.with_suffix(".lock")
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self.models: Dict[str, Dict[str, Any]] = {}
+        # Observations not yet written: (model, latency, ttft, time)
+        self._pending: List[Tuple[str, float, Optional[float], float]] = []
+        self._flushed = time.monotonic()
+        self._refresh()
+        atexit.register(self.flush)
+
+    def _refresh(self):
+        """Reload the file if another process has updated it (lock held)."""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            data = json.loads(self.path.read_text())
+            self.models = data.get("models", {})
+        except (json.JSONDecodeError, OSError, AttributeError):
+            # Corrupted file - start fresh
+            self.models = {}
+        self._mtime = mtime
+        # Our unwritten observations are not in the file yet
+        for observation in self._pending:
+            self._apply(*observation)
+
+    def _save(self):
+        """Atomic save to prevent corruption."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"models": self.models}, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self._mtime = self.path.stat().st_mtime
+
+    def _ewma(self, old: Optional[float], sample: float) -> float:
+        return sample if old is None else self.alpha * sample + (1 - self.alpha) * old
+
+    def _apply(self, model: str, latency: float, ttft: Optional[float], when: float):
+        """Fold one observation into self.models (lock held)."""
+        stats = self.models.setdefault(model, {"latency": None, "ttft": None, "samples": 0})
+        stats["latency"] = self._ewma(stats["latency"], latency)
+        stats["recent"] = (stats.get("recent", []) + [round(latency, 4)])[-RECENT_SAMPLES:]
+        if ttft is not None:
+            stats["ttft"] = self._ewma(stats.get("ttft"), ttft)
+        stats["samples"] += 1
+        stats["updated"] = when
+
+    def observe(self, model: str, latency: float, ttft: Optional[float] = None):
+        """
+        Record one completed call.
+
+        Args:
+            model: Model ID that served the call
+            latency: Seconds from request to the full response
+            ttft: Seconds to the first streamed token, if streamed
+        """
+        observation = (model, latency, ttft, time.time())
+        with self._lock:
+            self._refresh()
+            self._apply(*observation)
+            self._pending.append(observation)
+            due = time.monotonic() - self._flushed >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered observations, merged with the file's current state.
+
+        The file is re-read under latency.lock and the buffered observations
+        are applied on top, so processes flushing at the same time never
+        overwrite each other's samples.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            self._flushed = time.monotonic()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with file_lock(self.lock_file):
+                    # Force a re-read; mtime alone can miss a same-tick write
+                    self._mtime = None
+                    self._refresh()
+                    self._save()
+                self._pending = []
+            except OSError:
+                # Latency history is an optimization; never fail a call over it
+                pass
+
+    def get(self, model: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the moving averages for a model.
+
+        Returns:
+            Dict with "latency", "ttft" (seconds, may be None), "samples"
+            and "updated", or None if the model has never been observed
+        """
+        with self._lock:
+            self._refresh()
+            stats = self.models.get(model)
+            return dict(stats) if stats else None
+
+    def percentile(
+        self,
+        model: str,
+        q: float = 0.95,
+        min_samples: int = MIN_SAMPLES,
+    ) -> Optional[float]:
+        """
+        Get a latency percentile over the model's recent calls.
+
+        Args:
+            model: Model ID
+            q: Percentile as a fraction (0.95 for p95)
+            min_samples: Recent calls required for an answer
+
+        Returns:
+            Latency in seconds, or None with too few recent samples
+        """
+        with self._lock:
+            self._refresh()
+            recent = sorted((self.models.get(model) or {}).get("recent", []))
+        if len(recent) < min_samples:
+            return None
+        return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+    def estimates(
+        self,
+        candidates: List[str],
+        min_samples: int = MIN_SAMPLES,
+        max_age: float = MAX_AGE,
+    ) -> Dict[str, float]:
+        """
+        Get the trusted average latency of each measured candidate.
+
+        Args:
+            candidates: Model IDs to look up
+            min_samples: Observations required before a model is included
+            max_age: Ignore averages older than this many seconds
+
+        Returns:
+            Average latency in seconds by model ID; candidates with too few
+            or too old observations are left out
+        """
+        now = time.time()
+        measured = {}
+        with self._lock:
+            self._refresh()
+            for model in candidates:
+                stats = self.models.get(model)
+                if not stats or stats["samples"] < min_samples:
+                    continue
+                if now - stats.get("updated", 0) > max_age:
+                    continue
+                measured[model] = stats["latency"]
+        return measured
+
+    def fastest(
+        self,
+        candidates: List[str],
+        priors: Optional[Dict[str, float]] = None,
+        min_samples: int = MIN_SAMPLES,
+        max_age: float = MAX_AGE,
+    ) -> Optional[str]:
+        """
+        Pick the candidate with the lowest average latency.
+
+        Candidates without enough recent observations compete on their
+        prior, if one is given, so a model nobody has tried yet still gets
+        picked (and so measured) when it is expected to beat the measured
+        ones. Without any measured candidate there is nothing to compare
+        the priors against and None is returned.
+
+        Args:
+            candidates: Model IDs to choose from, in order of preference
+                for ties
+            priors: Assumed latency in seconds of unmeasured candidates
+            min_samples: Observations required before a model is ranked
+            max_age: Ignore averages older than this many seconds
+
+        Returns:
+            Fastest model ID, or None if no candidate has enough data
+        """
+        measured = self.estimates(candidates, min_samples=min_samples, max_age=max_age)
+        if not measured:
+            return None
+
+        priors = priors or {}
+        ranked = [model for model in candidates if model in measured or model in priors]
+        # min() keeps candidate order among equal latencies
+        return min(ranked, key=lambda model: measured.get(model, priors.get(model)))
+
+    def clear(self):
+        """Forget all observations."""
+        with self._lock:
+            self.models = {}
+            self._pending = []
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            self._mtime = None
+
+
+_default_tracker: Optional[LatencyTracker] = None
+_default_lock = threading.Lock()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """
+    Get the process-wide tracker at ~/.blockrun/latency.json.
+
+    Returns:
+        Shared LatencyTracker instance
+    """
+    global _default_tracker
+
+    with _default_lock:
+        if _default_tracker is None:
+            _default_tracker = LatencyTracker()
+        return _default_tracker
@@ -0,0 +1,219 @@
+"""
+BlockRun Map-Reduce Module - Summarize file sets larger than any context.
+
+Files are streamed from a directory or glob and packed into chunks of a
+fixed token budget. Every chunk is sent through the map prompt (many at
+once, see batch.run_batch), and the partial answers are then merged a
+group at a time, level after level, until a single answer remains.
+
+Only one chunk is assembled in memory at a time; each stage's results are
+spilled to a JSONL file and read back lazily by the next stage.
+"""
+
+import glob
+import json
+import os
+from typing import Iterator, Dict, Any, List, Optional
+
+from .cost import CHARS_PER_TOKEN
+
+DEFAULT_MODEL = "deepseek/deepseek-chat"
+
+# Tokens of source text per map call, leaving room for the prompt and reply
+CHUNK_TOKENS = 6000
+
+# Reply length for map and reduce calls
+PARTIAL_TOKENS = 800
+
+# Bytes inspected to tell text from binary files
+SNIFF_BYTES = 8192
+
+MAP_PROMPT = """{instruction}
+
+Apply the instruction above to the following excerpt from a larger set of files.
+Your answer will be merged with answers for the other excerpts, so be concise
+and keep file names next to the points that come from them.
+
+{chunk}"""
+
+REDUCE_PROMPT = """{instruction}
+
+Below are partial answers to the instruction above, each covering part of a
+larger set of files. Merge them into one answer: combine overlapping points,
+keep file names where they matter and drop nothing important.
+
+{chunk}"""
+
+
+def iter_files(source: str) -> Iterator[str]:
+    """
+    List the text files to process, in a stable order.
+
+    Args:
+        source: A directory (walked recursively, skipping hidden entries),
+            a glob pattern ("**" allowed) or a single file
+
+    Yields:
+        Paths of files that look like text
+    """
+    if os.path.isdir(source):
+        def walk():
+            for root, dirs, files in os.walk(source):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                for name in sorted(files):
+                    if not name.startswith("."):
+                        yield os.path.join(root, name)
+        paths = walk()
+    elif os.path.isfile(source):
+        paths = iter([source])
+    else:
+        paths = iter(sorted(glob.iglob(source, recursive=True)))
+
+    for path in paths:
+        if os.path.isfile(path) and _is_text(path):
+            yield path
+
+
+def _is_text(path: str) -> bool:
+    """Whether a file looks like text (no NUL bytes near the start)."""
+    try:
+        with open(path, "rb") as f:
+            return b"\0" not in f.read(SNIFF_BYTES)
+    except OSError:
+        return False
+
+
+def iter_chunks(paths: Iterator[str], chunk_tokens: int = CHUNK_TOKENS) -> Iterator[Dict[str, Any]]:
+    """
+    Pack files into chunks of roughly chunk_tokens tokens.
+
+    Small files share a chunk; large files are split at line boundaries
+    (or mid-line, for lines longer than a whole chunk). Each piece is
+    headed by its file name so answers can cite it.
+
+    Args:
+        paths: Files to read (see iter_files)
+        chunk_tokens: Token budget per chunk
+
+    Yields:
+        Batch jobs {"id": "map-<n>", "files": [...], "text": ...}
+    """
+    budget = chunk_tokens * CHARS_PER_TOKEN
+    parts: List[str] = []
+    files: List[str] = []
+    size = 0   # characters in the chunk, headers included
+    body = 0   # characters of file content in the chunk
+    count = 0
+
+    def flush():
+        nonlocal parts, files, size, body, count
+        count += 1
+        chunk = {"id": f"map-{count}", "files": files, "text": "".join(parts)}
+        parts, files, size, body = [], [], 0, 0
+        return chunk
+
+    for path in paths:
+        header = f"\n=== {path} ===\n"
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                while line:
+                    if size >= budget:
+                        yield flush()
+                        header = f"\n=== {path} (continued) ===\n"
+                    if header:
+                        parts.append(header)
+                        files.append(path)
+                        size += len(header)
+                        header = ""
+
+                    room = max(budget - size, 1)
+                    if len(line) <= room:
+                        piece, line = line, ""
+                    elif body and len(line) <= budget // 2:
+                        # A short line that does not fit: keep it whole in the next chunk
+                        yield flush()
+                        header = f"\n=== {path} (continued) ===\n"
+                        continue
+                    else:
+                        piece, line = line[:room], line[room:]
+                    parts.append(piece)
+                    size += len(piece)
+                    body += len(piece)
+
+    if parts:
+        yield flush()
+
+
+def iter_groups(
+    results_path: str,
+    level: int,
+    group_tokens: int = CHUNK_TOKENS,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Group one stage's partial answers into reduce jobs.
+
+    Answers are read lazily from the stage's results file and packed
+    until the group reaches the token budget (always at least two per
+    group, so every level shrinks).
+
+    Args:
+        results_path: JSONL results of the previous stage
+        level: Reduce level, used in job IDs
+        group_tokens: Token budget per group
+
+    Yields:
+        Batch jobs {"id": "reduce<level>-<n>", "count": answers, "text": ...}
+    """
+    budget = group_tokens * CHARS_PER_TOKEN
+    parts: List[str] = []
+    size = 0
+    count = 0
+
+    for answer in iter_answers(results_path):
+        text = f"\n--- Partial answer {len(parts) + 1} ---\n{answer}\n"
+        if parts and len(parts) >= 2 and size + len(text) > budget:
+            count += 1
+            yield {"id": f"reduce{level}-{count}", "count": len(parts), "text": "".join(parts)}
+            parts, size = [], 0
+            text = f"\n--- Partial answer 1 ---\n{answer}\n"
+        parts.append(text)
+        size += len(text)
+
+    if parts:
+        count += 1
+        yield {"id": f"reduce{level}-{count}", "count": len(parts), "text": "".join(parts)}
+
+
+def iter_answers(results_path: str) -> Iterator[str]:
+    """
+    Read the successful answers from a stage's results file.
+
+    Args:
+        results_path: JSONL file written by run_batch
+
+    Yields:
+        Response texts, in the order they were written
+    """
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not entry.get("error") and entry.get("response"):
+                yield entry["response"]
+
+
+def count_answers(results_path: str) -> int:
+    """Number of successful answers in a stage's results file."""
+    return sum(1 for _ in iter_answers(results_path))
+
+
+def build_prompt(template: str, instruction: str, chunk: Dict[str, Any]) -> str:
+    """Fill the map or reduce prompt for one chunk."""
+    return template.format(instruction=instruction, chunk=chunk["text"])
+
+
+def read_final(results_path: str) -> Optional[str]:
+    """The single answer left after the last stage (None if it failed)."""
+    return next(iter_answers(results_path), None)
@@ -0,0 +1,233 @@
+"""
+BlockRun Retry Module - Retries with jittered backoff, and request hedging.
+
+Transient failures (timeouts, dropped connections, 429 and 5xx replies) are
+retried after a randomized exponential backoff, or after the server's
+Retry-After when it sent one. Requests the server refused for good (400,
+404) and payment failures are raised at once: repeating them cannot help
+and a payment retry could pay twice.
+
+On the async path a slow request can also be hedged: once it has run longer
+than the model's recent p95 latency, an identical request is started and
+whichever answers first wins; the other is cancelled.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from .latency import get_latency_tracker
+
+# Replies worth repeating: timeout, conflict, too early, rate limit, server errors
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+DEFAULT_ATTEMPTS = 3
+
+# Backoff before retry n is uniform in [0, min(MAX_DELAY, BASE_DELAY * 2**n)]
+BASE_DELAY = 0.5
+MAX_DELAY = 20.0
+
+# Longest Retry-After honored; a server asking for more is treated as down
+MAX_RETRY_AFTER = 60.0
+
+# Latency percentile after which a request is hedged
+HEDGE_PERCENTILE = 0.95
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an error is transient, so the same request may succeed later.
+
+    Args:
+        error: Exception raised by an SDK call
+
+    Returns:
+        True for timeouts, connection errors, 429 and 5xx API errors
+    """
+    try:
+        from blockrun_llm import PaymentError
+    except ImportError:
+        PaymentError = None
+    # Includes subclasses such as SpendLimitError
+    if PaymentError is not None and isinstance(error, PaymentError):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUSES
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked to wait before retrying, if it said."""
+    seconds = getattr(error, "retry_after_seconds", None)
+    if seconds is None:
+        raw = getattr(error, "retry_after", None)
+        try:
+            seconds = float(raw) if raw is not None else None
+        except (TypeError, ValueError):
+            # HTTP-date form: fall back to our own backoff
+            seconds = None
+    return seconds if seconds is None or seconds >= 0 else None
+
+
+class RetryPolicy:
+    """
+    How often and how patiently to retry a call.
+
+    Example:
+        policy = RetryPolicy(attempts=4)
+        response = policy.call(lambda: client.chat_completion(model, messages))
+    """
+
+    def __init__(
+        self,
+        attempts: int = DEFAULT_ATTEMPTS,
+        base_delay: float = BASE_DELAY,
+        max_delay: float = MAX_DELAY,
+        hedge: bool = False,
+    ):
+        """
+        Configure a retry policy.
+
+        Args:
+            attempts: Total tries per call, the first one included
+            base_delay: Backoff ceiling before the first retry, in seconds
+            max_delay: Largest backoff ceiling, in seconds
+            hedge: On the async path, start a duplicate request once one
+                has been running longer than the model's p95 latency
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+
+    def delay(self, retry: int, error: BaseException) -> Optional[float]:
+        """
+        Seconds to wait before a retry.
+
+        Args:
+            retry: Retry number, starting at 0
+            error: The failure being retried
+
+        Returns:
+            Delay in seconds ("full jitter" backoff, or the server's
+            Retry-After), or None if the server asked for longer than
+            MAX_RETRY_AFTER
+        """
+        requested = retry_after(error)
+        if requested is not None:
+            return requested if requested <= MAX_RETRY_AFTER else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def _next_delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Delay before trying again, or None to give up with this error."""
+        if attempt + 1 >= self.attempts or not is_retryable(error):
+            return None
+        return self.delay(attempt, error)
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+    ) -> Any:
+        """
+        Call fn, retrying transient failures.
+
+        Args:
+            fn: Makes the request
+            on_retry: Called as on_retry(retry_number, error, delay) before
+                each retry, e.g. to report or count retries
+
+        Returns:
+            fn's result
+
+        Raises:
+            Exception: The last error, once it is not retryable or the
+                attempts are used up
+        """
+        attempt = 0
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                wait = self._next_delay(attempt, e)
+                if wait is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt + 1, e, wait)
+                time.sleep(wait)
+                attempt += 1
+
+    async def acall(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        model: Optional[str] = None,
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+    ) -> Any:
+        """
+        Await factory(), retrying transient failures and hedging slow tries.
+
+        Args:
+            factory: Returns a new coroutine making the request
+            model: Model whose latency decides when to hedge
+            on_retry: Called as on_retry(retry_number, error, delay) before
+                each retry
+
+        Returns:
+            The first successful result
+
+        Raises:
+            Exception: The last error, once it is not retryable or the
+                attempts are used up
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(factory, model)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                wait = self._next_delay(attempt, e)
+                if wait is None:
+                    raise
+                if on_retry:
+                    on_retry(attempt + 1, e, wait)
+                await asyncio.sleep(wait)
+                attempt += 1
+
+    async def _hedged(self, factory: Callable[[], Awaitable[Any]], model: Optional[str]) -> Any:
+        """One try, duplicated once it runs past the model's p95 latency."""
+        after = None
+        if self.hedge and model:
+            after = get_latency_tracker().percentile(model, HEDGE_PERCENTILE)
+        if after is None:
+            return await factory()
+
+        tasks = {asyncio.ensure_future(factory())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=after)
+            if not done:
+                tasks.add(asyncio.ensure_future(factory()))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The loser (or both, if the caller was cancelled)
+            for task in tasks:
+                task.cancel()
+
+
+DEFAULT_POLICY = RetryPolicy()
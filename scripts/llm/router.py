@@ -4,9 +4,15 @@ BlockRun Smart Router - Intelligent model selection.
 Routes requests to the optimal LLM based on:
 - Content analysis (keywords, task type)
 - User preferences (cost, speed)
+- Observed latency (--fast picks the quickest model measured lately)
 - Model capabilities (real-time data, reasoning, etc.)
+
+route_candidates extends a routing decision into a ranked fallback chain
+of equivalent models, for when the chosen one is failing.
 """
 
+import re
+from functools import lru_cache
 from typing import Optional, Dict, List
 
 
@@ -189,6 +195,21 @@ MODEL_CATALOG = {
 }
 
 
+# Catalog speed labels, fastest first (fallback when latency is unmeasured)
+SPEED_RANK = {"very-fast": 0, "fast": 1, "medium": 2, "slow": 3}
+
+# Assumed latency in seconds of a model not measured yet, by speed label.
+# Kept optimistic, so --fast tries an unmeasured model whose label promises
+# to beat the measured ones instead of sticking with the first it measured
+SPEED_PRIOR = {"very-fast": 1.0, "fast": 2.0, "medium": 5.0, "slow": 15.0}
+
+# Catalog cost labels, cheapest first; fallbacks stay within one tier
+COST_RANK = {"very-low": 0, "low": 1, "medium": 2, "high": 3}
+
+# Fallback models tried after the routed one
+MAX_FALLBACKS = 3
+
+
 # Keyword to task type mapping
 TASK_KEYWORDS = {
     "real-time": ["twitter", "x.com", "trending", "news", "today", "current", "latest", "elon", "musk"],
@@ -200,24 +221,147 @@ TASK_KEYWORDS = {
 }
 
 
-def detect_task_type(prompt: str) -> List[str]:
+def _trie_pattern(keywords: List[str]) -> str:
     """
-    Detect task types from prompt content.
+    Build a regex matching any keyword, factored as a prefix trie.
 
-    Args:
-        prompt: User's prompt text
+    Sharing prefixes (e.g. "c(?:ode|urrent|...)") keeps the work per text
+    position small, and the leading character set lets the regex engine
+    skip positions that cannot start a keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A keyword ends here; longer ones continue optionally
+            return body + "?" if len(branches) > 1 else f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """
+    Single-pass matcher for a table of {label: [keywords]}.
 
-    Returns:
-        List of detected task types
+    All keywords are compiled once into one regex, so a prompt is scanned
+    once however many keywords there are. Results are identical to testing
+    ``keyword in prompt.lower()`` for every keyword, including keywords
+    that overlap in the text.
+
+    The regex only wins on short texts: past SCAN_ABOVE characters one C
+    substring search per keyword is faster (measured in
+    benchmarks/bench_router.py), so long texts are scanned that way.
+    """
+
+    # Text length above which per-keyword substring search beats the regex
+    SCAN_ABOVE = 512
+
+    def __init__(self, table: Dict[str, List[str]]):
+        self.labels = list(table)
+        self._keywords = {
+            label: [keyword.lower() for keyword in keywords if keyword]
+            for label, keywords in table.items()
+        }
+
+        labels_of: Dict[str, List[str]] = {}
+        for label, keywords in table.items():
+            for keyword in keywords:
+                if keyword:
+                    labels_of.setdefault(keyword.lower(), []).append(label)
+
+        # The regex reports the longest keyword at a position, so a match
+        # also stands for every keyword that is a prefix of it
+        self._labels_of = {
+            keyword: {
+                label
+                for other, labels in labels_of.items()
+                if keyword.startswith(other)
+                for label in labels
+            }
+            for keyword in labels_of
+        }
+        self._pattern = re.compile(_trie_pattern(list(labels_of)))
+
+    def match(self, text: str, stop_on: Optional[str] = None) -> List[str]:
+        """
+        Find which labels have a keyword in the text.
+
+        Args:
+            text: Text to scan (matched case-insensitively)
+            stop_on: Stop scanning as soon as this label is found
+
+        Returns:
+            Matched labels, in table order. Once stop_on is found, other
+            labels may be missing
+        """
+        text = text.lower()
+        if len(text) > self.SCAN_ABOVE:
+            return self._scan(text, stop_on)
+
+        search = self._pattern.search
+        found = set()
+        wanted = len(self.labels)
+
+        match = search(text)
+        while match:
+            found.update(self._labels_of[match.group()])
+            if len(found) == wanted or stop_on in found:
+                break
+            # Resume one character later so overlapping keywords are seen
+            match = search(text, match.start() + 1)
+
+        return [label for label in self.labels if label in found]
+
+    def _scan(self, text: str, stop_on: Optional[str]) -> List[str]:
+        """match() for long lowercased texts: one substring search per keyword."""
+        found = []
+        for label, keywords in self._keywords.items():
+            if any(keyword in text for keyword in keywords):
+                found.append(label)
+                if label == stop_on:
+                    break
+        return found
+
+
+def _task_types(prompt: str, stop_on: Optional[str] = None) -> List[str]:
+    """
+    Task types whose keywords occur in the prompt, in TASK_KEYWORDS order.
+
+    One substring search per keyword. KeywordMatcher only wins on short
+    prompts, where either takes microseconds, and is slower on large ones
+    (benchmarks/bench_router.py).
     """
     prompt_lower = prompt.lower()
     detected = []
-
     for task_type, keywords in TASK_KEYWORDS.items():
         if any(keyword in prompt_lower for keyword in keywords):
             detected.append(task_type)
+            if task_type == stop_on:
+                break
+    return detected
 
-    return detected if detected else ["general"]
+
+def detect_task_type(prompt: str) -> List[str]:
+    """
+    Detect task types from prompt content.
+
+    Args:
+        prompt: User's prompt text
+
+    Returns:
+        List of detected task types
+    """
+    return _task_types(prompt) or ["general"]
 
 
 def smart_route(
@@ -243,11 +387,13 @@ def smart_route(
     if cheap:
         return "deepseek/deepseek-chat"
 
-    if fast:
-        return "openai/gpt-5-nano"
+    # Detect task type (real-time outranks everything, so stop once seen)
+    task_types = [task_hint] if task_hint else _task_types(prompt, stop_on="real-time")
 
-    # Detect task type
-    task_types = [task_hint] if task_hint else detect_task_type(prompt)
+    if fast:
+        # Fastest model that still has the strength the task needs
+        strength = next(iter(task_types), "quick-tasks")
+        return fastest_model("quick-tasks" if strength == "general" else strength)
 
     # Route based on detected task
     if "real-time" in task_types:
@@ -272,6 +418,140 @@ def smart_route(
     return "openai/gpt-5.2"
 
 
+def fastest_model(
+    strength: str,
+    default: Optional[str] = None,
+    latency: Optional["LatencyTracker"] = None,
+) -> str:
+    """
+    Pick the fastest model with a given strength.
+
+    Measured models are ranked by their observed latency and unmeasured
+    ones by the SPEED_PRIOR of their catalog label, so a model that has
+    not been tried yet takes over while it is expected to be faster and
+    keeps it once measured only if it really is. Before any candidate is
+    measured, the given default (or the catalog speed labels) decides.
+
+    Args:
+        strength: Required strength (e.g., "coding", "quick-tasks")
+        default: Model to use when no candidate has been measured
+        latency: Latency tracker (default: ~/.blockrun/latency.json)
+
+    Returns:
+        Model ID string
+    """
+    candidates = list_models_by_strength(strength) or list_models_by_strength("quick-tasks")
+
+    if latency is None:
+        from .latency import get_latency_tracker
+        latency = get_latency_tracker()
+
+    priors = {
+        model_id: SPEED_PRIOR[MODEL_CATALOG[model_id]["speed"]]
+        for model_id in candidates
+        if MODEL_CATALOG[model_id].get("speed") in SPEED_PRIOR
+    }
+    measured = latency.fastest(candidates, priors=priors)
+    if measured:
+        return measured
+    if default:
+        return default
+
+    # min() keeps catalog order among equally labelled models
+    return min(
+        candidates,
+        key=lambda model_id: SPEED_RANK.get(MODEL_CATALOG[model_id].get("speed"), len(SPEED_RANK)),
+    )
+
+
+def route_candidates(
+    model: str,
+    strength: Optional[str] = None,
+    limit: int = MAX_FALLBACKS,
+) -> List[str]:
+    """
+    Rank the models to try, in order, if a routed model fails.
+
+    Candidates must have the given strength and a cost tier at most one
+    step from the model's. Other providers come first (an outage usually
+    takes a whole provider down), then models sharing more strengths, then
+    closer cost, then faster. Only the static MODEL_CATALOG is consulted,
+    and results are memoized, so a lookup never touches disk or network.
+
+    Args:
+        model: The routed model ID
+        strength: Strength every fallback must have (default: the
+            model's primary, i.e. first listed, strength)
+        limit: Most fallbacks to return
+
+    Returns:
+        Model IDs, the given model first; just [model] for models
+        outside MODEL_CATALOG
+    """
+    return list(_candidates(model, strength, limit))
+
+
+@lru_cache(maxsize=None)
+def _candidates(model: str, strength: Optional[str], limit: int) -> tuple:
+    info = MODEL_CATALOG.get(model)
+    if info is None:
+        return (model,)
+
+    strengths = set(info.get("strengths", []))
+    strength = strength or next(iter(info.get("strengths", [])), None)
+    cost = COST_RANK.get(info.get("cost"), len(COST_RANK))
+
+    ranked = []
+    for order, (model_id, other) in enumerate(MODEL_CATALOG.items()):
+        if model_id == model or strength not in other.get("strengths", []):
+            continue
+        distance = abs(COST_RANK.get(other.get("cost"), len(COST_RANK)) - cost)
+        if distance > 1:
+            continue
+        ranked.append((
+            other.get("provider") == info.get("provider"),
+            -len(strengths & set(other.get("strengths", []))),
+            distance,
+            SPEED_RANK.get(other.get("speed"), len(SPEED_RANK)),
+            order,
+            model_id,
+        ))
+
+    return (model,) + tuple(entry[-1] for entry in sorted(ranked)[:max(0, limit)])
+
+
+def smart_route_batch(
+    prompts: List[str],
+    *,
+    cheap: bool = False,
+    fast: bool = False,
+    task_hint: Optional[str] = None,
+) -> List[str]:
+    """
+    Route many prompts at once.
+
+    Repeated prompts are classified only once.
+
+    Args:
+        prompts: Prompt texts
+        cheap: Prioritize cost-effective models
+        fast: Prioritize low-latency models
+        task_hint: Optional explicit task type hint applied to all prompts
+
+    Returns:
+        Model ID for each prompt, in input order
+    """
+    routes: Dict[str, str] = {}
+    models = []
+    for prompt in prompts:
+        model = routes.get(prompt)
+        if model is None:
+            model = smart_route(prompt, cheap=cheap, fast=fast, task_hint=task_hint)
+            routes[prompt] = model
+        models.append(model)
+    return models
+
+
 def get_model_for_task(task: str) -> str:
     """
     Get recommended model for a specific task type.
@@ -0,0 +1,390 @@
+"""
+BlockRun Session Module - Reusable keep-alive SDK clients.
+
+Building an LLMClient or ImageClient parses the wallet key, derives the
+account and opens a fresh HTTP connection pool. A BlockRunSession keeps one
+client per (client type, wallet) pair alive so repeated calls only pay for
+the HTTP round trip.
+
+AsyncBlockRunSession is the asyncio counterpart: one AsyncLLMClient per
+wallet, a semaphore bounding in-flight requests, and coalescing of
+identical requests that overlap. An httpx.AsyncClient belongs to the
+event loop it is used on, so the default async session is per loop.
+"""
+
+import asyncio
+import atexit
+import importlib.util
+import threading
+import weakref
+from typing import Optional, Dict, Tuple, Any, Awaitable, Callable, Hashable, List
+
+# Clients import the SDK on first use; only check that it is installed here
+HAS_SDK = importlib.util.find_spec("blockrun_llm") is not None
+
+
+class BlockRunSession:
+    """
+    Pool of long-lived BlockRun clients, keyed by wallet.
+
+    Clients are created on first use and reused until the session is
+    closed. The session is safe to share between threads.
+
+    A client's spending counter is a running total over everything sent
+    through it. Callers that book a call's cost as the delta of that total
+    take a client for themselves with acquire() and hand it back with
+    release(); idle clients are reused, so they stay warm.
+
+    Example:
+        with BlockRunSession() as session:
+            for prompt in prompts:
+                chat(prompt, model="deepseek/deepseek-chat", session=session)
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, Optional[str]], Any] = {}
+        # Clients handed out by acquire(): idle ones per key, and the key
+        # of every client currently out
+        self._idle: Dict[Tuple[str, Optional[str]], List[Any]] = {}
+        self._leased: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def _create(kind: str, private_key: Optional[str]):
+        """Build a new SDK client."""
+        if not HAS_SDK:
+            raise ImportError(
+                "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
+            )
+        if kind == "image":
+            from blockrun_llm import ImageClient as factory
+        else:
+            from blockrun_llm import LLMClient as factory
+        return factory(private_key=private_key) if private_key else factory()
+
+    def _get(self, kind: str, private_key: Optional[str]):
+        """Return the pooled client for (kind, private_key), creating it once."""
+        key = (kind, private_key)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BlockRunSession is closed")
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self._create(kind, private_key)
+            return client
+
+    def acquire(self, kind: str = "llm", private_key: Optional[str] = None) -> Any:
+        """
+        Take a client for exclusive use until release().
+
+        An idle client from an earlier acquire() is reused if there is one;
+        otherwise a new one is created. No other acquire() gets the same
+        client meanwhile, so its spending delta around a call is that
+        call's cost even with other threads paying at the same time.
+
+        Args:
+            kind: "llm" or "image"
+            private_key: Override environment variable
+
+        Returns:
+            LLMClient or ImageClient instance
+        """
+        key = (kind, private_key)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BlockRunSession is closed")
+            idle = self._idle.get(key)
+            client = idle.pop() if idle else None
+        if client is None:
+            client = self._create(kind, private_key)
+        with self._lock:
+            self._leased[id(client)] = key
+        return client
+
+    def release(self, client: Any):
+        """Hand back a client taken with acquire()."""
+        with self._lock:
+            key = self._leased.pop(id(client), None)
+            if key is not None and not self._closed:
+                self._idle.setdefault(key, []).append(client)
+                return
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def llm_client(self, private_key: Optional[str] = None) -> "LLMClient":
+        """
+        Get the pooled LLMClient for a wallet.
+
+        Args:
+            private_key: Override environment variable
+
+        Returns:
+            Shared LLMClient instance
+        """
+        return self._get("llm", private_key)
+
+    def image_client(self, private_key: Optional[str] = None) -> "ImageClient":
+        """
+        Get the pooled ImageClient for a wallet.
+
+        Args:
+            private_key: Override environment variable
+
+        Returns:
+            Shared ImageClient instance
+        """
+        return self._get("image", private_key)
+
+    def close(self):
+        """Close all pooled clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            clients.extend(client for idle in self._idle.values() for client in idle)
+            self._clients.clear()
+            self._idle.clear()
+            self._closed = True
+
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def __enter__(self) -> "BlockRunSession":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_session: Optional[BlockRunSession] = None
+_default_lock = threading.Lock()
+
+
+def get_default_session() -> BlockRunSession:
+    """
+    Get the process-wide session used when no session is passed explicitly.
+
+    The session is created on first use and closed at interpreter exit.
+
+    Returns:
+        Shared BlockRunSession instance
+    """
+    global _default_session
+
+    with _default_lock:
+        if _default_session is None or _default_session._closed:
+            _default_session = BlockRunSession()
+            atexit.register(_default_session.close)
+        return _default_session
+
+
+class ThreadClients:
+    """
+    One client per thread, for worker pools that need each call's cost.
+
+    The SDK reports spending per client, not per response. Workers sharing
+    a client can only split its total; with one client per worker thread,
+    a client's spending delta around a call is exactly that call's cost.
+
+    Example:
+        with ThreadClients() as clients:
+            response, cost = clients.call(lambda client: client.chat(model, prompt))
+    """
+
+    def __init__(self, kind: str = "llm", private_key: Optional[str] = None):
+        """
+        Create a per-thread client pool.
+
+        Args:
+            kind: "llm" or "image"
+            private_key: Override environment variable
+        """
+        self._kind = kind
+        self._private_key = private_key
+        self._local = threading.local()
+        self._sessions: List[BlockRunSession] = []
+        self._lock = threading.Lock()
+
+    def client(self) -> Any:
+        """Get the calling thread's client, creating it on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = BlockRunSession()
+            with self._lock:
+                self._sessions.append(session)
+        return session._get(self._kind, self._private_key)
+
+    def call(self, fn: Callable[[Any], Any]) -> Tuple[Any, float]:
+        """
+        Run fn with the calling thread's client and measure what it paid.
+
+        Args:
+            fn: Called with the client; makes the request
+
+        Returns:
+            Tuple of (fn's result, USD spent by the client during the call)
+        """
+        client = self.client()
+        before = client.get_spending()["total_usd"]
+        result = fn(client)
+        return result, client.get_spending()["total_usd"] - before
+
+    def close(self):
+        """Close every thread's client."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+    def __enter__(self) -> "ThreadClients":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+# In-flight requests per async session; the SDK's pool allows 200
+# connections and a paid request holds two (402 probe, paid retry)
+MAX_CONCURRENCY = 64
+
+
+class AsyncBlockRunSession:
+    """
+    Pooled AsyncLLMClients plus a concurrency limit, for one event loop.
+
+    Every request made through the session waits for a slot first, so
+    ``asyncio.gather`` over any number of prompts keeps at most
+    max_concurrency requests (and sockets) open.
+
+    Example:
+        async with AsyncBlockRunSession(max_concurrency=16) as session:
+            answers = await asyncio.gather(
+                *(achat(p, model="deepseek/deepseek-chat", session=session) for p in prompts)
+            )
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY):
+        """
+        Create an async session.
+
+        Args:
+            max_concurrency: Most requests in flight at once
+        """
+        self._clients: Dict[Optional[str], Any] = {}
+        self._flights: Dict[Hashable, List[Any]] = {}
+        self.limiter = asyncio.Semaphore(max(1, max_concurrency))
+        self._closed = False
+
+    def llm_client(self, private_key: Optional[str] = None) -> "AsyncLLMClient":
+        """
+        Get the pooled AsyncLLMClient for a wallet.
+
+        Args:
+            private_key: Override environment variable
+
+        Returns:
+            Shared AsyncLLMClient instance
+        """
+        if not HAS_SDK:
+            raise ImportError(
+                "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
+            )
+        if self._closed:
+            raise RuntimeError("AsyncBlockRunSession is closed")
+
+        client = self._clients.get(private_key)
+        if client is None:
+            from blockrun_llm import AsyncLLMClient
+            client = AsyncLLMClient(private_key=private_key) if private_key else AsyncLLMClient()
+            self._clients[private_key] = client
+        return client
+
+    async def coalesce(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await factory(), sharing it with identical requests already in flight.
+
+        The request runs as its own task. A caller that is cancelled stops
+        waiting without disturbing the others; the request itself is only
+        cancelled once no caller is left waiting for it.
+
+        Args:
+            key: Identifies identical requests
+            factory: Returns the coroutine making the request
+
+        Returns:
+            The request's result (the same object for every caller)
+
+        Raises:
+            Exception: Whatever the request raised
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(factory())
+            flight = self._flights[key] = [task, 0]
+
+            def done(finished):
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                # Mark the outcome as retrieved even if every caller left
+                if not finished.cancelled():
+                    finished.exception()
+
+            task.add_done_callback(done)
+
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        except asyncio.CancelledError:
+            if flight[1] == 1 and not flight[0].done():
+                flight[0].cancel()
+            raise
+        finally:
+            flight[1] -= 1
+
+    async def aclose(self):
+        """Close all pooled clients."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._closed = True
+
+        for client in clients:
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+    async def __aenter__(self) -> "AsyncBlockRunSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+_async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncBlockRunSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_session() -> AsyncBlockRunSession:
+    """
+    Get the default async session of the running event loop.
+
+    The session is created on first use within each loop and dropped with
+    it; await ``session.aclose()`` before the loop ends to close its
+    connections promptly.
+
+    Returns:
+        Shared AsyncBlockRunSession instance for the running loop
+
+    Raises:
+        RuntimeError: If called outside a running event loop
+    """
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session._closed:
+        session = _async_sessions[loop] = AsyncBlockRunSession()
+    return session
@@ -0,0 +1,115 @@
+"""
+BlockRun SingleFlight - Coalescing of identical in-flight requests.
+
+When several threads make the same paid request at the same moment (a
+batch file with repeated prompts, agents retrying after a shared cache
+miss), only the first one goes upstream. The others wait for it and
+receive the very same result, or the same exception, without paying.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """One upstream call and the threads waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers share it.
+
+    Only calls that overlap are coalesced: once a call finishes its key is
+    forgotten, so a later identical request goes upstream again (use the
+    response cache to reuse finished results).
+
+    Example:
+        flights = SingleFlight()
+        response, leader = flights.do(key, lambda: client.chat(...))
+        if leader:
+            tracker.record(model, cost)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call fn, unless an identical call is already in flight.
+
+        Args:
+            key: Identifies identical requests (e.g. make_cache_key output)
+            fn: Makes the upstream call
+
+        Returns:
+            Tuple of (result, leader): leader is True for the caller that
+            actually ran fn, and False for callers that shared its result
+
+        Raises:
+            Exception: Whatever fn raised, in the leader and every follower
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.followers += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dict with "calls" (upstream calls made), "coalesced" (requests
+            that shared another's call, i.e. paid calls avoided) and
+            "in_flight"
+        """
+        with self._lock:
+            return {
+                "calls": self.leaders,
+                "coalesced": self.followers,
+                "in_flight": len(self._calls),
+            }
+
+
+_default_flights = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """
+    Get the process-wide SingleFlight used by chat_completion.
+
+    Returns:
+        Shared SingleFlight instance
+    """
+    return _default_flights
@@ -8,22 +8,36 @@ Your private key never leaves your machine - only signatures are transmitted.
 Usage:
     python run.py "Your prompt here"
     python run.py "Prompt" --model openai/gpt-5.2
+    python run.py "Prompt" --stream --output answer.md
+    python run.py "Prompt" --max-cost 0.002
     python run.py "Description" --image
+    python run.py "Description" --image --n 4
+    python run.py --batch prompts.jsonl --workers 8
+    python run.py --image --batch products.jsonl --out-dir images/
+    python run.py "Summarize the design" --map-reduce docs/
     python run.py --balance
+    python run.py --balance --wallets team.txt
+    python run.py --balance --refresh
+    python run.py --spending --stats
+    python run.py --spending --since 7d --by day
     python run.py --models
+    python run.py --daemon
 
 Environment:
     BLOCKRUN_WALLET_KEY: Your Base chain wallet private key (required)
     BLOCKRUN_API_URL: API endpoint (optional, default: https://blockrun.ai/api)
+    BLOCKRUN_BASE_RPCS: Comma-separated Base JSON-RPC endpoints for balances
+    BLOCKRUN_CACHE: Set to 1 to serve repeat requests from the response cache
+    BLOCKRUN_NO_DAEMON: Set to 1 to never forward commands to the daemon
 """
 
 import argparse
+import importlib.util
 import json
 import os
 import re
 import sys
-import urllib.request
-import urllib.error
+import time
 from typing import Optional
 
 # Plugin version (keep in sync with plugin.json)
@@ -36,17 +50,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from scripts.utils.branding import branding
     from scripts.utils.spending import SpendingTracker
+    from scripts.llm.router import KeywordMatcher, fastest_model
 except ImportError:
     # Fallback if running directly
     from utils.branding import branding
     from utils.spending import SpendingTracker
+    from llm.router import KeywordMatcher, fastest_model
 
-# Try to import blockrun_llm SDK
-try:
-    from blockrun_llm import LLMClient, ImageClient, APIError, PaymentError
-    HAS_SDK = True
-except ImportError:
-    HAS_SDK = False
+# The SDK (and httpx/eth-account behind it) is only imported by the commands
+# that make network calls, so local commands like --spending start fast
+HAS_SDK = importlib.util.find_spec("blockrun_llm") is not None
 
 
 def check_environment() -> bool:
@@ -69,25 +82,69 @@ def check_environment() -> bool:
     return True
 
 
-def is_realtime_query(prompt: str) -> bool:
-    """Check if prompt requires real-time data (Twitter/X)."""
-    prompt_lower = prompt.lower()
+# Budget held per call while it is in flight; settled to the actual cost
+CHAT_RESERVATION_USD = 0.005
+# Per image, for models without a known flat price
+IMAGE_RESERVATION_USD = 0.05
+
+
+def get_session():
+    """Get the process-wide client session (kept warm by the daemon)."""
+    try:
+        from scripts.llm.session import get_default_session
+    except ImportError:
+        from llm.session import get_default_session
+    return get_default_session()
 
+
+# Routing keywords, checked in this priority order by get_smart_model
+ROUTING_KEYWORDS = {
     # Direct keywords for real-time/social media queries
-    keywords = [
+    "realtime": [
         "twitter", "x.com", "trending", "elon", "musk",
         "breaking news", "latest posts", "live updates",
         "what are people saying", "current events"
-    ]
-    if any(word in prompt_lower for word in keywords):
-        return True
+    ],
+    "code": ["code", "python", "javascript", "function", "debug"],
+    "reasoning": ["math", "proof", "prove", "theorem", "logic", "reasoning", "solve", "calculate"],
+    "long": ["long", "document", "summarize", "analyze file"],
+}
+ROUTING_MATCHER = KeywordMatcher(ROUTING_KEYWORDS)
+
+# Catalog strength each label needs (for --fast)
+ROUTING_STRENGTHS = {
+    "realtime": "real-time",
+    "code": "coding",
+    "reasoning": "reasoning",
+    "long": "long-context",
+}
+
+# Twitter handle pattern (@username but not email): an @ not preceded by a
+# word char, followed by one. Starting with the literal "@" lets the regex
+# engine jump straight to candidates instead of testing every position.
+TWITTER_HANDLE = re.compile(r'@(?<!\w@)\w')
+
+
+def classify_prompt(prompt: str) -> set:
+    """
+    Classify a prompt for routing in a single pass over the text.
 
-    # Twitter handle pattern (@username but not email)
-    # Match @ followed by word chars, not preceded by word char (excludes email)
-    if re.search(r'(?<!\w)@\w+', prompt_lower):
-        return True
+    Returns:
+        Set of matched ROUTING_KEYWORDS labels
+    """
+    labels = set(ROUTING_MATCHER.match(prompt, stop_on="realtime"))
+    if "realtime" not in labels and TWITTER_HANDLE.search(prompt):
+        labels.add("realtime")
+    return labels
 
-    return False
+
+def is_realtime_query(prompt: str) -> bool:
+    """Check if prompt requires real-time data (Twitter/X)."""
+    # One label only: plain substring checks beat the full matcher here
+    prompt_lower = prompt.lower()
+    if any(keyword in prompt_lower for keyword in ROUTING_KEYWORDS["realtime"]):
+        return True
+    return TWITTER_HANDLE.search(prompt) is not None
 
 
 def get_smart_model(prompt: str, cheap: bool = False, fast: bool = False) -> str:
@@ -102,11 +159,11 @@ def get_smart_model(prompt: str, cheap: bool = False, fast: bool = False) -> str
     Returns:
         Model ID string
     """
-    prompt_lower = prompt.lower()
+    labels = classify_prompt(prompt)
 
     # PRIORITY 1: Real-time data requires Grok (even with --cheap)
     # Grok is the only model with live X/Twitter access
-    if is_realtime_query(prompt):
+    if "realtime" in labels:
         return "xai/grok-3"
 
     # Warn if conflicting flags used
@@ -117,23 +174,108 @@ def get_smart_model(prompt: str, cheap: bool = False, fast: bool = False) -> str
     if cheap:
         return "deepseek/deepseek-chat"
 
-    # Speed-optimized routing
+    # Speed-optimized routing: the fastest model with the strength the
+    # prompt needs, by measured latency or, for untried models, by catalog
+    # label; GPT-5 mini until anything has been measured
     if fast:
-        return "openai/gpt-5-mini"
+        strength = next(
+            (ROUTING_STRENGTHS[label] for label in ROUTING_KEYWORDS if label in labels),
+            "general",
+        )
+        return fastest_model(strength, default="openai/gpt-5-mini")
 
-    if any(word in prompt_lower for word in ["code", "python", "javascript", "function", "debug"]):
+    if "code" in labels:
         return "anthropic/claude-sonnet-4"
 
-    if any(word in prompt_lower for word in ["math", "proof", "prove", "theorem", "logic", "reasoning", "solve", "calculate"]):
+    if "reasoning" in labels:
         return "openai/o1-mini"
 
-    if any(word in prompt_lower for word in ["long", "document", "summarize", "analyze file"]):
+    if "long" in labels:
         return "google/gemini-2.0-flash"
 
     # Default: GPT-5.2 for general tasks
     return "openai/gpt-5.2"
 
 
+def save_output(path: str, text: str):
+    """Write a response to a file and confirm where it went."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    branding.print_success(f"Saved to: {path}")
+
+
+def record_failed_call(
+    tracker: SpendingTracker,
+    reservation: str,
+    model: str,
+    error: Exception,
+    started: Optional[float],
+    status: Optional[int] = None,
+    retries: int = 0,
+):
+    """Release a failed call's reservation, logging it so --stats counts errors."""
+    status = getattr(error, "status_code", None) or status
+    if status is None:
+        tracker.release(reservation)
+        return
+    latency_ms = (time.perf_counter() - started) * 1000.0 if started else None
+    tracker.settle(reservation, model, 0.0, latency_ms=latency_ms, status=status, retries=retries)
+
+
+class RetryCounter:
+    """on_retry callback for RetryPolicy.call that counts a call's retries."""
+
+    def __init__(self):
+        self.retries = 0
+
+    def __call__(self, retry: int, error: BaseException, delay: float):
+        self.retries += 1
+
+
+def image_reservation(model: str, n: int = 1) -> float:
+    """Budget to hold for n images: the model's flat price, else IMAGE_RESERVATION_USD each."""
+    try:
+        from scripts.llm.cost import get_pricing
+    except ImportError:
+        from llm.cost import get_pricing
+
+    pricing = get_pricing(model, fetch=True)
+    flat = pricing["flat"] if pricing else 0.0
+    return (flat or IMAGE_RESERVATION_USD) * n
+
+
+def apply_max_cost(model: str, messages: list, max_tokens: int, max_cost: float) -> Optional[int]:
+    """
+    Fit a call under --max-cost, lowering max_tokens if that is enough.
+
+    Args:
+        model: Model ID
+        messages: Chat messages to send
+        max_tokens: Requested maximum reply length
+        max_cost: Most the call may cost, in USD
+
+    Returns:
+        max_tokens to send, or None (after printing why) if the call must
+        not be made
+    """
+    try:
+        from scripts.llm.cost import get_pricing, fit_max_tokens, format_usd
+    except ImportError:
+        from llm.cost import get_pricing, fit_max_tokens, format_usd
+
+    if get_pricing(model, fetch=True) is None:
+        branding.print_error(f"No pricing known for {model}; cannot enforce --max-cost")
+        return None
+
+    fitted = fit_max_tokens(model, messages, max_tokens, max_cost)
+    if fitted is None:
+        branding.print_error(f"Refusing: even a short reply from {model} may cost more than {format_usd(max_cost)}")
+        return None
+    if fitted < max_tokens:
+        branding.print_info(f"--max-cost {format_usd(max_cost)}: max_tokens lowered from {max_tokens} to {fitted}")
+    return fitted
+
+
 def cmd_chat(
     prompt: str,
     model: Optional[str] = None,
@@ -142,6 +284,10 @@ def cmd_chat(
     fast: bool = False,
     max_tokens: int = 1024,
     temperature: Optional[float] = None,
+    cache: Optional[bool] = None,
+    stream: bool = False,
+    output: Optional[str] = None,
+    max_cost: Optional[float] = None,
 ):
     """Execute chat command."""
     if not HAS_SDK:
@@ -152,6 +298,8 @@ def cmd_chat(
         print("  Install with: pip install blockrun-llm")
         return 1
 
+    from blockrun_llm import APIError, PaymentError
+
     if not check_environment():
         return 1
 
@@ -163,10 +311,96 @@ def cmd_chat(
     # Determine model
     selected_model = model or get_smart_model(prompt, cheap=cheap, fast=fast)
 
-    # Check budget before making call
+    # Auto-enable search for Grok real-time queries (Twitter/X)
+    enable_search = "grok" in selected_model.lower() and is_realtime_query(prompt)
+
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    try:
+        from scripts.llm.cost import estimate_cost, format_estimate
+    except ImportError:
+        from llm.cost import estimate_cost, format_estimate
+
+    if max_cost is not None:
+        max_tokens = apply_max_cost(selected_model, messages, max_tokens, max_cost)
+        if max_tokens is None:
+            return 1
+    estimate = estimate_cost(selected_model, messages, max_tokens)
+
+    # A routed model that fails falls through to equivalent ones (an explicit
+    # --model is never substituted); fallbacks must fit --max-cost as well
+    candidates = [selected_model]
+    if model is None and not enable_search:
+        try:
+            from scripts.llm.router import route_candidates
+        except ImportError:
+            from llm.router import route_candidates
+
+        for candidate in route_candidates(selected_model)[1:]:
+            fallback_estimate = estimate_cost(candidate, messages, max_tokens)
+            if max_cost is not None and (
+                fallback_estimate is None or fallback_estimate["max_cost"] > max_cost
+            ):
+                continue
+            candidates.append(candidate)
+            if estimate and fallback_estimate and fallback_estimate["max_cost"] > estimate["max_cost"]:
+                # Reserve for the dearest model the call may end up on
+                estimate = dict(estimate, max_cost=fallback_estimate["max_cost"])
+
+    # Opt-in response cache (--cache or BLOCKRUN_CACHE=1); live search
+    # results are never cached
+    try:
+        from scripts.utils.config import get_config
+    except ImportError:
+        from utils.config import get_config
+
+    config = get_config()
+    if cache is None:
+        cache = config["cache"]
+
+    response_cache = None
+    if cache and not enable_search:
+        try:
+            from scripts.llm.cache import get_default_cache, make_cache_key
+            from scripts.llm.chat import response_to_dict
+        except ImportError:
+            from llm.cache import get_default_cache, make_cache_key
+            from llm.chat import response_to_dict
+
+        response_cache = get_default_cache()
+        cache_key = make_cache_key(
+            selected_model, messages, max_tokens=max_tokens, temperature=temperature
+        )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            # Served locally: no request, no budget debit
+            tracker = SpendingTracker()
+            _, remaining = tracker.check_budget()
+            budget_limit = tracker.get_limit()
+
+            content = cached["choices"][0]["message"]["content"]
+            branding.print_header(model=selected_model)
+            branding.print_response(content)
+            if output:
+                save_output(output, content)
+            branding.print_footer(
+                actual_cost="0.0000",
+                cached=True,
+                session_total=tracker.get_total(),
+                session_calls=tracker.get_calls(),
+                budget_remaining=remaining if budget_limit else None,
+                budget_limit=budget_limit,
+            )
+            return 0
+
+    # Hold budget for the call's worst case before making it, so concurrent
+    # calls cannot all pass the check and overshoot together
     tracker = SpendingTracker()
-    within_budget, remaining = tracker.check_budget()
-    if not within_budget:
+    reservation = tracker.reserve(estimate["max_cost"] if estimate else CHAT_RESERVATION_USD)
+    if reservation is None:
         branding.print_budget_error(
             spent=tracker.get_total(),
             limit=tracker.get_limit(),
@@ -175,49 +409,161 @@ def cmd_chat(
         return 1
 
     try:
-        client = LLMClient()
+        from scripts.llm.latency import get_latency_tracker
+        from scripts.llm.retry import DEFAULT_POLICY, is_retryable
+    except ImportError:
+        from llm.latency import get_latency_tracker
+        from llm.retry import DEFAULT_POLICY, is_retryable
+
+    started = None
+    retries = 0
+
+    def on_retry(retry, error, delay):
+        nonlocal retries
+        retries += 1
+        branding.print_info(f"{error} - retrying in {delay:.1f}s ({retry}/{DEFAULT_POLICY.attempts - 1})")
+
+    # A client of our own for the call: its spending delta is then this
+    # call's cost even while other daemon commands pay through the session
+    client = None
+    try:
+        client = get_session().acquire("llm")
+        spent_before = client.get_spending()['total_usd']
 
         # Print header
         branding.print_header(
             model=selected_model,
             wallet=client.get_wallet_address(),
+            cost_estimate=format_estimate(estimate) if estimate else None,
         )
 
-        # Auto-enable search for Grok real-time queries (Twitter/X)
-        enable_search = is_realtime_query(prompt) and "grok" in selected_model.lower()
-
-        # Execute chat
-        response = client.chat(
-            model=selected_model,
-            prompt=prompt,
-            system=system,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            search=enable_search,
-        )
-
-        # Print response
-        branding.print_response(response)
+        stream_stats = {}
+        if stream:
+            try:
+                from scripts.llm.chat import ChatStream
+            except ImportError:
+                from llm.chat import ChatStream
+
+            chat_stream = ChatStream(
+                client.chat_completion_stream(
+                    model=selected_model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    search=enable_search,
+                ),
+                selected_model,
+            )
+
+            # Write tokens through as they arrive; nothing is accumulated
+            started = time.perf_counter()
+            out = open(output, "w", encoding="utf-8") if output else None
+            try:
+                for text in chat_stream:
+                    sys.stdout.write(text)
+                    sys.stdout.flush()
+                    if out:
+                        out.write(text)
+            finally:
+                if out:
+                    out.close()
+            print()
 
-        # Record spending
+            if output:
+                branding.print_success(f"Saved to: {output}")
+            stream_stats = {
+                "ttft": chat_stream.ttft,
+                "tokens_per_sec": chat_stream.tokens_per_sec,
+            }
+            usage = chat_stream.usage
+            metrics = {
+                "latency_ms": chat_stream.elapsed * 1000.0,
+                "ttfb_ms": chat_stream.ttfb * 1000.0 if chat_stream.ttfb is not None else None,
+                "input_tokens": usage.prompt_tokens if usage else None,
+                "output_tokens": chat_stream.output_tokens,
+            }
+        else:
+            # Execute chat: each fallback gets one try, the last candidate
+            # retries timeouts, 429 and 5xx with backoff
+            def attempt():
+                nonlocal started
+                started = time.perf_counter()
+                return client.chat_completion(
+                    model=selected_model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    search=enable_search,
+                )
+
+            for index, selected_model in enumerate(candidates):
+                if index + 1 == len(candidates):
+                    result = DEFAULT_POLICY.call(attempt, on_retry=on_retry)
+                    break
+                try:
+                    result = attempt()
+                    break
+                except PaymentError:
+                    raise
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    status = getattr(e, "status_code", None)
+                    if status is not None:
+                        # Logged as an error for that model; nothing was charged
+                        tracker.record(
+                            selected_model, 0.0, status=status,
+                            latency_ms=(time.perf_counter() - started) * 1000.0,
+                        )
+                    # A fallback is not a retry: retries counts the retry
+                    # policy's tries of the model that finally answers
+                    branding.print_info(f"{selected_model}: {e} - falling back to {candidates[index + 1]}")
+            elapsed = time.perf_counter() - started
+            get_latency_tracker().observe(selected_model, elapsed)
+            response = result.choices[0].message.content
+            metrics = {
+                "latency_ms": elapsed * 1000.0,
+                "input_tokens": result.usage.prompt_tokens if result.usage else None,
+                "output_tokens": result.usage.completion_tokens if result.usage else None,
+            }
+
+            # Print response
+            branding.print_response(response)
+            if output:
+                save_output(output, response)
+            if selected_model != candidates[0]:
+                branding.print_info(f"Served by {selected_model} ({candidates[0]} failed)")
+
+            # A fallback's answer is not what the cache key describes
+            if response_cache and selected_model == candidates[0]:
+                response_cache.put(
+                    cache_key, selected_model, response_to_dict(result),
+                    ttl=config["cache_ttl"],
+                )
+
+        # Record spending (this call's delta on our client); one entry
+        # however many tries it took, failed tries cost nothing
         sdk_spending = client.get_spending()
-        call_cost = sdk_spending['total_usd']
-        tracker.record(selected_model, call_cost)
+        call_cost = sdk_spending['total_usd'] - spent_before
+        tracker.settle(reservation, selected_model, call_cost, status=200, retries=retries, **metrics)
 
         # Show spending with session totals
         budget_limit = tracker.get_limit()
+        _, remaining = tracker.check_budget()
         branding.print_footer(
             actual_cost=f"{call_cost:.4f}",
             session_total=tracker.get_total(),
             session_calls=tracker.get_calls(),
-            budget_remaining=remaining - call_cost if budget_limit else None,
+            budget_remaining=remaining if budget_limit else None,
             budget_limit=budget_limit,
+            **stream_stats,
         )
 
-        client.close()
         return 0
 
     except PaymentError as e:
+        record_failed_call(tracker, reservation, selected_model, e, started, status=402, retries=retries)
+
         # Show funding instructions for insufficient balance
         wallet = None
         try:
@@ -237,25 +583,693 @@ def cmd_chat(
             print()
         return 1
     except APIError as e:
+        record_failed_call(tracker, reservation, selected_model, e, started, retries=retries)
         error_str = str(e)
         if "400" in error_str:
             branding.print_error("Invalid request - model may not exist or parameters are wrong")
             print("\n  Run --models to see available models:")
             print("    python scripts/run.py --models\n")
+        elif retries:
+            branding.print_error(f"API error after {retries + 1} tries: {e}")
         else:
             branding.print_error(f"API error: {e}")
         return 1
     except Exception as e:
-        branding.print_error(f"Unexpected error: {e}")
+        tracker.release(reservation)
+        if retries:
+            branding.print_error(f"Request failed after {retries + 1} tries: {e}")
+        else:
+            branding.print_error(f"Unexpected error: {e}")
+        return 1
+    finally:
+        if client is not None:
+            get_session().release(client)
+
+
+def cmd_batch(
+    batch_file: str,
+    output: Optional[str] = None,
+    workers: int = 4,
+    cheap: bool = False,
+    fast: bool = False,
+    system: Optional[str] = None,
+    max_tokens: int = 1024,
+    temperature: Optional[float] = None,
+    max_cost: Optional[float] = None,
+):
+    """Execute a JSONL file of chat prompts concurrently."""
+    if not HAS_SDK:
+        branding.print_error(
+            "blockrun_llm SDK not installed",
+            help_link="https://github.com/blockrunai/blockrun-llm"
+        )
+        print("  Install with: pip install blockrun-llm")
+        return 1
+
+    from blockrun_llm import PaymentError
+
+    if not check_environment():
+        return 1
+
+    try:
+        from scripts.llm.batch import read_jobs, read_completed_ids, run_batch
+    except ImportError:
+        from llm.batch import read_jobs, read_completed_ids, run_batch
+
+    try:
+        from scripts.llm.cache import make_cache_key
+        from scripts.llm.cost import estimate_cost, fit_max_tokens, format_usd
+        from scripts.llm.latency import get_latency_tracker
+        from scripts.llm.retry import DEFAULT_POLICY
+        from scripts.llm.session import ThreadClients
+        from scripts.llm.singleflight import SingleFlight
+    except ImportError:
+        from llm.cache import make_cache_key
+        from llm.cost import estimate_cost, fit_max_tokens, format_usd
+        from llm.latency import get_latency_tracker
+        from llm.retry import DEFAULT_POLICY
+        from llm.session import ThreadClients
+        from llm.singleflight import SingleFlight
+
+    import threading
+
+    if not os.path.exists(batch_file):
+        branding.print_error(f"Batch file not found: {batch_file}")
+        return 1
+
+    # Default output sits next to the input: prompts.jsonl -> prompts.results.jsonl
+    output = output or f"{os.path.splitext(batch_file)[0]}.results.jsonl"
+    completed = read_completed_ids(output)
+
+    def plan(job):
+        """Model, messages and max_tokens for a job (None max_tokens: over --max-cost)."""
+        selected_model = job.get("model") or get_smart_model(job["prompt"], cheap=cheap, fast=fast)
+        job_system = job.get("system", system)
+        messages = [{"role": "system", "content": job_system}] if job_system else []
+        messages.append({"role": "user", "content": job["prompt"]})
+        job_max_tokens = job.get("max_tokens", max_tokens)
+        if max_cost is not None:
+            job_max_tokens = fit_max_tokens(selected_model, messages, job_max_tokens, max_cost)
+        return selected_model, messages, job_max_tokens
+
+    # Predict the whole run's cost before paying for any of it
+    low = high = 0.0
+    pending = unpriced = refused = 0
+    try:
+        for job in read_jobs(batch_file):
+            if job["id"] in completed:
+                continue
+            pending += 1
+            selected_model, messages, job_max_tokens = plan(job)
+            if job_max_tokens is None:
+                refused += 1
+                continue
+            estimate = estimate_cost(selected_model, messages, job_max_tokens)
+            if estimate is None:
+                unpriced += 1
+                continue
+            low += estimate["input_cost"]
+            high += estimate["max_cost"]
+    except ValueError as e:
+        branding.print_error(str(e))
+        return 1
+
+    tracker = SpendingTracker()
+    within_budget, _ = tracker.check_budget()
+    if not within_budget:
+        branding.print_budget_error(
+            spent=tracker.get_total(),
+            limit=tracker.get_limit(),
+            calls=tracker.get_calls()
+        )
         return 1
 
+    client = get_session().llm_client()
+    # A client per worker, so each call's spending delta is its own cost
+    clients = ThreadClients("llm")
+    latency = get_latency_tracker()
+    lock = threading.Lock()
+    state = {"payment_failed": False}
+    # Repeated prompts that are in flight together are sent (and paid) once
+    flights = SingleFlight()
+
+    def call(job):
+        selected_model, messages, job_max_tokens = plan(job)
+        result = {"id": job["id"], "model": selected_model}
+        if job_max_tokens is None:
+            result["error"] = f"May cost more than --max-cost {format_usd(max_cost)} (or no pricing known)"
+            return result
+        estimate = estimate_cost(selected_model, messages, job_max_tokens)
+        reservation = tracker.reserve(estimate["max_cost"] if estimate else CHAT_RESERVATION_USD)
+        if reservation is None:
+            result["error"] = "Daily budget reached"
+            return result
+
+        request = {
+            "model": selected_model,
+            "prompt": job["prompt"],
+            "system": job.get("system", system),
+            "max_tokens": job_max_tokens,
+            "temperature": job.get("temperature", temperature),
+            "search": "grok" in selected_model.lower() and is_realtime_query(job["prompt"]),
+        }
+        key = (
+            make_cache_key(
+                selected_model,
+                [{"role": "user", "content": request["prompt"]}],
+                system=request["system"],
+                max_tokens=request["max_tokens"],
+                temperature=request["temperature"],
+            ),
+            request["search"],
+        )
+        counter = RetryCounter()
+        try:
+            started = time.perf_counter()
+            (result["response"], cost), leader = flights.do(
+                key,
+                lambda: clients.call(
+                    lambda worker: DEFAULT_POLICY.call(lambda: worker.chat(**request), on_retry=counter)
+                ),
+            )
+        except PaymentError as e:
+            tracker.release(reservation)
+            state["payment_failed"] = True
+            result["error"] = f"Payment failed: {e}"
+            return result
+        except Exception as e:
+            tracker.release(reservation)
+            result["error"] = str(e)
+            return result
+
+        if not leader:
+            # Shared another job's call: nothing was paid or recorded for this one
+            tracker.release(reservation)
+            result["cost"] = 0.0
+            result["coalesced"] = True
+            return result
+        latency.observe(selected_model, time.perf_counter() - started)
+
+        result["cost"] = cost
+        tracker.settle(reservation, selected_model, cost, retries=counter.retries)
+        return result
+
+    def should_stop():
+        with lock:
+            return state["payment_failed"] or not tracker.check_budget()[0]
+
+    def on_result(result):
+        status = "error: " + result["error"] if result.get("error") else f"${result['cost']:.4f}"
+        if result.get("coalesced"):
+            status += " (shared identical request)"
+        print(f"  [{result['id']}] {result['model']}  {status}")
+
+    branding.print_header(
+        model="batch (per-prompt routing)",
+        wallet=client.get_wallet_address(),
+    )
+    if completed:
+        branding.print_info(f"Resuming: {len(completed)} prompts already in {output}")
+    estimate_note = f"Estimated cost for {pending} prompts: {format_usd(low)}-{format_usd(high)}"
+    if unpriced:
+        estimate_note += f" (+{unpriced} without known pricing)"
+    branding.print_info(estimate_note)
+    if refused:
+        branding.print_info(f"{refused} prompts exceed --max-cost {format_usd(max_cost)} and will be skipped")
+
+    try:
+        with clients:
+            counts = run_batch(
+                read_jobs(batch_file),
+                call,
+                output_path=output,
+                workers=workers,
+                skip_ids=completed,
+                should_stop=should_stop,
+                on_result=on_result,
+            )
+    except ValueError as e:
+        branding.print_error(str(e))
+        return 1
+
+    print()
+    branding.print_success(
+        f"Batch done: {counts['succeeded']} succeeded, {counts['failed']} failed, "
+        f"{counts['skipped']} skipped"
+    )
+    coalesced = flights.stats()["coalesced"]
+    if coalesced:
+        branding.print_success(f"Coalesced {coalesced} duplicate prompts (paid calls avoided)")
+    branding.print_success(f"Results: {output}")
+    if counts["stopped"]:
+        if state["payment_failed"]:
+            branding.print_error("Stopped early: payment failed (check wallet balance)")
+        else:
+            branding.print_budget_error(
+                spent=tracker.get_total(),
+                limit=tracker.get_limit(),
+                calls=tracker.get_calls()
+            )
+
+    within_budget, remaining = tracker.check_budget()
+    budget_limit = tracker.get_limit()
+    branding.print_footer(
+        session_total=tracker.get_total(),
+        session_calls=tracker.get_calls(),
+        budget_remaining=remaining if budget_limit else None,
+        budget_limit=budget_limit,
+    )
+    return 0 if counts["failed"] == 0 and not counts["stopped"] else 1
+
+
+def cmd_map_reduce(
+    source: str,
+    instruction: str,
+    model: Optional[str] = None,
+    workers: int = 4,
+    chunk_tokens: Optional[int] = None,
+    output: Optional[str] = None,
+):
+    """
+    Apply an instruction to a set of files too large for one prompt.
+
+    Files are chunked to a token budget and mapped concurrently on a cheap
+    model; the partial answers are then reduced in groups, level by level,
+    until one answer remains. Each stage's results go to a temporary JSONL
+    file, so memory use does not grow with the number of files.
+
+    Args:
+        source: Directory, glob pattern or file to read
+        instruction: What to do with the files (e.g. "Summarize")
+        model: Model for every map and reduce call (default: deepseek/deepseek-chat)
+        workers: Concurrent calls per stage
+        chunk_tokens: Source tokens per map call
+        output: Write the final answer to this file as well
+    """
+    if not HAS_SDK:
+        branding.print_error(
+            "blockrun_llm SDK not installed",
+            help_link="https://github.com/blockrunai/blockrun-llm"
+        )
+        print("  Install with: pip install blockrun-llm")
+        return 1
+
+    from blockrun_llm import APIError, PaymentError
+
+    if not check_environment():
+        return 1
+
+    try:
+        from scripts.llm.batch import run_batch
+        from scripts.llm.cost import estimate_cost, format_usd
+        from scripts.llm import mapreduce
+        from scripts.llm.retry import DEFAULT_POLICY
+        from scripts.llm.session import ThreadClients
+    except ImportError:
+        from llm.batch import run_batch
+        from llm.cost import estimate_cost, format_usd
+        from llm import mapreduce
+        from llm.retry import DEFAULT_POLICY
+        from llm.session import ThreadClients
+
+    import tempfile
+    import threading
+
+    model = model or mapreduce.DEFAULT_MODEL
+    chunk_tokens = chunk_tokens or mapreduce.CHUNK_TOKENS
+    if next(mapreduce.iter_files(source), None) is None:
+        branding.print_error(f"No text files found: {source}")
+        return 1
+
+    tracker = SpendingTracker()
+    within_budget, _ = tracker.check_budget()
+    if not within_budget:
+        branding.print_budget_error(
+            spent=tracker.get_total(),
+            limit=tracker.get_limit(),
+            calls=tracker.get_calls()
+        )
+        return 1
+
+    client = get_session().llm_client()
+    # A client per worker, so each call's spending delta is its own cost
+    clients = ThreadClients("llm")
+    lock = threading.Lock()
+    state = {"payment_failed": False}
+
+    def call(job, template):
+        result = {"id": job["id"], "model": model}
+        prompt = mapreduce.build_prompt(template, instruction, job)
+        estimate = estimate_cost(model, [{"role": "user", "content": prompt}], mapreduce.PARTIAL_TOKENS)
+        reservation = tracker.reserve(estimate["max_cost"] if estimate else CHAT_RESERVATION_USD)
+        if reservation is None:
+            result["error"] = "Daily budget reached"
+            return result
+
+        counter = RetryCounter()
+        started = time.perf_counter()
+        try:
+            result["response"], result["cost"] = clients.call(
+                lambda worker: DEFAULT_POLICY.call(
+                    lambda: worker.chat(model, prompt, max_tokens=mapreduce.PARTIAL_TOKENS),
+                    on_retry=counter,
+                )
+            )
+        except PaymentError as e:
+            record_failed_call(tracker, reservation, model, e, started, status=402, retries=counter.retries)
+            state["payment_failed"] = True
+            result["error"] = f"Payment failed: {e}"
+            return result
+        except APIError as e:
+            record_failed_call(tracker, reservation, model, e, started, retries=counter.retries)
+            result["error"] = str(e)
+            return result
+        except Exception as e:
+            tracker.release(reservation)
+            result["error"] = str(e)
+            return result
+        latency_ms = (time.perf_counter() - started) * 1000.0
+
+        tracker.settle(reservation, model, result["cost"],
+                       latency_ms=latency_ms, status=200, retries=counter.retries)
+        return result
+
+    def should_stop():
+        with lock:
+            return state["payment_failed"] or not tracker.check_budget()[0]
+
+    def run_stage(name, jobs, template, path):
+        """Run one stage; returns its counts, or None if it was stopped."""
+        progress = {"done": 0, "cost": 0.0}
+
+        def on_result(result):
+            progress["done"] += 1
+            progress["cost"] += result.get("cost", 0.0)
+            if result.get("error"):
+                print(f"  [{result['id']}] error: {result['error']}")
+            elif progress["done"] % max(1, workers) == 0:
+                print(f"  {name}: {progress['done']} done  {format_usd(progress['cost'])}")
+
+        started = time.perf_counter()
+        counts = run_batch(
+            jobs,
+            lambda job: call(job, template),
+            output_path=path,
+            workers=workers,
+            should_stop=should_stop,
+            on_result=on_result,
+        )
+        elapsed = time.perf_counter() - started
+        branding.print_success(
+            f"{name}: {counts['succeeded']} calls, {counts['failed']} failed, "
+            f"{format_usd(progress['cost'])}, {elapsed:.1f}s"
+        )
+        if counts["stopped"]:
+            if state["payment_failed"]:
+                branding.print_error("Stopped early: payment failed (check wallet balance)")
+            else:
+                branding.print_budget_error(
+                    spent=tracker.get_total(),
+                    limit=tracker.get_limit(),
+                    calls=tracker.get_calls()
+                )
+            return None
+        return counts
+
+    branding.print_header(
+        model=f"map-reduce ({model})",
+        wallet=client.get_wallet_address(),
+    )
+    branding.print_info(f"Source: {source}  ({chunk_tokens} tokens per chunk)")
+
+    final = None
+    failed = 0
+    with clients, tempfile.TemporaryDirectory(prefix="blockrun-mapreduce-") as work_dir:
+        # Map: one call per chunk of source text
+        stage_path = os.path.join(work_dir, "map.jsonl")
+        chunks = mapreduce.iter_chunks(mapreduce.iter_files(source), chunk_tokens)
+        counts = run_stage("Map", chunks, mapreduce.MAP_PROMPT, stage_path)
+        if counts is None:
+            return 1
+        failed += counts["failed"]
+        answers = mapreduce.count_answers(stage_path)
+
+        # Reduce: merge groups of partial answers until one is left
+        level = 1
+        while answers > 1:
+            reduce_path = os.path.join(work_dir, f"reduce{level}.jsonl")
+            groups = mapreduce.iter_groups(stage_path, level, chunk_tokens)
+            counts = run_stage(f"Reduce {level} ({answers} answers)", groups,
+                               mapreduce.REDUCE_PROMPT, reduce_path)
+            if counts is None:
+                return 1
+            failed += counts["failed"]
+            stage_path, level = reduce_path, level + 1
+            answers = mapreduce.count_answers(stage_path)
+
+        final = mapreduce.read_final(stage_path)
+
+    if final is None:
+        branding.print_error("No answer: every call in the last stage failed")
+        return 1
+    if failed:
+        branding.print_info(f"{failed} calls failed; the answer does not cover all of the files")
+
+    branding.print_response(final)
+    if output:
+        save_output(output, final)
+
+    within_budget, remaining = tracker.check_budget()
+    budget_limit = tracker.get_limit()
+    branding.print_footer(
+        session_total=tracker.get_total(),
+        session_calls=tracker.get_calls(),
+        budget_remaining=remaining if budget_limit else None,
+        budget_limit=budget_limit,
+    )
+    return 0 if failed == 0 else 1
+
+
+def cmd_image_batch(
+    batch_file: str,
+    out_dir: Optional[str] = None,
+    workers: int = 4,
+    model: Optional[str] = None,
+    size: str = "1024x1024",
+):
+    """
+    Generate an image for every prompt in a JSONL file.
+
+    Images are saved to out_dir under deterministic names, so rerunning the
+    same file skips every image already there. No viewer is opened.
+
+    Args:
+        batch_file: JSONL prompts file (see read_jobs; "model" and "size"
+            may be set per line)
+        out_dir: Directory for the images and results.jsonl
+            (default: <batch>_images)
+        workers: Concurrent generations
+        model: Image model for lines that do not set one
+        size: Image size for lines that do not set one
+    """
+    if not HAS_SDK:
+        branding.print_error(
+            "blockrun_llm SDK not installed",
+            help_link="https://github.com/blockrunai/blockrun-llm"
+        )
+        print("  Install with: pip install blockrun-llm")
+        return 1
+
+    from blockrun_llm import APIError, PaymentError
+
+    if not check_environment():
+        return 1
+
+    try:
+        from scripts.llm.batch import read_jobs, run_batch
+        from scripts.llm.image import download_image, existing_stems, image_stem
+        from scripts.llm.retry import DEFAULT_POLICY
+        from scripts.llm.session import ThreadClients
+    except ImportError:
+        from llm.batch import read_jobs, run_batch
+        from llm.image import download_image, existing_stems, image_stem
+        from llm.retry import DEFAULT_POLICY
+        from llm.session import ThreadClients
+
+    import threading
+
+    if not os.path.exists(batch_file):
+        branding.print_error(f"Batch file not found: {batch_file}")
+        return 1
+
+    out_dir = out_dir or f"{os.path.splitext(batch_file)[0]}_images"
+    os.makedirs(out_dir, exist_ok=True)
+    default_model = model or "google/nano-banana"
+
+    def stem_of(job):
+        return image_stem(job["id"], job["prompt"], job.get("model", default_model), job.get("size", size))
+
+    # Resume: a job is done when its image is on disk
+    try:
+        present = existing_stems(out_dir)
+        done_ids = {job["id"] for job in read_jobs(batch_file) if stem_of(job) in present}
+    except ValueError as e:
+        branding.print_error(str(e))
+        return 1
+
+    tracker = SpendingTracker()
+    within_budget, _ = tracker.check_budget()
+    if not within_budget:
+        branding.print_budget_error(
+            spent=tracker.get_total(),
+            limit=tracker.get_limit(),
+            calls=tracker.get_calls()
+        )
+        return 1
+
+    client = get_session().image_client()
+    # A client per worker, so each call's spending delta is its own cost
+    clients = ThreadClients("image")
+    lock = threading.Lock()
+    state = {"payment_failed": False, "cost": 0.0}
+
+    def call(job):
+        selected_model = job.get("model", default_model)
+        result = {"id": job["id"], "model": selected_model}
+        reservation = tracker.reserve(image_reservation(selected_model))
+        if reservation is None:
+            result["error"] = "Daily budget reached"
+            return result
+
+        counter = RetryCounter()
+        started = time.perf_counter()
+        try:
+            response, result["cost"] = clients.call(lambda worker: DEFAULT_POLICY.call(
+                lambda: worker.generate(
+                    prompt=job["prompt"],
+                    model=selected_model,
+                    size=job.get("size", size),
+                ),
+                on_retry=counter,
+            ))
+        except PaymentError as e:
+            record_failed_call(tracker, reservation, selected_model, e, started, status=402,
+                               retries=counter.retries)
+            state["payment_failed"] = True
+            result["error"] = f"Payment failed: {e}"
+            return result
+        except APIError as e:
+            record_failed_call(tracker, reservation, selected_model, e, started, retries=counter.retries)
+            result["error"] = str(e)
+            return result
+        except Exception as e:
+            tracker.release(reservation)
+            result["error"] = str(e)
+            return result
+        latency_ms = (time.perf_counter() - started) * 1000.0
+
+        with lock:
+            state["cost"] += result["cost"]
+        tracker.settle(reservation, selected_model, result["cost"],
+                       latency_ms=latency_ms, status=200, retries=counter.retries)
+
+        # Paid for either way; a failed save is retried on the next run
+        # (which pays again), so report it as an error
+        if not response.data:
+            result["error"] = "No image data returned"
+            return result
+        try:
+            result["file"] = download_image(response.data[0].url, os.path.join(out_dir, stem_of(job)))
+        except Exception as e:
+            result["error"] = f"Could not save image: {e}"
+        return result
+
+    def should_stop():
+        with lock:
+            return state["payment_failed"] or not tracker.check_budget()[0]
+
+    def on_result(result):
+        if result.get("error"):
+            status = "error: " + result["error"]
+        else:
+            status = f"{os.path.basename(result['file'])}  ${result['cost']:.4f}"
+        print(f"  [{result['id']}] {result['model']}  {status}")
+
+    branding.print_header(
+        model=f"image batch ({default_model})",
+        wallet=client.get_wallet_address(),
+    )
+    if done_ids:
+        branding.print_info(f"Resuming: {len(done_ids)} images already in {out_dir}")
+
+    started = time.perf_counter()
+    try:
+        with clients:
+            counts = run_batch(
+                read_jobs(batch_file),
+                call,
+                output_path=os.path.join(out_dir, "results.jsonl"),
+                workers=workers,
+                skip_ids=done_ids,
+                should_stop=should_stop,
+                on_result=on_result,
+            )
+    except ValueError as e:
+        branding.print_error(str(e))
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print()
+    branding.print_success(
+        f"Batch done: {counts['succeeded']} generated, {counts['failed']} failed, "
+        f"{counts['skipped']} skipped"
+    )
+    if counts["succeeded"]:
+        per_minute = counts["succeeded"] / elapsed * 60.0 if elapsed else 0.0
+        per_image = state["cost"] / counts["succeeded"]
+        branding.print_success(
+            f"{per_minute:.1f} images/min  |  ${per_image:.4f} per image  |  ${state['cost']:.4f} total"
+        )
+    branding.print_success(f"Images: {out_dir}")
+    if counts["stopped"]:
+        if state["payment_failed"]:
+            branding.print_error("Stopped early: payment failed (check wallet balance)")
+        else:
+            branding.print_budget_error(
+                spent=tracker.get_total(),
+                limit=tracker.get_limit(),
+                calls=tracker.get_calls()
+            )
+
+    within_budget, remaining = tracker.check_budget()
+    budget_limit = tracker.get_limit()
+    branding.print_footer(
+        session_total=tracker.get_total(),
+        session_calls=tracker.get_calls(),
+        budget_remaining=remaining if budget_limit else None,
+        budget_limit=budget_limit,
+    )
+    return 0 if counts["failed"] == 0 and not counts["stopped"] else 1
+
 
 def cmd_image(
     prompt: str,
     model: Optional[str] = None,
     size: str = "1024x1024",
+    n: int = 1,
+    out_dir: Optional[str] = None,
 ):
-    """Execute image generation command."""
+    """
+    Execute image generation command.
+
+    Args:
+        prompt: Image description
+        model: Image model (default: google/nano-banana)
+        size: Image size
+        n: Number of images; fanned out into parallel requests for models
+            that return one image per request
+        out_dir: Directory to save images in (default: current directory)
+    """
     if not HAS_SDK:
         branding.print_error(
             "blockrun_llm SDK not installed",
@@ -264,15 +1278,35 @@ def cmd_image(
         print("  Install with: pip install blockrun-llm")
         return 1
 
+    from blockrun_llm import APIError, PaymentError
+
     if not check_environment():
         return 1
 
+    if n < 1:
+        branding.print_error("--n must be at least 1")
+        return 1
+
+    try:
+        from scripts.llm.image import generate_image, download_images
+        from scripts.llm.retry import DEFAULT_POLICY
+    except ImportError:
+        from llm.image import generate_image, download_images
+        from llm.retry import DEFAULT_POLICY
+
     selected_model = model or "google/nano-banana"
+    retries = 0
 
-    # Check budget before making call
+    def on_retry(retry, error, delay):
+        nonlocal retries
+        retries += 1
+        branding.print_info(f"{error} - retrying in {delay:.1f}s ({retry}/{DEFAULT_POLICY.attempts - 1})")
+
+    # Hold budget for the call before making it, so concurrent calls
+    # cannot all pass the check and overshoot together
     tracker = SpendingTracker()
-    within_budget, remaining = tracker.check_budget()
-    if not within_budget:
+    reservation = tracker.reserve(image_reservation(selected_model, n))
+    if reservation is None:
         branding.print_budget_error(
             spent=tracker.get_total(),
             limit=tracker.get_limit(),
@@ -280,8 +1314,12 @@ def cmd_image(
         )
         return 1
 
+    started = None
+    # A client of our own, so its spending delta is this command's cost (see cmd_chat)
+    client = None
     try:
-        client = ImageClient()
+        client = get_session().acquire("image")
+        spent_before = client.get_spending()['total_usd']
 
         # Print header
         branding.print_header(
@@ -289,69 +1327,89 @@ def cmd_image(
             wallet=client.get_wallet_address(),
         )
 
-        branding.print_info(f"Generating image: \"{prompt[:50]}...\"")
+        label = "image" if n == 1 else f"{n} images"
+        branding.print_info(f"Generating {label}: \"{prompt[:50]}...\"")
         print()
 
-        # Generate image
-        result = client.generate(
-            prompt=prompt,
-            model=selected_model,
-            size=size,
+        # Generate image(s)
+        started = time.perf_counter()
+        # Nothing is paid unless an image comes back (a fan-out only
+        # raises when every request failed), so a retry cannot pay twice
+        result = DEFAULT_POLICY.call(
+            lambda: generate_image(
+                prompt,
+                model=selected_model,
+                size=size,
+                n=n,
+                client=client,
+            ),
+            on_retry=on_retry,
         )
+        latency_ms = (time.perf_counter() - started) * 1000.0
 
         # Print result
         if result.data and len(result.data) > 0:
-            image_url = result.data[0].url
-            branding.print_success("Image generated!")
+            urls = [image.url for image in result.data]
+            if len(urls) < n:
+                branding.print_info(f"Only {len(urls)} of {n} images were generated")
+            branding.print_success("Image generated!" if len(urls) == 1 else f"{len(urls)} images generated!")
 
-            # Save image to file
+            # Save next to the user, one file per image (extension follows the format)
             import subprocess
             from datetime import datetime
 
-            # Create filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"blockrun_image_{timestamp}.png"
-            filepath = os.path.join(os.getcwd(), filename)
-
-            try:
-                # Download and save
-                urllib.request.urlretrieve(image_url, filepath)
-                branding.print_success(f"Saved to: {filepath}")
-
-                # Try to open with system viewer
-                if sys.platform == "darwin":  # macOS
-                    subprocess.run(["open", filepath], check=False)
-                elif sys.platform == "linux":
-                    subprocess.run(["xdg-open", filepath], check=False)
-                elif sys.platform == "win32":
-                    os.startfile(filepath)
-
-            except Exception as e:
-                # Fallback to just showing URL
-                print(f"\n  URL: {image_url}")
-                print(f"  (Could not save locally: {e})\n")
+            paths = [
+                os.path.join(out_dir or os.getcwd(), f"blockrun_image_{timestamp}" + (f"_{i + 1}" if len(urls) > 1 else ""))
+                for i in range(len(urls))
+            ]
+            saved = download_images(urls, paths)
+
+            for image_url, outcome in zip(urls, saved):
+                if isinstance(outcome, Exception):
+                    # Fallback to just showing URL
+                    shown = image_url if not image_url.startswith("data:") else image_url[:40] + "..."
+                    print(f"\n  URL: {shown}")
+                    print(f"  (Could not save locally: {outcome})\n")
+                else:
+                    branding.print_success(f"Saved to: {outcome}")
+
+            # Try to open a single image with the system viewer
+            if len(saved) == 1 and not isinstance(saved[0], Exception):
+                filepath = saved[0]
+                try:
+                    if sys.platform == "darwin":  # macOS
+                        subprocess.run(["open", filepath], check=False)
+                    elif sys.platform == "linux":
+                        subprocess.run(["xdg-open", filepath], check=False)
+                    elif sys.platform == "win32":
+                        os.startfile(filepath)
+                except OSError:
+                    pass
         else:
             branding.print_error("No image data returned")
 
-        # Record spending
+        # Record spending (this command's delta on our client)
         sdk_spending = client.get_spending()
-        call_cost = sdk_spending['total_usd']
-        tracker.record(selected_model, call_cost)
+        call_cost = sdk_spending['total_usd'] - spent_before
+        tracker.settle(reservation, selected_model, call_cost, latency_ms=latency_ms, status=200, retries=retries)
 
         # Show spending with session totals
         budget_limit = tracker.get_limit()
+        _, remaining = tracker.check_budget()
         branding.print_footer(
             actual_cost=f"{call_cost:.4f}",
             session_total=tracker.get_total(),
             session_calls=tracker.get_calls(),
-            budget_remaining=remaining - call_cost if budget_limit else None,
+            budget_remaining=remaining if budget_limit else None,
             budget_limit=budget_limit,
         )
 
-        client.close()
         return 0
 
     except PaymentError as e:
+        record_failed_call(tracker, reservation, selected_model, e, started, status=402, retries=retries)
+
         # Show funding instructions for insufficient balance
         wallet = None
         try:
@@ -371,6 +1429,7 @@ def cmd_image(
             print()
         return 1
     except APIError as e:
+        record_failed_call(tracker, reservation, selected_model, e, started, retries=retries)
         error_str = str(e)
         if "400" in error_str:
             branding.print_error("Invalid request - check model and size parameters")
@@ -380,68 +1439,60 @@ def cmd_image(
             branding.print_error(f"API error: {e}")
         return 1
     except Exception as e:
+        tracker.release(reservation)
         branding.print_error(f"Unexpected error: {e}")
         return 1
+    finally:
+        if client is not None:
+            get_session().release(client)
 
 
-def is_valid_wallet_address(address: str) -> bool:
-    """Validate Ethereum wallet address format."""
-    if not address or not isinstance(address, str):
-        return False
-    if not address.startswith("0x"):
-        return False
-    if len(address) != 42:
-        return False
-    try:
-        int(address[2:], 16)
-        return True
-    except ValueError:
-        return False
-
-
-def get_usdc_balance(wallet_address: str) -> Optional[float]:
+def read_wallet_list(path: str) -> list:
     """
-    Get USDC balance for a wallet address on Base chain.
+    Read wallet addresses from a file, one per line.
+
+    Blank lines and lines starting with # are skipped.
 
     Args:
-        wallet_address: Ethereum wallet address (0x...)
+        path: Text file of addresses
 
     Returns:
-        USDC balance as float, or None if query fails
+        Addresses in file order
     """
-    if not is_valid_wallet_address(wallet_address):
-        return None
+    with open(path) as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
 
-    import httpx
 
-    # USDC contract on Base
-    USDC_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
-    BASE_RPC = "https://mainnet.base.org"
+def cmd_balance(wallets: Optional[str] = None, refresh: bool = False):
+    """
+    Show wallet balance.
 
+    Args:
+        wallets: File of addresses to look up instead of the agent wallet
+        refresh: Bypass the balance cache
+    """
     try:
-        # balanceOf(address) function selector: 0x70a08231
-        data = {
-            "jsonrpc": "2.0",
-            "method": "eth_call",
-            "params": [{
-                "to": USDC_ADDRESS,
-                "data": f"0x70a08231000000000000000000000000{wallet_address[2:]}"
-            }, "latest"],
-            "id": 1
-        }
+        from scripts.wallet.balance import get_balance_service
+    except ImportError:
+        from wallet.balance import get_balance_service
 
-        with httpx.Client(timeout=10) as client:
-            response = client.post(BASE_RPC, json=data)
-            result = response.json().get("result", "0x0")
-            # USDC has 6 decimals
-            return int(result, 16) / 1e6
+    service = get_balance_service()
 
-    except Exception:
-        return None
+    if wallets:
+        try:
+            addresses = read_wallet_list(wallets)
+        except OSError as e:
+            branding.print_error(f"Cannot read wallet list: {e}")
+            return 1
+        if not addresses:
+            branding.print_error(f"No wallet addresses in {wallets}")
+            return 1
 
+        balances = service.get_balances(addresses, refresh=refresh)
+        branding.print_balances(balances, network="Base")
+        return 0 if all(b is not None for b in balances.values()) else 1
 
-def cmd_balance():
-    """Show wallet balance."""
     if not HAS_SDK:
         branding.print_error(
             "blockrun_llm SDK not installed",
@@ -453,11 +1504,11 @@ def cmd_balance():
         return 1
 
     try:
-        client = LLMClient()
+        client = get_session().llm_client()
         wallet = client.get_wallet_address()
 
         # Get actual USDC balance from Base chain
-        balance = get_usdc_balance(wallet)
+        balance = service.get_balance(wallet, refresh=refresh)
         balance_str = f"{balance:.6f}" if balance is not None else "(unable to fetch)"
 
         branding.print_balance(
@@ -466,7 +1517,6 @@ def cmd_balance():
             network="Base"
         )
 
-        client.close()
         return 0
 
     except Exception as e:
@@ -504,50 +1554,72 @@ def cmd_qr():
         return 1
 
 
-def cmd_models():
-    """List available models (no wallet required)."""
+def get_model_catalog():
+    """Return the shared on-disk model catalog."""
     try:
-        # Try to use SDK standalone functions first
-        from blockrun_llm import list_models, list_image_models
+        from scripts.llm.catalog import get_catalog
+    except ImportError:
+        from llm.catalog import get_catalog
+    return get_catalog()
 
-        llm_models = list_models()
-        image_models = list_image_models()
 
-        if llm_models or image_models:
-            branding.print_models_list(llm_models, image_models)
-        else:
-            branding.print_info("No models returned. Check API connection.")
+def check_model(model: str) -> bool:
+    """
+    Reject a --model the catalog does not know, before anything is paid for.
 
-        return 0
+    Args:
+        model: Model ID given on the command line
 
-    except ImportError:
-        # Fallback: direct API call if SDK not updated
-        import httpx
+    Returns:
+        True if the model exists (or no catalog is available to check)
+    """
+    suggestions = get_model_catalog().check(model)
+    if suggestions is None:
+        return True
 
-        try:
-            with httpx.Client(timeout=30) as client:
-                response = client.get("https://blockrun.ai/api/v1/models")
-                if response.status_code == 200:
-                    models = response.json().get("data", [])
-                    branding.print_models_list(models, [])
-                    return 0
-                else:
-                    branding.print_error(f"API error: {response.status_code}")
-                    return 1
-        except Exception as e:
-            branding.print_error(f"Could not fetch models: {e}")
-            return 1
+    branding.print_error(f"Unknown model '{model}'")
+    if suggestions:
+        print(f"  Did you mean: {', '.join(suggestions)}")
+    print("  Run with --models to list available models")
+    print()
+    return False
 
+
+def cmd_models(refresh: bool = False):
+    """
+    List available models (no wallet required).
+
+    Args:
+        refresh: Revalidate the cached catalog before listing
+    """
+    try:
+        models = get_model_catalog().get_models(refresh=refresh)
     except Exception as e:
-        branding.print_error(f"Error: {e}")
+        branding.print_error(f"Could not fetch models: {e}")
         return 1
 
+    image_models = [m for m in models if "image" in (m.get("categories") or [])]
+    llm_models = [
+        m for m in models
+        if "chat" in (m.get("categories") or ["chat"])
+    ]
+
+    if llm_models or image_models:
+        branding.print_models_list(llm_models, image_models)
+    else:
+        branding.print_info("No models returned. Check API connection.")
+
+    return 0
+
 
 def cmd_check_update():
     """Check for plugin updates from GitHub."""
     print(f"\n  BlockRun Plugin v{__version__}")
     print("  Checking for updates...\n")
 
+    import urllib.request
+    import urllib.error
+
     try:
         req = urllib.request.Request(
             GITHUB_PLUGIN_URL,
@@ -596,10 +1668,52 @@ def cmd_version():
     return 0
 
 
-def cmd_spending():
-    """Show spending summary."""
+def cmd_spending(
+    stats: bool = False,
+    since: Optional[str] = None,
+    by: Optional[str] = None,
+    csv_path: Optional[str] = None,
+):
+    """
+    Show spending summary.
+
+    With since, by or csv_path the answer comes from the multi-day ledger
+    instead of today's session.
+    """
     tracker = SpendingTracker()
-    branding.print_spending_summary(tracker.data)
+    if since is None and by is None and csv_path is None:
+        branding.print_spending_summary(tracker.data)
+        if stats:
+            branding.print_performance_stats(tracker.get_stats())
+        return 0
+
+    try:
+        from scripts.utils.ledger import parse_since
+    except ImportError:
+        from utils.ledger import parse_since
+
+    try:
+        start = parse_since(since) if since else None
+    except ValueError as e:
+        branding.print_error(str(e))
+        return 1
+
+    ledger = tracker.get_ledger()
+    if ledger is None:
+        branding.print_error("Could not open the spending ledger")
+        return 1
+
+    if csv_path:
+        if csv_path == "-":
+            ledger.export_csv(sys.stdout, since=start)
+            return 0
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            count = ledger.export_csv(f, since=start)
+        branding.print_success(f"Exported {count} calls to: {csv_path}")
+        return 0
+
+    by = by or "model"
+    branding.print_spending_breakdown(ledger.aggregate(by=by, since=start), by, since=start)
     return 0
 
 
@@ -631,8 +1745,93 @@ def cmd_clear_budget():
     return 0
 
 
-def main():
-    """Main CLI entry point."""
+def cmd_daemon():
+    """Run the BlockRun daemon in the foreground."""
+    try:
+        from scripts import daemon
+    except ImportError:
+        import daemon
+
+    if not daemon.is_supported():
+        branding.print_error("The daemon needs Unix domain sockets (not available on this platform)")
+        return 1
+
+    def warmup():
+        # Import the SDK, parse the wallet and derive the account up front
+        if HAS_SDK and check_environment():
+            session = get_session()
+            session.llm_client()
+            # Leave a warm client idle for the first forwarded chat
+            session.release(session.acquire("llm"))
+
+        branding.print_success(f"BlockRun daemon listening on {daemon.SOCKET_PATH}")
+        print("  Stop with: python scripts/run.py --daemon-stop\n")
+        sys.stdout.flush()
+
+    # Color follows each client's terminal (its stream's isatty)
+    branding.use_color = True
+
+    try:
+        daemon.serve(run_command, warmup=warmup)
+    except RuntimeError as e:
+        branding.print_error(str(e))
+        return 1
+    return 0
+
+
+def cmd_daemon_stop():
+    """Stop a running BlockRun daemon."""
+    try:
+        from scripts import daemon
+    except ImportError:
+        import daemon
+
+    if daemon.stop():
+        branding.print_success("BlockRun daemon stopped")
+        return 0
+    branding.print_info("No BlockRun daemon running")
+    return 0
+
+
+# Flags that must always run in this process rather than in the daemon
+LOCAL_ONLY_FLAGS = {"--daemon", "--daemon-stop", "--no-daemon"}
+
+# Same location as scripts/daemon.py SOCKET_PATH
+DAEMON_SOCKET = os.path.join(os.path.expanduser("~"), ".blockrun", "daemon.sock")
+
+
+def main(argv: Optional[list] = None):
+    """Main CLI entry point: forward to the daemon if running, else run here."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    forward = (
+        not LOCAL_ONLY_FLAGS.intersection(argv)
+        and not os.environ.get("BLOCKRUN_NO_DAEMON")
+        # Cheap existence check before importing the socket machinery
+        and os.path.exists(DAEMON_SOCKET)
+    )
+    if forward:
+        try:
+            from scripts import daemon
+        except ImportError:
+            import daemon
+
+        code = daemon.forward(argv)
+        if code is not None:
+            return code
+
+    return run_command(argv)
+
+
+def run_command(argv: list, cwd: Optional[str] = None):
+    """
+    Parse arguments and run the command in this process.
+
+    Args:
+        argv: Command-line arguments (without the program name)
+        cwd: Directory relative paths are resolved against (default: the
+            current directory); the daemon passes the client's
+    """
     parser = argparse.ArgumentParser(
         prog="blockrun-agent-wallet",
         description="BlockRun Claude Code Wallet - Access unlimited LLMs via USDC micropayments",
@@ -641,6 +1840,8 @@ Examples:
   %(prog)s "What is quantum computing?"
   %(prog)s "Analyze this code" --model anthropic/claude-sonnet-4
   %(prog)s "A sunset over mountains" --image
+  %(prog)s --batch prompts.jsonl --workers 8
+  %(prog)s "Summarize these notes" --map-reduce notes/
   %(prog)s --balance
   %(prog)s --models
 
@@ -667,6 +1868,11 @@ More info: https://blockrun.ai
         action="store_true",
         help="Show wallet balance",
     )
+    parser.add_argument(
+        "--wallets",
+        metavar="FILE",
+        help="With --balance: show USDC balances for the addresses in FILE (one per line)",
+    )
     parser.add_argument(
         "--qr",
         action="store_true",
@@ -694,6 +1900,25 @@ More info: https://blockrun.ai
         action="store_true",
         help="Show spending summary for today",
     )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="With --spending: show p50/p95/p99 latency and tokens/sec per model",
+    )
+    parser.add_argument(
+        "--since",
+        help="With --spending: include calls since 24h, 7d, 2w or a date like 2025-01-31",
+    )
+    parser.add_argument(
+        "--by",
+        choices=["model", "day", "hour"],
+        help="With --spending: group spend by model, day or hour (default: model)",
+    )
+    parser.add_argument(
+        "--csv",
+        metavar="FILE",
+        help="With --spending: export individual calls as CSV (- for stdout)",
+    )
     parser.add_argument(
         "--set-budget",
         type=float,
@@ -731,11 +1956,76 @@ More info: https://blockrun.ai
         default=1024,
         help="Maximum tokens to generate (default: 1024)",
     )
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        metavar="USD",
+        help="Most a single call may cost; max_tokens is lowered to fit, or the call is refused",
+    )
     parser.add_argument(
         "--temperature", "-t",
         type=float,
         help="Sampling temperature (0.0-2.0)",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print tokens as they arrive and report time-to-first-token",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="cache",
+        action="store_true",
+        default=None,
+        help="Serve identical repeat requests from the local response cache (or set BLOCKRUN_CACHE=1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Bypass the response cache even if BLOCKRUN_CACHE is set",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="With --balance or --models: refetch instead of using cached results",
+    )
+
+    # Batch options
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run a JSONL file of prompts concurrently (one JSON object per line)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        metavar="FILE",
+        help="Write the chat response to FILE; with --batch, the results JSONL "
+             "(default: <batch>.results.jsonl, existing IDs are skipped)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent workers for --batch (default: 4)",
+    )
+    parser.add_argument(
+        "--map-reduce",
+        metavar="PATH",
+        help="Apply the prompt to every text file in a directory or glob: chunk, map "
+             "concurrently, then merge the partial answers (default model: deepseek/deepseek-chat)",
+    )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        help="With --map-reduce: source tokens per map call (default: 6000)",
+    )
+    parser.add_argument(
+        "--out-dir",
+        metavar="DIR",
+        help="With --image --batch: directory for the images (default: <batch>_images, "
+             "images already there are skipped)",
+    )
 
     # Image options
     parser.add_argument(
@@ -743,11 +2033,47 @@ More info: https://blockrun.ai
         default="1024x1024",
         help="Image size (default: 1024x1024)",
     )
+    parser.add_argument(
+        "--n",
+        type=int,
+        default=1,
+        help="Number of images to generate (default: 1; parallel requests where a model returns one per call)",
+    )
+
+    # Daemon options
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run a warm background daemon that later invocations forward to",
+    )
+    parser.add_argument(
+        "--daemon-stop",
+        action="store_true",
+        help="Stop the running daemon",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if a daemon is running (or set BLOCKRUN_NO_DAEMON=1)",
+    )
 
     # Parse arguments
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    if cwd:
+        # Never chdir: the daemon runs several commands at once
+        for name in ("wallets", "csv", "batch", "output", "map_reduce", "out_dir"):
+            path = getattr(args, name)
+            if path and path != "-":
+                setattr(args, name, os.path.join(cwd, os.path.expanduser(path)))
 
     # Handle commands
+    if args.daemon:
+        return cmd_daemon()
+
+    if args.daemon_stop:
+        return cmd_daemon_stop()
+
     if args.version:
         return cmd_version()
 
@@ -755,16 +2081,16 @@ More info: https://blockrun.ai
         return cmd_check_update()
 
     if args.balance:
-        return cmd_balance()
+        return cmd_balance(wallets=args.wallets, refresh=args.refresh)
 
     if args.qr:
         return cmd_qr()
 
     if args.models:
-        return cmd_models()
+        return cmd_models(refresh=args.refresh)
 
     if args.spending:
-        return cmd_spending()
+        return cmd_spending(stats=args.stats, since=args.since, by=args.by, csv_path=args.csv)
 
     if args.set_budget is not None:
         return cmd_set_budget(args.set_budget)
@@ -772,6 +2098,44 @@ More info: https://blockrun.ai
     if args.clear_budget:
         return cmd_clear_budget()
 
+    if (args.batch or args.prompt) and args.model and not check_model(args.model):
+        return 1
+
+    if args.map_reduce:
+        if not args.prompt:
+            branding.print_error("--map-reduce needs a prompt, e.g. \"Summarize these files\"")
+            return 1
+        return cmd_map_reduce(
+            source=args.map_reduce,
+            instruction=args.prompt,
+            model=args.model,
+            workers=args.workers,
+            chunk_tokens=args.chunk_tokens,
+            output=args.output,
+        )
+
+    if args.batch and args.image:
+        return cmd_image_batch(
+            batch_file=args.batch,
+            out_dir=args.out_dir,
+            workers=args.workers,
+            model=args.model,
+            size=args.size,
+        )
+
+    if args.batch:
+        return cmd_batch(
+            batch_file=args.batch,
+            output=args.output,
+            workers=args.workers,
+            cheap=args.cheap,
+            fast=args.fast,
+            system=args.system,
+            max_tokens=args.max_tokens,
+            temperature=args.temperature,
+            max_cost=args.max_cost,
+        )
+
     if not args.prompt:
         parser.print_help()
         return 1
@@ -781,6 +2145,8 @@ More info: https://blockrun.ai
             prompt=args.prompt,
             model=args.model,
             size=args.size,
+            n=args.n,
+            out_dir=cwd,
         )
 
     return cmd_chat(
@@ -791,6 +2157,10 @@ More info: https://blockrun.ai
         fast=args.fast,
         max_tokens=args.max_tokens,
         temperature=args.temperature,
+        cache=args.cache,
+        stream=args.stream,
+        output=args.output,
+        max_cost=args.max_cost,
     )
 
 
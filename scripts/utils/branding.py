@@ -48,8 +48,8 @@ class BlockRunBranding:
         self.show_logo = show_logo
 
     def _c(self, color: str, text: str) -> str:
-        """Apply color if enabled."""
-        if not self.use_color:
+        """Apply color if enabled and stdout (e.g. a daemon client) is a terminal."""
+        if not self.use_color or not sys.stdout.isatty():
             return text
         return f"{self.COLORS.get(color, '')}{text}{self.COLORS['reset']}"
 
@@ -132,6 +132,9 @@ class BlockRunBranding:
         session_calls: Optional[int] = None,
         budget_remaining: Optional[float] = None,
         budget_limit: Optional[float] = None,
+        cached: bool = False,
+        ttft: Optional[float] = None,
+        tokens_per_sec: Optional[float] = None,
     ):
         """
         Print branded footer after operation.
@@ -143,12 +146,16 @@ class BlockRunBranding:
             session_calls: Number of calls this session
             budget_remaining: Remaining budget (None if no limit)
             budget_limit: Budget limit (None if no limit)
+            cached: Whether the response was served from the local cache
+            ttft: Seconds until the first streamed token
+            tokens_per_sec: Streaming throughput after the first token
         """
         print()
         print(self._c("dim", "-" * 60))
 
         if actual_cost:
-            print(f"  {self._c('green', '✓')} This call: ${actual_cost}")
+            source = f" {self._c('dim', '(served from cache)')}" if cached else ""
+            print(f"  {self._c('green', '✓')} This call: ${actual_cost}{source}")
 
         if session_total is not None:
             calls_str = f" ({session_calls} calls)" if session_calls else ""
@@ -157,6 +164,10 @@ class BlockRunBranding:
         if budget_remaining is not None and budget_limit is not None:
             print(f"  {self._c('green', '✓')} Budget remaining: ${budget_remaining:.4f} of ${budget_limit:.2f}")
 
+        if ttft is not None:
+            rate = f"  |  {tokens_per_sec:.1f} tokens/sec" if tokens_per_sec else ""
+            print(f"  {self._c('green', '✓')} First token: {ttft:.2f}s{rate}")
+
         print(f"  {self._c('dim', 'Powered by BlockRun • blockrun.ai')}")
 
     def print_error(self, message: str, help_link: Optional[str] = None):
@@ -200,6 +211,30 @@ class BlockRunBranding:
         print(self._c("dim", self.HEADER_LINE))
         print()
 
+    def print_balances(self, balances: dict, network: str = "Base"):
+        """
+        Print USDC balances for several wallets.
+
+        Args:
+            balances: Address -> balance (None if the lookup failed)
+            network: Network name (default: Base)
+        """
+        total = sum(b for b in balances.values() if b is not None)
+
+        print()
+        print(self._c("dim", self.HEADER_LINE))
+        print(self._c("bold", f"  BLOCKRUN WALLETS ({network})"))
+        print(self._c("dim", self.HEADER_LINE))
+        for address, balance in balances.items():
+            if balance is None:
+                shown = self._c("red", "(unable to fetch)")
+            else:
+                shown = self._c("green", f"{balance:>16.6f}") + " USDC"
+            print(f"  {address:<44} {shown}")
+        print(self._c("dim", self.HEADER_LINE))
+        print(f"  Total: {self._c('green', f'{total:.6f}')} USDC across {len(balances)} wallets")
+        print()
+
     def print_models_list(self, models: list, image_models: list = None):
         """
         Print available models in branded format with pricing.
@@ -213,7 +248,7 @@ class BlockRunBranding:
         print(self._c("bold", "  AVAILABLE MODELS"))
         print(self._c("dim", self.HEADER_LINE))
         print()
-        print(f"  {self._c('dim', 'Live data from:')} {self._c('cyan', 'https://blockrun.ai/api/pricing')}")
+        print(f"  {self._c('dim', 'Data from:')} {self._c('cyan', 'https://blockrun.ai/api/v1/models')}")
         print()
 
         # LLM Models
@@ -237,7 +272,7 @@ class BlockRunBranding:
             print()
             for model in image_models:
                 model_id = model.get("id", "unknown")
-                price = model.get("pricePerImage")
+                price = model.get("pricePerImage") or model.get("pricing", {}).get("flat")
 
                 print(f"    {self._c('cyan', model_id)}")
                 if price is not None:
@@ -308,7 +343,73 @@ class BlockRunBranding:
                 cost = entry.get("cost", 0)
                 # Truncate long model names to avoid misalignment
                 model_display = model[:32] + "..." if len(model) > 35 else model
-                print(f"    {time_str}  {model_display:<35}  ${cost:.4f}")
+                status = entry.get("status")
+                failed = f"  {self._c('red', f'HTTP {status}')}" if status and status >= 400 else ""
+                print(f"    {time_str}  {model_display:<35}  ${cost:.4f}{failed}")
+
+        print(self._c("dim", self.HEADER_LINE))
+        print()
+
+    def print_performance_stats(self, stats: dict):
+        """
+        Print per-model latency percentiles and throughput.
+
+        Args:
+            stats: Per-model dict from SpendingTracker.get_stats()
+        """
+        def ms(value):
+            return f"{value:.0f}ms" if value is not None else "-"
+
+        print()
+        print(self._c("dim", self.HEADER_LINE))
+        print(self._c("bold", "  PERFORMANCE (today's calls)"))
+        print(self._c("dim", self.HEADER_LINE))
+
+        if not stats:
+            print(f"  {self._c('dim', 'No calls recorded yet')}")
+        else:
+            print(f"  {'Model':<30} {'Calls':>5} {'Err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'tok/s':>7}")
+            for model, s in sorted(stats.items(), key=lambda item: -item[1]["calls"]):
+                model_display = model[:27] + "..." if len(model) > 30 else model
+                rate = f"{s['tokens_per_sec']:.0f}" if s["tokens_per_sec"] is not None else "-"
+                errors = self._c("red", f"{s['errors']:>4}") if s["errors"] else f"{0:>4}"
+                print(
+                    f"  {model_display:<30} {s['calls']:>5} {errors} "
+                    f"{ms(s['p50_ms']):>8} {ms(s['p95_ms']):>8} {ms(s['p99_ms']):>8} {rate:>7}"
+                )
+
+        print(self._c("dim", self.HEADER_LINE))
+        print()
+
+    def print_spending_breakdown(self, rows: list, by: str, since: Optional[str] = None):
+        """
+        Print ledger spend grouped by model, day or hour.
+
+        Args:
+            rows: Aggregates from SpendingLedger.aggregate()
+            by: Grouping used ("model", "day" or "hour")
+            since: Start of the range (None for all time)
+        """
+        total_cost = sum(row["cost"] or 0.0 for row in rows)
+        total_calls = sum(row["calls"] or 0 for row in rows)
+
+        print()
+        print(self._c("dim", self.HEADER_LINE))
+        print(self._c("bold", f"  SPENDING BY {by.upper()}"))
+        print(self._c("dim", self.HEADER_LINE))
+        print(f"  Since: {since.replace('T', ' ') if since else 'all time'}")
+        print(f"  Spent: {self._c('cyan', f'${total_cost:.4f}')} across {total_calls} calls")
+
+        if rows:
+            print()
+            label = {"model": "Model", "day": "Day", "hour": "Hour"}[by]
+            print(f"  {label:<35} {'Calls':>7} {'Errors':>7} {'Tokens':>10} {'Cost':>10}")
+            for row in rows:
+                key = row["key"].replace("T", " ") + (":00" if by == "hour" else "")
+                key = key[:32] + "..." if len(key) > 35 else key
+                tokens = (row["input_tokens"] or 0) + (row["output_tokens"] or 0)
+                cost = f"${row['cost']:.4f}"
+                print(f"  {key:<35} {row['calls']:>7} {row['errors']:>7} {tokens:>10} {cost:>10}")
 
         print(self._c("dim", self.HEADER_LINE))
         print()
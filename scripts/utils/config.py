@@ -22,6 +22,8 @@ DEFAULTS = {
     "max_tokens": 1024,
     "timeout": 60.0,
     "image_timeout": 120.0,
+    "cache": False,
+    "cache_ttl": 86400.0,
 }
 
 
@@ -88,6 +90,9 @@ def get_config() -> Dict[str, Any]:
         "default_image_model": os.environ.get("BLOCKRUN_IMAGE_MODEL", DEFAULTS["default_image_model"]),
         "max_tokens": int(os.environ.get("BLOCKRUN_MAX_TOKENS", DEFAULTS["max_tokens"])),
         "timeout": float(os.environ.get("BLOCKRUN_TIMEOUT", DEFAULTS["timeout"])),
+        "cache": os.environ.get("BLOCKRUN_CACHE", "").lower() in ("1", "true", "yes", "on")
+                 or DEFAULTS["cache"],
+        "cache_ttl": float(os.environ.get("BLOCKRUN_CACHE_TTL", DEFAULTS["cache_ttl"])),
     }
 
 
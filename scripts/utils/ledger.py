@@ -0,0 +1,267 @@
+"""
+BlockRun Spending Ledger.
+
+Keeps every call ever recorded in a SQLite file (~/.blockrun/ledger.sqlite),
+next to the daily spending.json session. Calls are indexed by timestamp and
+model, and an hourly rollup table is maintained on insert, so spend over
+any period can be broken down by model, day or hour without scanning the
+raw rows.
+"""
+
+import csv
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Any, TextIO
+
+
+LEDGER_FILE = Path.home() / ".blockrun" / "ledger.sqlite"
+
+# Telemetry columns shared with SpendingTracker history entries
+METRIC_COLUMNS = ("latency_ms", "ttfb_ms", "input_tokens", "output_tokens", "status", "retries")
+
+GROUPINGS = ("model", "day", "hour")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    model TEXT NOT NULL,
+    cost REAL NOT NULL,
+    latency_ms REAL,
+    ttfb_ms REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    status INTEGER,
+    retries INTEGER
+);
+CREATE INDEX IF NOT EXISTS calls_ts ON calls (ts);
+CREATE INDEX IF NOT EXISTS calls_model_ts ON calls (model, ts);
+"""
+
+# Rollup tables keyed by a timestamp prefix: "2025-01-31T09" and "2025-01-31"
+ROLLUPS = {"hourly": ("hour", 13), "daily": ("day", 10)}
+
+# Kept in step with calls by a trigger, whichever process inserts
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    {bucket} TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    PRIMARY KEY ({bucket}, model)
+);
+CREATE TRIGGER IF NOT EXISTS calls_rollup_{table} AFTER INSERT ON calls
+BEGIN
+    INSERT INTO {table} ({bucket}, model, calls, errors, cost, input_tokens, output_tokens)
+    VALUES (
+        substr(NEW.ts, 1, {width}), NEW.model,
+        CASE WHEN COALESCE(NEW.status, 200) < 400 THEN 1 ELSE 0 END,
+        CASE WHEN COALESCE(NEW.status, 200) < 400 THEN 0 ELSE 1 END,
+        NEW.cost, COALESCE(NEW.input_tokens, 0), COALESCE(NEW.output_tokens, 0)
+    )
+    ON CONFLICT ({bucket}, model) DO UPDATE SET
+        calls = calls + excluded.calls,
+        errors = errors + excluded.errors,
+        cost = cost + excluded.cost,
+        input_tokens = input_tokens + excluded.input_tokens,
+        output_tokens = output_tokens + excluded.output_tokens;
+END;
+"""
+
+# Columns every aggregate source yields, after the bucket and model
+_SUMS = "calls, errors, cost, input_tokens, output_tokens"
+
+
+def parse_since(value: str, now: Optional[datetime] = None) -> str:
+    """
+    Parse a --since value into a ledger timestamp.
+
+    Accepts a relative age ("90m", "24h", "7d", "2w") or an absolute local
+    date or time ("2025-01-31", "2025-01-31T09:00").
+
+    Args:
+        value: Text to parse
+        now: Reference time for relative ages (default: now)
+
+    Returns:
+        Timestamp string in the ledger's "%Y-%m-%dT%H:%M:%S" format
+
+    Raises:
+        ValueError: If the value is not understood
+    """
+    value = value.strip()
+    match = re.fullmatch(r"(\d+)\s*([mhdw])", value.lower())
+    if match:
+        amount = int(match.group(1))
+        unit = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}[match.group(2)]
+        start = (now or datetime.now()) - timedelta(**{unit: amount})
+        return start.strftime("%Y-%m-%dT%H:%M:%S")
+
+    try:
+        start = datetime.fromisoformat(value.replace(" ", "T"))
+    except ValueError:
+        raise ValueError(
+            f"Invalid --since value '{value}' (use e.g. 24h, 7d or 2025-01-31)"
+        ) from None
+    return start.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class SpendingLedger:
+    """Append-only SQLite record of every call, with hourly rollups."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Open (or create) the ledger.
+
+        Args:
+            path: SQLite file location (default: ~/.blockrun/ledger.sqlite)
+        """
+        self.path = Path(path) if path else LEDGER_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.created = not self.path.exists()
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        for table, (bucket, width) in ROLLUPS.items():
+            self._conn.executescript(_ROLLUP_SCHEMA.format(table=table, bucket=bucket, width=width))
+        self._conn.commit()
+
+    def add(self, entries: List[Dict[str, Any]]):
+        """
+        Append calls to the ledger.
+
+        Args:
+            entries: SpendingTracker history entries ("timestamp", "model",
+                "cost" and any telemetry fields)
+        """
+        rows = [
+            (entry["timestamp"], entry["model"], entry.get("cost", 0.0))
+            + tuple(entry.get(column) for column in METRIC_COLUMNS)
+            for entry in entries
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO calls (ts, model, cost, " + ", ".join(METRIC_COLUMNS) + ") "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def aggregate(self, by: str = "model", since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Total spend grouped by model, day or hour.
+
+        The range is split so each part reads the coarsest table that
+        covers it exactly: whole days from the daily rollup, whole hours
+        of the first day from the hourly rollup, and only the first
+        partial hour from individual calls (through the timestamp index).
+
+        Args:
+            by: "model", "day" or "hour"
+            since: Earliest timestamp to include (see parse_since)
+
+        Returns:
+            List of dicts with "key", "calls", "errors", "cost",
+            "input_tokens" and "output_tokens", sorted by key (or by cost
+            for model grouping)
+        """
+        if by not in GROUPINGS:
+            raise ValueError(f"Unknown grouping '{by}' (use {', '.join(GROUPINGS)})")
+
+        # Hour grouping needs hourly resolution throughout
+        width = 13 if by == "hour" else 10
+        parts = []
+
+        if since is None:
+            table = "hourly" if by == "hour" else "daily"
+            parts.append((f"SELECT {ROLLUPS[table][0]} AS bucket, model, {_SUMS} FROM {table}", ()))
+        else:
+            first_hour, first_day = since[:13], since[:10]
+            start = datetime.strptime(first_hour, "%Y-%m-%dT%H")
+            next_hour = (start + timedelta(hours=1)).strftime("%Y-%m-%dT%H")
+            next_day = (start + timedelta(days=1)).strftime("%Y-%m-%d")
+
+            # The partial hour `since` falls in, from individual calls
+            parts.append((
+                f"SELECT substr(ts, 1, {width}) AS bucket, model, "
+                f"SUM(COALESCE(status, 200) < 400) AS calls, "
+                f"SUM(COALESCE(status, 200) >= 400) AS errors, SUM(cost) AS cost, "
+                f"SUM(COALESCE(input_tokens, 0)) AS input_tokens, "
+                f"SUM(COALESCE(output_tokens, 0)) AS output_tokens "
+                f"FROM calls WHERE ts >= ? AND ts < ? GROUP BY model",
+                (since, next_hour),
+            ))
+            if by == "hour":
+                parts.append((
+                    f"SELECT hour AS bucket, model, {_SUMS} FROM hourly WHERE hour > ?",
+                    (first_hour,),
+                ))
+            else:
+                # Rest of the first day by the hour, then whole days
+                parts.append((
+                    f"SELECT substr(hour, 1, 10) AS bucket, model, {_SUMS} "
+                    f"FROM hourly WHERE hour > ? AND hour < ?",
+                    (first_hour, next_day),
+                ))
+                parts.append((
+                    f"SELECT day AS bucket, model, {_SUMS} FROM daily WHERE day > ?",
+                    (first_day,),
+                ))
+
+        key = "model" if by == "model" else "bucket"
+        query = (
+            f"SELECT {key} AS key, SUM(calls) AS calls, SUM(errors) AS errors, "
+            f"SUM(cost) AS cost, SUM(input_tokens) AS input_tokens, "
+            f"SUM(output_tokens) AS output_tokens "
+            f"FROM ({' UNION ALL '.join(sql for sql, _ in parts)}) GROUP BY key"
+        )
+        query += " ORDER BY cost DESC" if by == "model" else " ORDER BY key"
+        params = tuple(p for _, part_params in parts for p in part_params)
+
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def export_csv(self, out: TextIO, since: Optional[str] = None) -> int:
+        """
+        Write individual calls as CSV, oldest first.
+
+        Args:
+            out: Text stream to write to
+            since: Earliest timestamp to include (see parse_since)
+
+        Returns:
+            Number of calls written
+        """
+        columns = ("ts", "model", "cost") + METRIC_COLUMNS
+        query = f"SELECT {', '.join(columns)} FROM calls"
+        params: tuple = ()
+        if since is not None:
+            query += " WHERE ts >= ?"
+            params = (since,)
+        query += " ORDER BY ts"
+
+        writer = csv.writer(out)
+        writer.writerow(("timestamp",) + columns[1:])
+        count = 0
+        with self._lock:
+            # Stream rows; never hold the whole ledger in memory
+            for row in self._conn.execute(query, params):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
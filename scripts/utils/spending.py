@@ -2,26 +2,145 @@
 BlockRun Spending Tracker.
 
 Persistent spending tracking with budget enforcement.
-Stores spending data in ~/.blockrun/spending.json.
+Stores spending data in ~/.blockrun/spending.json (snapshot) and
+~/.blockrun/spending.journal (changes since the snapshot), along with
+per-call latency, token and status telemetry for the --spending --stats
+view. Every call is also appended to the multi-day SQLite ledger
+(see ledger.py).
 """
 
+import contextlib
 import json
+import math
 import os
+import sqlite3
 import tempfile
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Tolerance for floating-point budget comparisons (0.0001 = 0.01 cent)
+EPSILON = 0.0001
+
+# A reservation never settled (e.g. its process crashed) lapses after this
+RESERVATION_TTL = 600.0
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Check whether a local process still exists (assumed alive if unknown)."""
+    if not pid or fcntl is None:
+        # No cheap, side-effect-free check on Windows; rely on expiry
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextlib.contextmanager
+def file_lock(path: Path):
+    """
+    Hold an exclusive cross-process lock on a file for the block.
+
+    Args:
+        path: Lock file (created if missing; its content is never used)
+    """
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10s of contention
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values (None if empty)."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(values)))
+    return values[rank - 1]
 
 
 class SpendingTracker:
-    """Persistent spending tracker with budget enforcement."""
+    """
+    Persistent spending tracker with budget enforcement.
+
+    State lives in a snapshot (spending.json) plus an append-only journal
+    (spending.journal) of changes made since. Recording a call appends one
+    short line instead of rewriting the snapshot; once the journal grows
+    past JOURNAL_MAX_BYTES it is folded into a new snapshot.
+
+    Every read-modify-write happens under an exclusive lock on
+    spending.lock and first catches up with what other processes wrote,
+    so parallel agents sharing one directory never lose updates.
+    """
 
     MAX_HISTORY = 100
+    JOURNAL_MAX_BYTES = 256 * 1024
+
+    def __init__(self, data_dir: Optional[Path] = None):
+        """
+        Open the spending tracker.
 
-    def __init__(self):
-        self.dir = Path.home() / ".blockrun"
+        Args:
+            data_dir: Directory holding the spending files (default: ~/.blockrun)
+        """
+        self.dir = Path(data_dir) if data_dir else Path.home() / ".blockrun"
         self.file = self.dir / "spending.json"
-        self.data = self._load()
+        self.journal = self.dir / "spending.journal"
+        self.lock_file = self.dir / "spending.lock"
+        # Snapshot generation; journal lines from older generations are
+        # already folded into the snapshot
+        self._generation = 0
+        # How far into the journal self.data reflects, and which snapshot
+        # file it was built on
+        self._journal_bytes = 0
+        self._snapshot_id = None
+        self._torn_tail = False
+        self._ledger = None
+
+        # Ensure directory exists
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            self.data = self._load()
+
+    def _locked(self):
+        """Hold the cross-process lock on spending.lock."""
+        return file_lock(self.lock_file)
+
+    def _stat_snapshot(self) -> Optional[Tuple[int, int, int]]:
+        """Identify the snapshot file version (it is replaced, never edited)."""
+        try:
+            st = self.file.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
 
     def _today(self) -> str:
         """Get today's date string."""
@@ -31,10 +150,10 @@ class SpendingTracker:
         """Get current timestamp."""
         return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
-    def _new_session(self) -> dict:
+    def _new_session(self, session_id: Optional[str] = None) -> dict:
         """Create a fresh session."""
         return {
-            "session_id": self._today(),
+            "session_id": session_id or self._today(),
             "budget_limit": None,
             "spending": {
                 "total_usd": 0.0,
@@ -43,92 +162,419 @@ class SpendingTracker:
             "history": []
         }
 
+    def _roll_over(self, data: dict, day: str) -> dict:
+        """Start a new day's session, keeping the budget limit."""
+        new_data = self._new_session(day)
+        new_data["budget_limit"] = data.get("budget_limit")
+        # Calls in flight at midnight are charged to the new day
+        if data.get("reservations"):
+            new_data["reservations"] = data["reservations"]
+        return new_data
+
     def _load(self) -> dict:
-        """Load or create fresh session (resets daily)."""
-        # Ensure directory exists
-        self.dir.mkdir(parents=True, exist_ok=True)
+        """Load snapshot, replay the journal, reset if it is a new day (lock held)."""
+        self._generation = 0
+        self._journal_bytes = 0
+        self._torn_tail = False
+        self._snapshot_id = self._stat_snapshot()
 
-        if self.file.exists():
+        data = self._new_session()
+        if self._snapshot_id is not None:
             try:
                 data = json.loads(self.file.read_text())
-                # Reset if new day
-                if data.get("session_id", "")[:10] != self._today():
-                    # Preserve budget limit across days
-                    new_data = self._new_session()
-                    new_data["budget_limit"] = data.get("budget_limit")
-                    return new_data
-                return data
+                self._generation = data.pop("journal_generation", 0)
             except (json.JSONDecodeError, KeyError):
                 # Corrupted file - start fresh
-                return self._new_session()
+                data = self._new_session()
+
+        data = self._replay(data)
+
+        if data.get("session_id", "")[:10] != self._today():
+            data = self._roll_over(data, self._today())
+            # Yesterday's journal is no longer needed
+            if self._journal_bytes:
+                self.data = data
+                self._compact()
+
+        elif self._journal_bytes > self.JOURNAL_MAX_BYTES:
+            self.data = data
+            self._compact()
+
+        return data
+
+    def _replay(self, data: dict) -> dict:
+        """Apply journal entries past the point already read (lock held)."""
+        try:
+            with open(self.journal, "rb") as f:
+                f.seek(self._journal_bytes)
+                chunk = f.read()
+        except FileNotFoundError:
+            return data
+
+        self._journal_bytes += len(chunk)
+        if chunk:
+            self._torn_tail = not chunk.endswith(b"\n")
+
+        for line in chunk.splitlines():
+            try:
+                op = json.loads(line)
+            except ValueError:
+                # Torn write from a crash mid-append
+                continue
+            if not isinstance(op, dict) or op.get("gen") != self._generation:
+                continue
+            data = self._apply(data, op)
+        return data
+
+    def _sync(self):
+        """Catch up with changes made by other processes (lock held)."""
+        try:
+            size = os.path.getsize(self.journal)
+        except FileNotFoundError:
+            size = 0
+
+        if self._stat_snapshot() != self._snapshot_id or size < self._journal_bytes:
+            # Another process compacted or rolled over the day: start over
+            self.data = self._load()
+        elif size > self._journal_bytes:
+            self.data = self._replay(self.data)
 
-        return self._new_session()
+    def _apply(self, data: dict, op: dict) -> dict:
+        """Apply one journal operation to the in-memory state."""
+        kind = op.get("op")
+        if kind in ("settle", "release"):
+            data.get("reservations", {}).pop(op.get("id"), None)
+
+        if kind == "reserve":
+            data.setdefault("reservations", {})[op["id"]] = op["reservation"]
+
+        elif kind in ("record", "settle"):
+            entry = op["entry"]
+            day = entry.get("timestamp", "")[:10]
+            if day and day != data.get("session_id", "")[:10]:
+                data = self._roll_over(data, day)
+
+            data["spending"]["total_usd"] += entry.get("cost", 0.0)
+            if op.get("counted", True):
+                data["spending"]["calls"] += 1
+            data["history"].append(entry)
+
+            # Cap history size
+            if len(data["history"]) > self.MAX_HISTORY:
+                data["history"] = data["history"][-self.MAX_HISTORY:]
+
+        elif kind == "budget":
+            data["budget_limit"] = op.get("limit")
+
+        return data
+
+    def _append(self, op: dict):
+        """Apply an operation and append it to the journal."""
+        with self._locked():
+            self._sync()
+            self._write(op)
+
+    def _write(self, op: dict):
+        """Apply an operation and append it to the journal (lock held, synced)."""
+        op["gen"] = self._generation
+        self.data = self._apply(self.data, op)
+
+        line = (json.dumps(op, separators=(",", ":")) + "\n").encode("utf-8")
+        if self._torn_tail:
+            # Never glue a record onto a crashed writer's partial line
+            line = b"\n" + line
+            self._torn_tail = False
+        with open(self.journal, "ab") as f:
+            f.write(line)
+        self._journal_bytes += len(line)
+
+        if self._journal_bytes > self.JOURNAL_MAX_BYTES:
+            self._compact()
+
+    def _compact(self):
+        """Fold the journal into a fresh snapshot and start a new journal (lock held)."""
+        # Leave reservations of crashed processes behind
+        reservations = self.data.get("reservations")
+        if reservations:
+            live = self._live_reservations()
+            self.data["reservations"] = {k: v for k, v in reservations.items() if k in live}
+
+        self._generation += 1
+        self._save()
+        # Safe to crash here: the leftover lines carry the old generation
+        with open(self.journal, "wb"):
+            pass
+        self._journal_bytes = 0
+        self._torn_tail = False
 
     def _save(self):
-        """Atomic save to prevent corruption."""
+        """Atomic snapshot save to prevent corruption."""
         self.dir.mkdir(parents=True, exist_ok=True)
 
         # Write to temp file first
         fd, temp_path = tempfile.mkstemp(dir=self.dir, suffix=".json")
         try:
             with os.fdopen(fd, 'w') as f:
-                json.dump(self.data, f, indent=2)
+                json.dump(dict(self.data, journal_generation=self._generation), f, indent=2)
             # Atomic rename
             os.replace(temp_path, self.file)
+            self._snapshot_id = self._stat_snapshot()
         except Exception:
             # Clean up temp file on error
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
             raise
 
-    def record(self, model: str, cost: float):
-        """Record a call and save."""
-        self.data["spending"]["total_usd"] += cost
-        self.data["spending"]["calls"] += 1
-
-        # Add to history
-        self.data["history"].append({
+    def _entry(self, model: str, cost: float, **metrics) -> dict:
+        """Build a history entry, leaving out metrics that were not measured."""
+        entry = {
             "timestamp": self._now(),
             "model": model,
             "cost": cost
+        }
+        entry.update({k: v for k, v in metrics.items() if v is not None})
+        return entry
+
+    def record(
+        self,
+        model: str,
+        cost: float,
+        latency_ms: Optional[float] = None,
+        ttfb_ms: Optional[float] = None,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        status: Optional[int] = None,
+        retries: Optional[int] = None,
+    ):
+        """
+        Record a call and append it to the journal.
+
+        Args:
+            model: Model ID
+            cost: Cost in USD
+            latency_ms: Wall-clock time of the request
+            ttfb_ms: Time to the first byte of the response (streamed calls)
+            input_tokens: Prompt tokens from the response usage
+            output_tokens: Completion tokens from the response usage
+            status: HTTP status (failed calls, >= 400, are not counted as calls)
+            retries: Number of times the request was retried
+        """
+        entry = self._entry(
+            model, cost,
+            latency_ms=latency_ms, ttfb_ms=ttfb_ms,
+            input_tokens=input_tokens, output_tokens=output_tokens,
+            status=status, retries=retries,
+        )
+        ledger = self.get_ledger()
+        self._append({
+            "op": "record",
+            "entry": entry,
+            "counted": status is None or status < 400,
         })
+        self._add_to_ledger(ledger, entry)
 
-        # Cap history size
-        if len(self.data["history"]) > self.MAX_HISTORY:
-            self.data["history"] = self.data["history"][-self.MAX_HISTORY:]
+    def get_ledger(self) -> Optional["SpendingLedger"]:
+        """
+        Get the SQLite ledger that keeps every call beyond today's history.
 
-        self._save()
+        A newly created ledger starts with today's history.
+
+        Returns:
+            SpendingLedger for this tracker's directory, or None if it
+            cannot be opened
+        """
+        if self._ledger is None:
+            from .ledger import SpendingLedger
+            try:
+                self._ledger = SpendingLedger(self.dir / "ledger.sqlite")
+                if self._ledger.created and self.data["history"]:
+                    self._ledger.add(self.data["history"])
+            except sqlite3.Error:
+                return None
+        return self._ledger
+
+    def _add_to_ledger(self, ledger: Optional["SpendingLedger"], entry: dict):
+        """Append a call to the ledger; the daily session stays authoritative."""
+        if ledger is None:
+            return
+        try:
+            ledger.add([entry])
+        except sqlite3.Error:
+            pass
+
+    def _live_reservations(self) -> Dict[str, dict]:
+        """Reservations still held: not expired and owner process alive."""
+        now = time.time()
+        live = {}
+        for reservation_id, reservation in self.data.get("reservations", {}).items():
+            if reservation["expires"] <= now:
+                continue
+            if not _process_alive(reservation.get("pid")):
+                continue
+            live[reservation_id] = reservation
+        return live
+
+    def get_reserved(self) -> float:
+        """Get the budget currently held by calls in flight."""
+        return sum(r["amount"] for r in self._live_reservations().values())
+
+    def reserve(self, amount: float, ttl: float = RESERVATION_TTL) -> Optional[str]:
+        """
+        Hold part of today's budget for a call about to be sent.
+
+        Checking the budget and taking the reservation happen under one
+        lock, so concurrent callers cannot all pass the check and then
+        overshoot the limit together.
+
+        Args:
+            amount: Most the call is expected to cost, in USD
+            ttl: Seconds until the reservation lapses if never settled
+
+        Returns:
+            Reservation ID to pass to settle() or release(), or None if
+            the reservation would exceed the budget
+        """
+        reservation_id = uuid.uuid4().hex
+        with self._locked():
+            self._sync()
+
+            limit = self.data.get("budget_limit")
+            if limit is None:
+                # Nothing to hold back; settle() just records the call
+                return reservation_id
+
+            committed = self.data["spending"]["total_usd"] + self.get_reserved()
+            if committed + amount > limit + EPSILON:
+                return None
+
+            self._write({
+                "op": "reserve",
+                "id": reservation_id,
+                "reservation": {
+                    "amount": amount,
+                    "expires": time.time() + ttl,
+                    "pid": os.getpid(),
+                },
+            })
+        return reservation_id
+
+    def settle(
+        self,
+        reservation_id: str,
+        model: str,
+        cost: float,
+        **metrics,
+    ):
+        """
+        Replace a reservation with the call's actual cost.
+
+        Args:
+            reservation_id: ID returned by reserve()
+            model: Model ID
+            cost: Actual cost in USD
+            **metrics: Telemetry fields accepted by record()
+        """
+        status = metrics.get("status")
+        entry = self._entry(model, cost, **metrics)
+        ledger = self.get_ledger()
+        self._append({
+            "op": "settle",
+            "id": reservation_id,
+            "entry": entry,
+            "counted": status is None or status < 400,
+        })
+        self._add_to_ledger(ledger, entry)
+
+    def release(self, reservation_id: str):
+        """
+        Give a reservation back without charging anything (the call failed).
+
+        Args:
+            reservation_id: ID returned by reserve()
+        """
+        with self._locked():
+            self._sync()
+            if reservation_id in self.data.get("reservations", {}):
+                self._write({"op": "release", "id": reservation_id})
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        Get per-model performance over the recorded history.
+
+        Returns:
+            Dict of model ID to {"calls", "errors", "p50_ms", "p95_ms",
+            "p99_ms", "tokens_per_sec"}. Latency fields are None for models
+            with no timed calls; tokens_per_sec is the median over calls
+            that report output tokens.
+        """
+        stats: Dict[str, dict] = {}
+        for entry in self.data["history"]:
+            model = stats.setdefault(
+                entry.get("model", "unknown"),
+                {"calls": 0, "errors": 0, "latencies": [], "rates": []},
+            )
+            model["calls"] += 1
+            if entry.get("status", 200) >= 400:
+                model["errors"] += 1
+                continue
+
+            latency = entry.get("latency_ms")
+            if latency is None:
+                continue
+            model["latencies"].append(latency)
+
+            tokens = entry.get("output_tokens")
+            # Generation time: after the first byte when streamed
+            generating = latency - entry.get("ttfb_ms", 0.0)
+            if tokens and generating > 0:
+                model["rates"].append(tokens / (generating / 1000.0))
+
+        for model in stats.values():
+            latencies = sorted(model.pop("latencies"))
+            rates = sorted(model.pop("rates"))
+            model["p50_ms"] = _percentile(latencies, 50)
+            model["p95_ms"] = _percentile(latencies, 95)
+            model["p99_ms"] = _percentile(latencies, 99)
+            model["tokens_per_sec"] = _percentile(rates, 50)
+
+        return stats
 
     def check_budget(self) -> Tuple[bool, float]:
         """
         Check if within budget.
 
         Returns:
-            Tuple of (within_budget, remaining).
+            Tuple of (within_budget, remaining), where outstanding
+            reservations count as spent.
             If no budget set, returns (True, float('inf')).
         """
+        # Other agents may have spent since we last looked
+        self.reload()
+
         limit = self.data.get("budget_limit")
         if limit is None:
             return True, float('inf')
 
-        spent = self.data["spending"]["total_usd"]
+        # Calls in flight count as spent until they settle
+        spent = self.data["spending"]["total_usd"] + self.get_reserved()
         remaining = limit - spent
 
-        # Use tolerance for floating-point comparison (0.0001 = 0.01 cent)
-        EPSILON = 0.0001
         within_budget = remaining > -EPSILON
 
         return within_budget, max(0, remaining)
 
+    def reload(self):
+        """Pick up spending recorded by other processes."""
+        with self._locked():
+            self._sync()
+
     def set_budget(self, amount: float):
         """Set daily budget limit."""
-        self.data["budget_limit"] = amount
-        self._save()
+        self._append({"op": "budget", "limit": amount})
 
     def clear_budget(self):
         """Remove budget limit."""
-        self.data["budget_limit"] = None
-        self._save()
+        self._append({"op": "budget", "limit": None})
 
     def get_total(self) -> float:
         """Get total spent this session."""
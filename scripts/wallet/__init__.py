@@ -1,10 +1,23 @@
 """BlockRun wallet management modules."""
 
-from .balance import get_balance, get_wallet_address
+from .balance import (
+    BalanceService,
+    get_balance,
+    get_balance_service,
+    get_wallet_address,
+    is_valid_wallet_address,
+)
+from .rpc import RpcError, RpcPool, get_rpc_pool
 from .status import get_wallet_status
 
 __all__ = [
+    "BalanceService",
+    "RpcError",
+    "RpcPool",
     "get_balance",
+    "get_balance_service",
+    "get_rpc_pool",
     "get_wallet_address",
     "get_wallet_status",
+    "is_valid_wallet_address",
 ]
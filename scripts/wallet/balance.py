@@ -2,15 +2,50 @@
 BlockRun Balance Module - Wallet balance queries.
 
 Query USDC balance on Base chain for BlockRun payments.
+
+BalanceService reads balances straight from the USDC contract: any number
+of addresses go out as a single JSON-RPC batch of balanceOf eth_calls
+through the shared RpcPool (see rpc.py), and results are cached per address
+for a few seconds so a warm process (the daemon, a batch run) does not hit
+the RPC nodes on every call.
 """
 
-from typing import Optional
+import importlib.util
+import threading
+import time
+from typing import Optional, Dict, List, Tuple, Iterable
 
-try:
-    from blockrun_llm import LLMClient
-    HAS_SDK = True
-except ImportError:
-    HAS_SDK = False
+from .rpc import RpcPool, RpcError, get_rpc_pool
+
+HAS_SDK = importlib.util.find_spec("blockrun_llm") is not None
+
+# USDC contract on Base
+USDC_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+USDC_DECIMALS = 6
+
+# balanceOf(address) function selector
+BALANCE_OF_SELECTOR = "0x70a08231"
+
+# Seconds a fetched balance is served from memory
+BALANCE_TTL = 15.0
+
+# Public nodes reject very large batches; bigger lists are split
+MAX_BATCH = 100
+
+
+def is_valid_wallet_address(address: str) -> bool:
+    """Validate Ethereum wallet address format."""
+    if not address or not isinstance(address, str):
+        return False
+    if not address.startswith("0x"):
+        return False
+    if len(address) != 42:
+        return False
+    try:
+        int(address[2:], 16)
+        return True
+    except ValueError:
+        return False
 
 
 def get_wallet_address(private_key: Optional[str] = None) -> str:
@@ -28,6 +63,8 @@ def get_wallet_address(private_key: Optional[str] = None) -> str:
             "blockrun_llm SDK not installed. Install with: pip install blockrun-llm"
         )
 
+    from blockrun_llm import LLMClient
+
     client = LLMClient(private_key=private_key) if private_key else LLMClient()
     try:
         return client.get_wallet_address()
@@ -35,21 +72,20 @@ def get_wallet_address(private_key: Optional[str] = None) -> str:
         client.close()
 
 
-def get_balance(private_key: Optional[str] = None) -> dict:
+def get_balance(private_key: Optional[str] = None, refresh: bool = False) -> dict:
     """
     Get wallet balance information.
 
-    Note: Full balance query requires additional API endpoint.
-    Currently returns wallet address for manual balance check.
-
     Args:
         private_key: Override environment variable
+        refresh: Query the chain even if a recent balance is cached
 
     Returns:
         Dict with wallet info:
         {
             "address": "0x...",
             "network": "Base",
+            "balance": 12.5,  # USDC, None if the RPC query failed
             "balance_url": "https://basescan.org/address/..."
         }
     """
@@ -58,6 +94,158 @@ def get_balance(private_key: Optional[str] = None) -> dict:
     return {
         "address": address,
         "network": "Base (Mainnet)",
+        "balance": get_balance_service().get_balance(address, refresh=refresh),
         "balance_url": f"https://basescan.org/address/{address}",
-        "note": "Check balance at blockrun.ai or basescan.org",
     }
+
+
+class BalanceService:
+    """
+    Batched, cached USDC balance lookups over a pooled RPC connection.
+
+    Safe to share between threads. Balances are floats in USDC; an address
+    whose lookup failed maps to None and is not cached.
+
+    Example:
+        service = BalanceService()
+        balances = service.get_balances(["0xabc...", "0xdef..."])
+    """
+
+    def __init__(
+        self,
+        pool: Optional[RpcPool] = None,
+        ttl: float = BALANCE_TTL,
+    ):
+        """
+        Create a balance service.
+
+        Args:
+            pool: RPC endpoints to query (default: the shared pool over
+                BLOCKRUN_BASE_RPCS)
+            ttl: Seconds to serve a balance from the cache
+        """
+        self.pool = pool or get_rpc_pool()
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, addresses: List[str]) -> Dict[str, Optional[float]]:
+        """Query balanceOf for every address in one JSON-RPC batch."""
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "method": "eth_call",
+                "params": [{
+                    "to": USDC_ADDRESS,
+                    "data": f"{BALANCE_OF_SELECTOR}{address[2:].lower():0>64}",
+                }, "latest"],
+                "id": i,
+            }
+            for i, address in enumerate(addresses)
+        ]
+
+        balances: Dict[str, Optional[float]] = dict.fromkeys(addresses)
+        try:
+            replies = self.pool.call(batch)
+        except RpcError:
+            return balances
+
+        # Batch replies may come back in any order; match them up by id
+        for reply in replies:
+            try:
+                address = addresses[reply["id"]]
+                balances[address] = int(reply["result"], 16) / 10 ** USDC_DECIMALS
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+        return balances
+
+    def get_balances(
+        self,
+        addresses: Iterable[str],
+        refresh: bool = False,
+    ) -> Dict[str, Optional[float]]:
+        """
+        Get USDC balances for many addresses.
+
+        Cached balances younger than the TTL are reused; the rest are
+        fetched together in as few round trips as possible.
+
+        Args:
+            addresses: Wallet addresses (0x...)
+            refresh: Ignore the cache and query every address
+
+        Returns:
+            Dict mapping each address to its balance, or None if the address
+            is invalid or its lookup failed
+        """
+        addresses = list(dict.fromkeys(addresses))
+        result: Dict[str, Optional[float]] = {}
+        missing = []
+        now = time.monotonic()
+
+        with self._lock:
+            for address in addresses:
+                if not is_valid_wallet_address(address):
+                    result[address] = None
+                    continue
+                cached = None if refresh else self._cache.get(address.lower())
+                if cached and now - cached[1] < self.ttl:
+                    result[address] = cached[0]
+                else:
+                    missing.append(address)
+
+        for start in range(0, len(missing), MAX_BATCH):
+            fetched = self._fetch(missing[start:start + MAX_BATCH])
+            fetched_at = time.monotonic()
+            with self._lock:
+                for address, balance in fetched.items():
+                    if balance is not None:
+                        self._cache[address.lower()] = (balance, fetched_at)
+            result.update(fetched)
+
+        return {address: result[address] for address in addresses}
+
+    def get_balance(self, address: str, refresh: bool = False) -> Optional[float]:
+        """
+        Get the USDC balance of one address.
+
+        Args:
+            address: Wallet address (0x...)
+            refresh: Ignore the cache
+
+        Returns:
+            Balance in USDC, or None if the query fails
+        """
+        return self.get_balances([address], refresh=refresh)[address]
+
+    def invalidate(self, address: Optional[str] = None):
+        """
+        Drop cached balances.
+
+        Args:
+            address: Forget only this address (default: all)
+        """
+        with self._lock:
+            if address is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(address.lower(), None)
+
+
+_default_service: Optional[BalanceService] = None
+_default_lock = threading.Lock()
+
+
+def get_balance_service() -> BalanceService:
+    """
+    Get the process-wide balance service.
+
+    Returns:
+        Shared BalanceService instance
+    """
+    global _default_service
+
+    with _default_lock:
+        if _default_service is None:
+            _default_service = BalanceService()
+        return _default_service
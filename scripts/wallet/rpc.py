@@ -0,0 +1,298 @@
+"""
+BlockRun RPC Module - Base JSON-RPC endpoint pool.
+
+Public Base nodes are individually unreliable: any one of them is
+occasionally slow, rate-limited or down. RpcPool spreads reads over a
+configurable list of endpoints (BLOCKRUN_BASE_RPCS), tracks each one's
+recent latency and failures, and always tries the fastest healthy endpoint
+first. A read that has not answered within that endpoint's p90 latency is
+hedged with a duplicate request to the next endpoint; whichever valid
+answer arrives first is used.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Optional, Dict, List, Any, Union
+
+# Public Base mainnet endpoints, tried in this order until measured
+DEFAULT_RPCS = [
+    "https://mainnet.base.org",
+    "https://base-rpc.publicnode.com",
+    "https://base.llamarpc.com",
+    "https://1rpc.io/base",
+]
+
+RPC_TIMEOUT = 10.0
+
+# Latency samples kept per endpoint for ranking and the hedge delay
+WINDOW = 50
+
+# Samples needed before an endpoint's p90 replaces DEFAULT_HEDGE_DELAY
+MIN_SAMPLES = 5
+
+DEFAULT_HEDGE_DELAY = 1.0
+
+# Never hedge sooner than this, however fast an endpoint usually is
+MIN_HEDGE_DELAY = 0.05
+
+# Cooldown after a failure, doubled per consecutive failure up to the max
+COOLDOWN = 5.0
+MAX_COOLDOWN = 300.0
+
+
+class RpcError(Exception):
+    """Raised when no endpoint returned a valid answer."""
+
+
+def get_rpc_urls() -> List[str]:
+    """
+    Get the configured Base RPC endpoints.
+
+    BLOCKRUN_BASE_RPCS takes a comma-separated list; BLOCKRUN_BASE_RPC a
+    single endpoint. Without either, the public defaults are used.
+
+    Returns:
+        Endpoint URLs in preference order
+    """
+    urls = os.environ.get("BLOCKRUN_BASE_RPCS") or os.environ.get("BLOCKRUN_BASE_RPC")
+    if urls:
+        return [url.strip() for url in urls.split(",") if url.strip()]
+    return list(DEFAULT_RPCS)
+
+
+class Endpoint:
+    """Health and latency history of one RPC endpoint."""
+
+    def __init__(self, url: str, order: int):
+        self.url = url
+        self.order = order
+        self.samples: deque = deque(maxlen=WINDOW)
+        self.failures = 0
+        self.down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def latency(self) -> Optional[float]:
+        """Median recent latency in seconds (None if never measured)."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[len(ordered) // 2]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for this endpoint before hedging: its p90."""
+        if len(self.samples) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        ordered = sorted(self.samples)
+        p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+        return max(MIN_HEDGE_DELAY, p90)
+
+    def succeeded(self, elapsed: float):
+        self.samples.append(elapsed)
+        self.failures = 0
+        self.down_until = 0.0
+
+    def failed(self):
+        self.failures += 1
+        cooldown = min(MAX_COOLDOWN, COOLDOWN * 2 ** (self.failures - 1))
+        self.down_until = time.monotonic() + cooldown
+
+
+class RpcPool:
+    """
+    Latency-ranked, hedged JSON-RPC client over several endpoints.
+
+    Safe to share between threads; one pooled HTTP client serves every
+    endpoint.
+
+    Example:
+        pool = RpcPool()
+        block = pool.call({"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1})
+    """
+
+    def __init__(self, urls: Optional[List[str]] = None, timeout: float = RPC_TIMEOUT):
+        """
+        Create a pool.
+
+        Args:
+            urls: Endpoint URLs (default: get_rpc_urls())
+            timeout: Per-request timeout in seconds
+        """
+        urls = urls or get_rpc_urls()
+        self.endpoints = [Endpoint(url, i) for i, url in enumerate(urls)]
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._client = None
+
+    def _http(self):
+        """Return the pooled HTTP client, creating it once."""
+        with self._lock:
+            if self._client is None:
+                import httpx
+
+                self._client = httpx.Client(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60.0),
+                )
+            return self._client
+
+    def ranked(self) -> List[Endpoint]:
+        """
+        Endpoints in the order they should be tried.
+
+        Healthy endpoints come first, fastest measured first, then
+        unmeasured ones in configured order; endpoints cooling down after
+        failures come last, soonest available first.
+        """
+        with self._lock:
+            healthy = [e for e in self.endpoints if e.healthy]
+            down = [e for e in self.endpoints if not e.healthy]
+            healthy.sort(key=lambda e: (e.latency() is None, e.latency() or 0.0, e.order))
+            down.sort(key=lambda e: e.down_until)
+        return healthy + down
+
+    def _post(self, endpoint: Endpoint, payload: Union[Dict, List]) -> Any:
+        """Send payload to one endpoint, recording its latency or failure."""
+        started = time.perf_counter()
+        try:
+            response = self._client.post(endpoint.url, json=payload)
+            response.raise_for_status()
+            reply = response.json()
+            if not _valid(reply, payload):
+                raise RpcError(f"{endpoint.url}: invalid reply")
+        except Exception:
+            with self._lock:
+                endpoint.failed()
+            raise
+        with self._lock:
+            endpoint.succeeded(time.perf_counter() - started)
+        return reply
+
+    def _submit(self, endpoint: Endpoint, payload: Union[Dict, List]) -> Future:
+        """Run _post on a daemon thread so a losing request never delays exit."""
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(self._post(endpoint, payload))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="blockrun-rpc", daemon=True).start()
+        return future
+
+    def call(self, payload: Union[Dict, List]) -> Any:
+        """
+        Send a JSON-RPC request (or batch) and return the first valid reply.
+
+        The best-ranked endpoint is asked first. If it has not answered
+        within its p90 latency, the next endpoint is asked as well; if a
+        request fails, the next endpoint is asked straight away. Requests
+        that lose the race are left to finish in the background so their
+        latency still counts.
+
+        Args:
+            payload: JSON-RPC request object or list of them
+
+        Returns:
+            Parsed JSON reply
+
+        Raises:
+            RpcError: If every endpoint failed
+        """
+        self._http()
+        queue = self.ranked()
+        pending: Dict[Any, Endpoint] = {}
+        errors = []
+
+        def launch():
+            endpoint = queue.pop(0)
+            pending[self._submit(endpoint, payload)] = endpoint
+            return endpoint
+
+        delay = launch().hedge_delay()
+        while pending:
+            done, _ = wait(list(pending), timeout=delay if queue else None, return_when=FIRST_COMPLETED)
+            if not done and queue:
+                # Slower than its p90: hedge with the next endpoint
+                delay = launch().hedge_delay()
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{endpoint.url}: {e}")
+                    if queue:
+                        delay = launch().hedge_delay()
+
+        raise RpcError("All RPC endpoints failed: " + "; ".join(errors))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Current health of every endpoint, in ranked order.
+
+        Returns:
+            List of dicts with "url", "healthy", "latency_ms", "p90_ms",
+            "samples" and "failures"
+        """
+        rows = []
+        for endpoint in self.ranked():
+            with self._lock:
+                latency = endpoint.latency()
+                rows.append({
+                    "url": endpoint.url,
+                    "healthy": endpoint.healthy,
+                    "latency_ms": latency * 1000.0 if latency is not None else None,
+                    "p90_ms": endpoint.hedge_delay() * 1000.0 if len(endpoint.samples) >= MIN_SAMPLES else None,
+                    "samples": len(endpoint.samples),
+                    "failures": endpoint.failures,
+                })
+        return rows
+
+    def close(self):
+        """Close the HTTP client."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+def _valid(reply: Any, payload: Union[Dict, List]) -> bool:
+    """
+    Whether a reply answers the request.
+
+    A node that is rate limiting or out of sync answers with JSON-RPC
+    error objects instead of results (for a batch, often a single error
+    object); that counts as a failure so another endpoint gets asked.
+    """
+    if isinstance(payload, list):
+        return (
+            isinstance(reply, list)
+            and len(reply) == len(payload)
+            and all(isinstance(item, dict) and "result" in item for item in reply)
+        )
+    return isinstance(reply, dict) and "result" in reply
+
+
+_default_pool: Optional[RpcPool] = None
+_default_lock = threading.Lock()
+
+
+def get_rpc_pool() -> RpcPool:
+    """
+    Get the process-wide pool over the configured endpoints.
+
+    Returns:
+        Shared RpcPool instance
+    """
+    global _default_pool
+
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = RpcPool()
+        return _default_pool
@@ -0,0 +1,59 @@
+"""
+Tests for --fast routing on observed latency.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.llm.latency import MIN_SAMPLES, LatencyTracker  # noqa: E402
+from scripts.llm.router import fastest_model  # noqa: E402
+
+
+class FastestModelTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tracker = LatencyTracker(path=Path(self.tmp.name) / "latency.json")
+
+    def tearDown(self):
+        # Drop buffered observations so the exit flush has nothing to write
+        self.tracker.clear()
+        self.tmp.cleanup()
+
+    def measure(self, model: str, latency: float):
+        for _ in range(MIN_SAMPLES):
+            self.tracker.observe(model, latency)
+
+    def route(self) -> str:
+        return fastest_model("quick-tasks", default="openai/gpt-5-mini", latency=self.tracker)
+
+    def test_default_before_any_measurement(self):
+        self.assertEqual(self.route(), "openai/gpt-5-mini")
+
+    def test_unmeasured_faster_model_takes_over(self):
+        self.measure("openai/gpt-5-mini", 3.0)
+        # gpt-5-nano is labelled very-fast and has not been tried yet
+        self.assertEqual(self.route(), "openai/gpt-5-nano")
+
+        self.measure("openai/gpt-5-nano", 0.6)
+        self.assertEqual(self.route(), "openai/gpt-5-nano")
+
+    def test_explored_model_that_is_slow_gives_way(self):
+        self.measure("openai/gpt-5-mini", 3.0)
+        self.measure("openai/gpt-5-nano", 4.0)
+        # Next untried very-fast model in catalog order
+        self.assertEqual(self.route(), "openai/gpt-4o-mini")
+
+    def test_measured_model_beating_priors_is_kept(self):
+        self.measure("openai/gpt-5-mini", 0.5)
+        self.assertEqual(self.route(), "openai/gpt-5-mini")
+
+
+if __name__ == "__main__":
+    unittest.main()